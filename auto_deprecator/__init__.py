@@ -1,18 +1,44 @@
-"""Top-level package for Auto deprecator."""
-import argparse
-import ast
-from io import BytesIO
-from importlib import import_module
-from functools import wraps
-import logging
-from os import environ, walk
-from os.path import isfile, join
-from tokenize import tokenize, COMMENT
+"""Top-level package for Auto deprecator.
+
+The package only imports what the deprecate decorator needs at runtime.
+The source code cleaner and the command line interface are imported on
+the first access, e.g. ``auto_deprecator.SingleFileAutoDeprecator``.
+"""
+from collections import namedtuple
+import os
+from os import environ
+import sys
+import threading
+from time import time
+from types import MethodType
 from warnings import warn
 
 __version__ = '2020.5.0'
 
-LOGGER = logging.getLogger(__name__)
+# Attributes imported from the submodules on the first access
+_LAZY_ATTRIBUTES = {
+    "AsyncHandler": "handlers",
+    "SingleFileAutoDeprecator": "cleaner",
+    "iter_python_files": "cleaner",
+    "main": "cli",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name)
+        )
+
+    from importlib import import_module
+    module = import_module("." + _LAZY_ATTRIBUTES[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
 
 
 class FunctionStage:
@@ -30,6 +56,8 @@ def deprecate(
     version_module=None,
     error_handler=None,
     warn_handler=None,
+    backend=None,
+    args=None,
 ):
     """Deprecate
 
@@ -41,7 +69,9 @@ def deprecate(
       2. If the current version is same as or after the expiry version, by
          default, an exception is raised.
 
-    :param expiry: `str` The expiry version, e.g. 2.1.0.
+    :param expiry: `str` The expiry version, e.g. 2.1.0, or the expiry
+        date, either `date` / `datetime` or an ISO format string, e.g.
+        2021-01-01 or 2021-01-01T12:00:00.
     :param current: `str` The current version. e.g. 2.0.0.
     :param relocate: `str` The relocated method or function name, which will
         be hinted if warning or exception is raised.
@@ -52,47 +82,388 @@ def deprecate(
     :param warn_handler: `Callable[msg]` The warning handler with message
         as the parameter. The default handler is to raise the deprecation
         warning.
+    :param backend: `str` The backend, either wrapper (default) or
+        monitoring. The monitoring backend returns the function itself
+        and only records its first hits by sys.monitoring on Python 3.12+,
+        without calling the handlers. The wrapper is used on the older
+        versions.
+    :param args: `Dict[str or int, str]` The deprecated arguments, either
+        the keyword names or the positional indexes, and their relocated
+        keyword names, or None if they are removed. Only the arguments
+        are deprecated instead of the function, and the relocated
+        keywords are passed to the function by their new names.
     """
+    assert backend in (None, "wrapper", "monitoring"), (
+        'Invalid backend "%s"' % backend
+    )
+    assert args is None or backend != "monitoring", (
+        "The monitoring backend cannot deprecate the arguments"
+    )
+
     def _deprecate(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Check whether the function is deprecated
-            stage = check_stage(
-                expiry=expiry, current=current, version_module=version_module
+        # The state is set up once per function, so the calls only read
+        # it without any lock
+        state = DeprecationState(
+            func=func,
+            expiry=expiry,
+            current=current,
+            relocate=relocate,
+            version_module=version_module,
+            error_handler=error_handler,
+            warn_handler=warn_handler,
+        )
+
+        if args is not None:
+            return DeprecatedArguments(state, args)
+
+        if (
+            backend == "monitoring"
+            and hasattr(sys, "monitoring")
+            and hasattr(func, "__code__")
+        ):
+            from auto_deprecator.monitoring import TRACKER
+            TRACKER.track(state)
+            return func
+
+        return DeprecatedFunction(state)
+
+    return _deprecate
+
+
+class DeprecatedFunction:
+    """Wrapper of a deprecated function.
+
+    The wrapper only holds the state of the function, so each decorated
+    function costs a single small object instead of the closures and the
+    attributes copied by ``functools.wraps``. The attributes of the
+    function, e.g. ``__name__``, are read from the function itself, and
+    the wrapper is bound to the instance as a method.
+    """
+
+    __slots__ = ("_state", "__dict__")
+
+    def __init__(self, state):
+        """Constructor.
+
+        :param state: `DeprecationState` The state of the function.
+        """
+        self._state = state
+
+    def __call__(self, *args, **kwargs):
+        state = self._state
+
+        # Check whether the function is deprecated
+        stage = state.get_stage()
+        CALL_COUNTER.increment(state.counter_keys[stage])
+
+        # Throw exception if deprecation
+        if stage != FunctionStage.WARNING:
+            handler = state.error_handler or _default_deprecation_error_handler
+            handler(state.get_message(stage))
+
+        # Run the function
+        result = state.func(*args, **kwargs)
+
+        # Alert the user that the function will be
+        # deprecated
+        if stage == FunctionStage.WARNING:
+            handler = state.warn_handler or _default_deprecation_warn_handler
+            handler(state.get_message(stage))
+
+        return result
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        return MethodType(self, instance)
+
+    def __getattr__(self, name):
+        if name == "_state":
+            raise AttributeError(name)
+
+        return getattr(self._state.func, name)
+
+    def __reduce__(self):
+        # Pickled by the qualified name as the function
+        return self.__qualname__
+
+    def __repr__(self):
+        return "<deprecated %r>" % self._state.func
+
+    @property
+    def __wrapped__(self):
+        return self._state.func
+
+
+class DeprecatedArguments(DeprecatedFunction):
+    """Wrapper of a function with the deprecated arguments.
+
+    The arguments are compiled on decoration into the keyword names and
+    the smallest positional index, so the calls without any deprecated
+    argument only compare the number of the positional arguments and
+    check the keywords.
+    """
+
+    __slots__ = ("_keywords", "_names", "_positional", "_max_args")
+
+    def __init__(self, state, arguments):
+        """Constructor.
+
+        :param state: `DeprecationState` The state of the function.
+        :param arguments: `Dict[str or int, str]` The deprecated keyword
+            names or positional indexes, and their relocated names.
+        """
+        super().__init__(state)
+
+        code = getattr(state.func, "__code__", None)
+        if code is not None:
+            positional_names = code.co_varnames[:code.co_argcount]
+            parameter_names = code.co_varnames[
+                :code.co_argcount + code.co_kwonlyargcount
+            ]
+        else:
+            positional_names = parameter_names = ()
+
+        # The keywords by the name, and the positional arguments sorted by
+        # the index, with the relocated name, whether the keyword is passed
+        # by the relocated name, and the warning and error messages
+        self._keywords = {}
+        self._positional = []
+
+        for argument, relocate in arguments.items():
+            name = state.func.__name__
+            messages = (
+                format_future_argument_deprecation(
+                    name, argument, state.expiry, relocate=relocate
+                ),
+                format_argument_deprecation(
+                    name, argument, state.expiry, relocate=relocate
+                ),
             )
 
-            # Throw exception if deprecation
-            if stage != FunctionStage.WARNING:
-                handle_deprecation(
-                    handler=error_handler,
-                    func=func,
-                    expiry=expiry,
-                    relocate=relocate,
+            if isinstance(argument, int):
+                self._positional.append(
+                    (argument, relocate, False, messages)
                 )
+                continue
+
+            rename = relocate is not None and argument not in parameter_names
+            self._keywords[argument] = (relocate, rename, messages)
+
+            if argument in positional_names:
+                self._positional.append((
+                    positional_names.index(argument), relocate, False,
+                    messages,
+                ))
+
+        self._positional.sort(key=lambda item: item[0])
+        self._names = frozenset(self._keywords)
+        self._max_args = (
+            self._positional[0][0] if self._positional else sys.maxsize
+        )
+
+    def __call__(self, *args, **kwargs):
+        if len(args) > self._max_args or (
+            kwargs and not self._names.isdisjoint(kwargs)
+        ):
+            self._check_arguments(args, kwargs)
+
+        return self._state.func(*args, **kwargs)
 
-            # Run the function
-            result = func(*args, **kwargs)
-
-            # Alert the user that the function will be
-            # deprecated
-            if stage == FunctionStage.WARNING:
-                alert_future_deprecation(
-                    handler=warn_handler,
-                    func=func,
-                    expiry=expiry,
-                    relocate=relocate,
+    def _check_arguments(self, args, kwargs):
+        state = self._state
+        stage = state.get_stage()
+
+        used = [
+            argument for argument in self._positional
+            if argument[0] < len(args)
+        ]
+        used += [
+            (name,) + self._keywords[name]
+            for name in list(kwargs)
+            if name in self._names
+        ]
+
+        if stage == FunctionStage.WARNING:
+            handler = state.warn_handler or _default_deprecation_warn_handler
+        else:
+            handler = (
+                state.error_handler or _default_deprecation_error_handler
+            )
+
+        for name, relocate, rename, messages in used:
+            CALL_COUNTER.increment(state.counter_keys[stage])
+            handler(messages[stage != FunctionStage.WARNING])
+
+            if not rename:
+                continue
+
+            if relocate in kwargs:
+                raise TypeError(
+                    "%s() got multiple values for argument %r" % (
+                        state.func.__name__, relocate
+                    )
                 )
 
-            return result
+            kwargs[relocate] = kwargs.pop(name)
 
-        return wrapper
 
-    return _deprecate
+class _FunctionDoc:
+    """Docstring of the wrapped function, or of the wrapper class if it is
+    read on the class."""
+
+    __slots__ = ("_class_doc",)
+
+    def __init__(self, class_doc):
+        self._class_doc = class_doc
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self._class_doc
+
+        return instance._state.func.__doc__
+
+
+class _FunctionModule(str):
+    """Module of the wrapped function, or of the wrapper class if it is
+    read on the class.
+
+    The class reads its module from its dict without the descriptor
+    protocol, so the descriptor is the module name of the class itself.
+    """
+
+    __slots__ = ()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        return instance._state.func.__module__
+
+    def __reduce__(self):
+        # Pickled as the plain module name
+        return str, (str(self),)
+
+
+# The class attributes are replaced to read the module and the docstring
+# of the function, as functools.wraps copies them. The subclasses define
+# their own attributes, so they are replaced as well
+for _wrapper_class in (DeprecatedFunction, DeprecatedArguments):
+    _wrapper_class.__module__ = _FunctionModule(_wrapper_class.__module__)
+    _wrapper_class.__doc__ = _FunctionDoc(_wrapper_class.__doc__)
+
+del _wrapper_class
+
+
+class _Unset:
+    """Marker of the environment variable not read yet."""
+
+
+class DeprecationConfig:
+    """Current version of all the deprecated functions in the process.
+
+    The version is either set in the process, e.g. by the pytest option
+    --deprecate-version, or read from the environment variable
+    DEPRECATE_VERSION on the first use, and precedes the current version
+    of the functions. Each change increments the generation, so the
+    functions keep their stages until the generation is changed, and only
+    compare the generation on the call.
+
+    For example,
+
+        with CONFIG.override_version("2.1.0"):
+            old_hello_world()  # RuntimeError
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._environ_version = _Unset
+        # Incremented on every change of the version
+        self.generation = 0
+
+    def get_version(self):
+        """Get the version overriding the functions.
+
+        :returns: `str` The version set in the process, or the environment
+            variable DEPRECATE_VERSION, or None if neither is set.
+        """
+        version = self._version
+        if version is not None:
+            return version
+
+        version = self._environ_version
+        if version is _Unset:
+            version = environ.get("DEPRECATE_VERSION")
+            self._environ_version = version
+
+        return version
+
+    def set_version(self, version):
+        """Set the version overriding the functions.
+
+        :param version: `str` The version, or None to remove it.
+        :returns: `str` The previous version set in the process.
+        """
+        with self._lock:
+            previous, self._version = self._version, version
+            self.generation += 1
+
+        return previous
+
+    def override_version(self, version):
+        """Override the version of the functions in the block.
+
+        The overrides in the different threads are applied to the whole
+        process, and are restored in the reverse order.
+
+        :param version: `str` The version.
+        :returns: `VersionOverride` The context manager.
+        """
+        return VersionOverride(self, version)
+
+    def reload_environ(self):
+        """Read the environment variable DEPRECATE_VERSION again.
+
+        The variable is read once, so the changes of the environment are
+        only applied after reloading it.
+        """
+        with self._lock:
+            self._environ_version = _Unset
+            self.generation += 1
+
+
+class VersionOverride:
+    """Context manager overriding the version of the configuration.
+
+    It is a plain class instead of contextlib.contextmanager, so contextlib
+    is not imported with the deprecate decorator.
+    """
+
+    __slots__ = ("config", "version", "_previous")
+
+    def __init__(self, config, version):
+        self.config = config
+        self.version = version
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = self.config.set_version(self.version)
+        return self.config
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.config.set_version(self._previous)
+
+
+CONFIG = DeprecationConfig()
 
 
 def get_curr_version(current, version_module):
-    if "DEPRECATE_VERSION" in environ:
-        return environ["DEPRECATE_VERSION"]
+    version = CONFIG.get_version()
+    if version is not None:
+        return version
 
     assert (current is not None) or (version_module is not None), (
         "Only the current version (%s) or the version module (%s) "
@@ -102,428 +473,693 @@ def get_curr_version(current, version_module):
     if current:
         return current
 
-    try:
-        module = import_module(version_module, "")
-    except Exception:
-        raise RuntimeError(
-            'Cannot locate version module "%s"' % version_module
-        )
+    # The version is read without importing the module if possible
+    from auto_deprecator.resolver import resolve_version
+    return resolve_version(version_module)
+
+
+def parse_expiry(expiry):
+    """Parse the expiry.
+
+    :param expiry: `str` The expiry version or date.
+    :returns: `date` or `datetime` if the expiry is in the ISO date
+        format, e.g. 2021-01-01, 2021-01-01T12:00:00 or
+        2021-01-01T12:00:00.5+00:00, otherwise the expiry as it is.
+    """
+    if (
+        not isinstance(expiry, str)
+        or len(expiry) < 10
+        or expiry[4] != "-"
+        or expiry[7] != "-"
+    ):
+        return expiry
+
+    from datetime import date, datetime
 
     try:
-        return getattr(module, "__version__")
-    except AttributeError:
-        raise RuntimeError(
-            "Cannot find version (__version__) from the version module "
-            '"%s"' % version_module
-        )
+        if len(expiry) == 10:
+            return date(int(expiry[:4]), int(expiry[5:7]), int(expiry[8:]))
 
+        # The UTC designator is only accepted from Python 3.11
+        if expiry[-1] in "Zz":
+            expiry = expiry[:-1] + "+00:00"
 
-def check_stage(expiry=None, current=None, version_module=None):
-    if expiry is not None:
-        current = get_curr_version(
-            current=current, version_module=version_module
-        )
+        return datetime.fromisoformat(expiry)
+    except ValueError:
+        raise ValueError('Invalid expiry date "%s"' % expiry)
 
-        if current > expiry:
-            return FunctionStage.CLEANING
-        elif current == expiry:
-            return FunctionStage.EXPIRED
-        else:
-            return FunctionStage.WARNING
 
-    return FunctionStage.WARNING
+def is_date(value):
+    """Check whether the value is a date or datetime.
 
+    The module datetime is not imported until an expiry date is used,
+    and the value cannot be a date before that.
+    """
+    datetime_module = sys.modules.get("datetime")
 
-def handle_deprecation(handler, func, expiry=None, relocate=None):
-    if expiry is None:
-        return
+    return (
+        datetime_module is not None
+        and isinstance(value, datetime_module.date)
+    )
 
-    if relocate:
-        hints = ' Please use function / method "{relocate}"'.format(
-            relocate=relocate
-        )
-    else:
-        hints = ""
 
-    msg = (
-        'Function "{func}" is deprecated since version {version}.' "{hints}"
-    ).format(func=func.__name__, version=expiry, hints=hints)
+def check_date_stage(expiry, today=None):
+    """Check the stage of the expiry date.
 
-    handler = handler or _default_deprecation_error_handler
-    handler(msg)
+    The function is expired from the expiry date (or time), and is
+    cleaned from the day after.
 
+    :param expiry: `date` or `datetime` The expiry date.
+    :param today: `date` or `datetime` The current date. Default is now.
+    :returns: `(int, float)` The stage and the timestamp until when
+        the stage is valid, or None if the stage is final.
+    """
+    from datetime import datetime, time as datetime_time, timedelta
 
-def alert_future_deprecation(handler, func, expiry=None, relocate=None):
-    if expiry is None:
-        version_msg = "soon"
+    if isinstance(expiry, datetime):
+        expired_time = expiry
     else:
-        version_msg = "on version {version}".format(version=expiry)
+        expired_time = datetime.combine(expiry, datetime_time())
 
-    if relocate:
-        hints = ' Please use function / method "{relocate}"'.format(
-            relocate=relocate
-        )
+    tzinfo = expired_time.tzinfo
+    cleaning_time = datetime.combine(
+        expired_time.date() + timedelta(days=1), datetime_time(tzinfo=tzinfo)
+    )
+
+    if today is None:
+        now = datetime.now(tzinfo)
+    elif isinstance(today, datetime):
+        now = today if today.tzinfo else today.replace(tzinfo=tzinfo)
     else:
-        hints = ""
+        now = datetime.combine(today, datetime_time(tzinfo=tzinfo))
 
-    msg = 'Function "{func}" will be deprecated {version_msg}.{hints}'.format(
-        func=func.__name__, version_msg=version_msg, hints=hints
-    )
+    if now < expired_time:
+        return FunctionStage.WARNING, expired_time.timestamp()
+    elif now < cleaning_time:
+        return FunctionStage.EXPIRED, cleaning_time.timestamp()
+    else:
+        return FunctionStage.CLEANING, None
 
-    handler = handler or _default_deprecation_warn_handler
-    handler(msg)
 
+class DateStage:
+    """Stage of the expiry date, cached until its next transition.
+    """
 
-def _default_deprecation_error_handler(msg):
-    raise RuntimeError(msg)
+    __slots__ = ("_expiry", "_state")
 
+    def __init__(self, expiry):
+        """Constructor.
+
+        :param expiry: `date` or `datetime` The expiry date.
+        """
+        self._expiry = expiry
+        # The stage and its valid until timestamp are stored in a tuple
+        # to be read and replaced atomically
+        self._state = (FunctionStage.WARNING, 0.0)
+
+    def get(self):
+        stage, valid_until = self._state
+
+        if valid_until is not None and time() >= valid_until:
+            self._state = check_date_stage(self._expiry)
+            stage = self._state[0]
+
+        return stage
 
-def _default_deprecation_warn_handler(msg):
-    warn(msg, DeprecationWarning)
 
+# Key of the call counter, which holds the function by its qualified name
+# instead of the function, so the counter does not keep the functions alive
+CounterKey = namedtuple("CounterKey", ["name", "expiry", "relocate"])
 
-class SingleFileAutoDeprecator:
-    """Auto deprecator.
+
+class DeprecationState:
+    """State of a deprecated function.
+
+    The state is shared by all the threads calling the function. All the
+    mutable attributes are replaced by a single assignment, so the
+    threads never observe a partial update and need no lock.
     """
 
-    def __init__(self, filename, current):
+    __slots__ = (
+        "func",
+        "expiry",
+        "current",
+        "relocate",
+        "version_module",
+        "error_handler",
+        "warn_handler",
+        "counter_keys",
+        "_date_stage",
+        "_version_stage",
+        "_messages",
+    )
+
+    def __init__(
+        self, func, expiry=None, current=None, relocate=None,
+        version_module=None, error_handler=None, warn_handler=None,
+    ):
         """Constructor.
 
-        :param filename: `str` File path.
-        :param current: `str` Current version.
+        :param func: `Callable` The deprecated function.
+        :param expiry: `str` The expiry version or date.
+        :param current: `str` The current version.
+        :param relocate: `str` The relocated function name.
+        :param version_module: `str` The version module name.
+        :param error_handler: `Callable[msg]` The error handler.
+        :param warn_handler: `Callable[msg]` The warning handler.
         """
-        self._filename = filename
-        self._current = current
-        self._deprecate_tokens = []
-
-    @staticmethod
-    def is_nestable(body):
-        return isinstance(body, (ast.FunctionDef, ast.ClassDef))
-
-    @classmethod
-    def check_import_deprecator_exists(cls, tree, last_lineno):
-        import_deprecator_lines = []
-
-        for index, body in enumerate(tree.body):
-            if (
-                isinstance(body, (ast.ImportFrom, ast.Import))
-                and hasattr(body, "module")
-                and body.module
-                and "auto_deprecator" in body.module
-            ):
-                start_lineno = body.lineno
-
-                if index != len(tree.body) - 1:
-                    end_lineno = tree.body[index + 1].lineno
-                else:
-                    end_lineno = last_lineno
-
-                import_deprecator_lines.append((start_lineno, end_lineno))
-
-        return import_deprecator_lines
-
-    @classmethod
-    def check_tree_deprecator_exists(cls, tree):
-        for body in tree.body:
-            if cls.is_nestable(body):
-                if cls.check_tree_deprecator_exists(body):
-                    return True
-
-            if cls.get_body_deprecate_deprecator(body):
-                return True
-
-        return False
-
-    @classmethod
-    def get_body_deprecate_deprecator(cls, body):
-        def has_deprecate_decorator(decorator):
-            if not hasattr(decorator, 'func'):
-                return False
-
-            if (hasattr(decorator.func, 'id') and
-                    decorator.func.id == 'deprecate'):
-                return True
-            elif (hasattr(decorator.func, 'attr') and
-                    decorator.func.attr == 'deprecate'):
-                return True
-
-            return False
-
-        if not hasattr(body, "decorator_list"):
-            return None
-
-        deprecate_list = [
-            d for d in body.decorator_list
-            if has_deprecate_decorator(d)
-        ]
-
-        if len(deprecate_list) == 0:
-            return None
+        self.func = func
+        self.expiry = parse_expiry(expiry)
+        self.current = current
+        self.relocate = relocate
+        self.version_module = version_module
+        self.error_handler = error_handler
+        self.warn_handler = warn_handler
+        # The keys of the call counter indexed by the stage
+        key = CounterKey(self.name, self.expiry, self.relocate)
+        self.counter_keys = tuple(
+            (key, stage) for stage in (
+                FunctionStage.WARNING,
+                FunctionStage.EXPIRED,
+                FunctionStage.CLEANING,
+            )
+        )
 
-        assert len(deprecate_list) == 1, (
-            "More than one deprecate decorator is found "
-            'in the function "{func}"'.format(func=body.func.name)
+        # The stage of the expiry date only changes at the expiry time
+        # and the day after, so the clock is not checked on every call
+        if is_date(self.expiry):
+            self._date_stage = DateStage(self.expiry)
+        else:
+            self._date_stage = None
+
+        # Tuple of the configuration generation and the stage
+        self._version_stage = (None, None)
+        # Tuple of the warning and the error messages, formatted on the
+        # first use
+        self._messages = None
+
+    @property
+    def name(self):
+        """Qualified name of the function."""
+        return "%s.%s" % (
+            self.func.__module__,
+            getattr(self.func, "__qualname__", self.func.__name__),
         )
 
-        return deprecate_list[0]
+    def get_stage(self):
+        """Get the stage of the function.
 
-    @classmethod
-    def get_function_lineno(cls, body):
-        if hasattr(body, "decorator_list") and len(body.decorator_list) > 0:
-            return body.decorator_list[0].lineno
+        The stage of the expiry version is cached until the version is
+        changed by the configuration, e.g. CONFIG.set_version.
+
+        :returns: `int` Function stage.
+        """
+        generation, stage = self._version_stage
+        if generation == CONFIG.generation:
+            return stage
+
+        if self._date_stage is not None:
+            return self._date_stage.get()
+
+        # The generation is read first, so the stage is checked again if
+        # the version is changed meanwhile
+        generation = CONFIG.generation
+
+        if self.expiry is None:
+            stage = FunctionStage.WARNING
         else:
-            return body.lineno
+            current = get_curr_version(
+                current=self.current, version_module=self.version_module
+            )
+            stage = check_stage(expiry=self.expiry, current=current)
+
+        self._version_stage = (generation, stage)
+        return stage
 
-    @classmethod
-    def get_deprecate_tokens(cls, file_content):
-        """Get deprecate tokens.
+    def get_message(self, stage):
+        """Get the message of the stage.
 
-        :returns: `List[(int, int, str)]` List of tuples of which
-            the first and second is the start and end of the line
-            number, and the third is the expiry version.
+        :param stage: `int` Function stage.
+        :returns: `str` The warning message if the stage is warning,
+            otherwise the error message.
         """
-        source_tokens = list(
-            tokenize(BytesIO(file_content.encode('utf-8')).readline)
-        )
+        messages = self._messages
+
+        if messages is None:
+            name = self.func.__name__
+            messages = (
+                format_future_deprecation(
+                    name, self.expiry, relocate=self.relocate
+                ),
+                format_deprecation(name, self.expiry, relocate=self.relocate),
+            )
+            self._messages = messages
 
-        deprecate_tokens = []
+        return messages[stage != FunctionStage.WARNING]
 
-        for (t_type, t_string,
-             (srow, _), (erow, _), _) in source_tokens:
-            if t_type != COMMENT:
-                continue
 
-            t_string = t_string.lstrip('# ')
-            if not t_string.startswith('auto-deprecate:'):
-                continue
+_FORK_HOOK_REGISTERED = False
+
+
+def warmup():
+    """Resolve the stages and the messages of all the deprecated functions.
+
+    The function is called in the master process of a pre-fork server
+    before forking the workers, so the workers share the resolved versions,
+    the imported version modules and the formatted messages instead of
+    building them on the first call in each worker. The call counts are
+    reset in the forked workers.
 
-            expiry = t_string.replace('auto-deprecate:', '').strip(' ')
-            assert 'expiry=' in expiry, (
-                "Invalid auto-deprecate option (%s)" % expiry
+    The functions of which the version cannot be resolved are skipped, and
+    raise the error on the call as before.
+
+    :returns: `int` Number of the deprecated functions warmed up.
+    """
+    global _FORK_HOOK_REGISTERED
+
+    # The states are found by the garbage collector instead of a registry,
+    # so the decoration is not slowed down by the registration
+    import gc
+    states = [
+        state for state in gc.get_objects()
+        if type(state) is DeprecationState
+    ]
+
+    count = 0
+    for state in states:
+        try:
+            state.get_stage()
+        except (AssertionError, ImportError, RuntimeError) as err:
+            # The error is formatted, as its traceback refers to the states
+            import logging
+            logging.getLogger(__name__).warning(
+                "Cannot warm up the function %s: %s", state.name, str(err)
             )
+            continue
 
-            expiry = expiry.replace('expiry=', '').strip(' ')
+        state.get_message(FunctionStage.WARNING)
+        count += 1
 
-            deprecate_tokens.append((srow, erow, expiry))
+    if not _FORK_HOOK_REGISTERED and hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=CALL_COUNTER.reset_after_fork)
+        _FORK_HOOK_REGISTERED = True
 
-        return deprecate_tokens
+    return count
 
-    def get_deprecate_expiry_from_comment(
-            self, body, start_lineno, end_lineno):
-        """Get deprecate expiry from comment.
 
-        The comment should be like
+class _ShardHolder:
+    """Holder of the shard in the thread local storage.
 
-            # auto-deprecate: expiry=2.0.0
+    The holder is freed when the thread exits, which retires the shard.
+    """
 
-        and located in the function in the first place, after
-        the docstring.
+    __slots__ = ("shard", "__weakref__")
 
-        For example,
+    def __init__(self, shard):
+        self.shard = shard
 
-            def abc():
-                \"\"\"Abc.\"\"\"
-                # auto-deprecate: expiry=2.0.0
-                pass
 
-        is valid, but not
+class CallCounter:
+    """Counter of the deprecated function calls.
 
-            def abc()
-                \"\"\"Abc.\"\"\"
-                print('hello world')
-                # auto-deprecate: expiry=2.0.0
-                pass
+    Each thread increments the counts in its own shard without any lock,
+    and the shards are merged on read. The lock is only acquired when
+    a thread creates its shard, or the counts are read. The shard of an
+    exited thread is merged into the retired counts and dropped, so the
+    shards do not pile up with the short-lived threads. The time a key is
+    first counted is recorded only on the first call of each thread.
+    """
 
+    def __init__(self):
+        # The shards are retired in the finalizers, which can run in the
+        # thread holding the lock
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        # Shards of the live threads by their identities
+        self._shards = {}
+        self._retired = {}
+        self._first_seen = {}
+
+    def increment(self, key):
+        """Increment the count of the key in the current thread.
+
+        :param key: `Hashable` Counter key.
         """
-        if hasattr(body, 'body'):
-            for inner_body in body.body:
-                end_lineno = self.get_function_lineno(inner_body)
-                if self.is_nestable(inner_body):
-                    break
-
-        check_expiry = [
-            expiry
-            for (srow, erow, expiry) in self._deprecate_tokens
-            if srow >= start_lineno and erow < end_lineno
-        ]
+        try:
+            shard = self._local.holder.shard
+        except AttributeError:
+            shard = self._new_shard()
 
-        if check_expiry:
-            return check_expiry[0]
+        try:
+            shard[key] += 1
+        except KeyError:
+            shard[key] = 1
+            self._first_seen.setdefault(key, time())
 
-        return None
+    def _new_shard(self):
+        import weakref
 
-    def get_body_deprecate_expiry(
-            self, body, start_lineno, end_lineno):
-        """Get the expiry version of the body.
+        shard = {}
+        holder = _ShardHolder(shard)
 
-        :returns: `str` Expiry version.
-        """
-        if not isinstance(body, (ast.ClassDef, ast.FunctionDef)):
-            return None
+        with self._lock:
+            self._shards[id(shard)] = shard
 
-        deprecate_decorator = self.get_body_deprecate_deprecator(body)
+        weakref.finalize(holder, self._retire, shard)
+        self._local.holder = holder
+        return shard
 
-        if deprecate_decorator is not None:
-            keywords = {
-                k.arg: getattr(k.value, 's', None)
-                for k in deprecate_decorator.keywords
-            }
+    def _retire(self, shard):
+        with self._lock:
+            # The shard is dropped by the reset already
+            if self._shards.get(id(shard)) is not shard:
+                return
 
-            expiry = (
-                deprecate_decorator.args[0].value
-                if deprecate_decorator.args
-                else keywords["expiry"]
-            )
+            del self._shards[id(shard)]
+            for key, count in shard.items():
+                self._retired[key] = self._retired.get(key, 0) + count
 
-            assert expiry is not None, "Expiry cannot be None"
+    def snapshot(self):
+        """Merge the counts of all the threads.
 
-            return expiry
+        The counts of the finished threads are kept.
 
-        expiry = self.get_deprecate_expiry_from_comment(
-            body, start_lineno, end_lineno
-        )
+        :returns: `Dict[Hashable, int]` The counts by the keys.
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+            counts = dict(self._retired)
 
-        return expiry
+        for shard in shards:
+            # The copy of a dict is atomic, so it is safe to be iterated
+            # while the thread keeps incrementing the shard
+            for key, count in shard.copy().items():
+                counts[key] = counts.get(key, 0) + count
 
-    def find_deprecated_lines(
-            self, tree, current, begin_lineno, last_lineno):
-        deprecated_lines = []
-        deprecated_body = []
+        return counts
 
-        for index, body in enumerate(tree.body):
-            # Python 3.8 lineno is on the function rather than the decorator
-            start_lineno = self.get_function_lineno(body)
+    def first_seen(self):
+        """Get the time each key is first counted.
 
-            if index != len(tree.body) - 1:
-                end_lineno = self.get_function_lineno(
-                    tree.body[index + 1]
-                )
-            else:
-                end_lineno = last_lineno
+        :returns: `Dict[Hashable, float]` The timestamps by the keys.
+        """
+        return self._first_seen.copy()
 
-            expiry = self.get_body_deprecate_expiry(
-                body, start_lineno, end_lineno
-            )
+    def reset(self):
+        """Reset the counts of all the threads."""
+        with self._lock:
+            self._shards = {}
+            self._retired = {}
+            self._local = threading.local()
+            self._first_seen = {}
 
-            assert current is not None, "Current version must be provided"
+    def reset_after_fork(self):
+        """Reset the counts in the forked child process.
 
-            stage = check_stage(expiry=expiry, current=current)
+        The lock is replaced instead of acquired, as it can be held by
+        a thread of the parent process, which does not exist in the child.
+        """
+        self._lock = threading.RLock()
+        self._shards = {}
+        self._retired = {}
+        self._local = threading.local()
+        self._first_seen = {}
 
-            # Loop into the body only if it can contain inner
-            # function / inner class
-            if self.is_nestable(body):
-                deprecated_lines += self.find_deprecated_lines(
-                    body, current, start_lineno, last_lineno
-                )
 
-                if len(body.body) == 0:
-                    deprecated_body.append(body)
+CALL_COUNTER = CallCounter()
 
-            if stage != FunctionStage.CLEANING:
-                continue
 
-            deprecated_lines.append((start_lineno, end_lineno))
-            deprecated_body.append(body)
+def get_call_counts():
+    """Get the number of the deprecated function calls.
 
-        # Remove the deprecated body from the tree
-        for body in deprecated_body:
-            tree.body.remove(body)
+    :returns: `Dict[(str, int), int]` The number of calls by the
+        qualified function name and the stage.
+    """
+    counts = {}
+
+    for (function_key, stage), count in CALL_COUNTER.snapshot().items():
+        key = (function_key.name, stage)
+        counts[key] = counts.get(key, 0) + count
+
+    return counts
+
+
+# Order of the version labels, which are before the release, except the
+# post-releases
+_VERSION_LABELS = {
+    "dev": 0,
+    "a": 1,
+    "alpha": 1,
+    "b": 2,
+    "beta": 2,
+    "c": 3,
+    "pre": 3,
+    "preview": 3,
+    "rc": 3,
+    "post": 5,
+    "r": 5,
+    "rev": 5,
+}
+_VERSION_RELEASE = 4
+_VERSION_NUMBER = 6
+
+
+def version_key(version):
+    """Key to order the versions.
+
+    The numbers are compared numerically, e.g. 2.10.0 is after 2.9.0, and
+    the trailing zeros are ignored, e.g. 2.0 is the same as 2.0.0. The
+    development and pre-releases, e.g. 2.0.0rc1, are before the release,
+    and the post-releases are after. The prefix v is ignored, e.g. v2.0.0
+    is the same as 2.0.0, and the local versions, e.g. 2.0.0+cpu, are after
+    the public version.
+
+    :param version: `str` The version.
+    :returns: `tuple` The key.
+    """
+    version = str(version).strip().lower()
+    if version.startswith("v"):
+        version = version[1:]
+
+    public, _, local = version.partition("+")
+    parts = []
+    part = ""
+
+    for char in public + ".":
+        if part and char.isdigit() != part[0].isdigit():
+            parts.append(part)
+            part = ""
+
+        if char.isalnum():
+            part += char
+        elif part:
+            parts.append(part)
+            part = ""
+
+    # Ignore the trailing zeros of the release numbers
+    release = 0
+    while release < len(parts) and parts[release].isdigit():
+        release += 1
+
+    while release > 0 and int(parts[release - 1]) == 0:
+        release -= 1
+        del parts[release]
+
+    key = tuple(
+        (_VERSION_NUMBER, int(part), "")
+        if part.isdigit()
+        else (_VERSION_LABELS.get(part, 0), 0, part)
+        for part in parts
+    )
 
-        # If no element is found in the body, remove the whole tree
-        if len(tree.body) == 0:
-            deprecated_lines = [(begin_lineno, last_lineno)]
+    # The local segments are compared after the public version, of which
+    # the numbers are after the labels
+    local_key = tuple(
+        (1, int(part), "") if part.isdigit() else (0, 0, part)
+        for part in local.replace("-", ".").replace("_", ".").split(".")
+        if part
+    )
+    return key + ((_VERSION_RELEASE, 0, ""),) + local_key
 
-        return deprecated_lines
 
-    def run(self):
-        LOGGER.info('Deprecating the file %s', self._filename)
+def check_stage(expiry=None, current=None, version_module=None, today=None):
+    expiry = parse_expiry(expiry)
 
-        # Read file stream
-        filestream = open(self._filename, "r").readlines()
-        file_content = "".join(filestream)
-        tree = ast.parse(file_content)
+    if is_date(expiry):
+        return check_date_stage(expiry, today=today)[0]
 
-        # Get the deprecate tokens
-        self._deprecate_tokens = self.get_deprecate_tokens(
-            file_content
+    if expiry is not None:
+        current = get_curr_version(
+            current=current, version_module=version_module
         )
+        return check_version_stage(expiry, current)
 
-        # Check whether deprecate is included
-        deprecator_import_lines = self.check_import_deprecator_exists(
-            tree, len(filestream) + 1
-        )
+    return FunctionStage.WARNING
 
-        # Store the deprecated funcion line numbers. The tuple
-        # is combined by the start and end line index
-        deprecated_lines = self.find_deprecated_lines(
-            tree, self._current, 1, len(filestream) + 1
-        )
 
-        if not deprecated_lines:
-            return False
+def check_version_stage(expiry, current):
+    """Check the stage of the expiry version at the current version.
+
+    Unlike check_stage, the current version is not overridden by CONFIG
+    or the environment variable DEPRECATE_VERSION.
+
+    :param expiry: `str` The expiry version.
+    :param current: `str` The current version.
+    :returns: `int` Function stage.
+    """
+    current, expiry = version_key(current), version_key(expiry)
+
+    if current > expiry:
+        return FunctionStage.CLEANING
+    elif current == expiry:
+        return FunctionStage.EXPIRED
+    else:
+        return FunctionStage.WARNING
+
+
+def handle_deprecation(handler, func, expiry=None, relocate=None):
+    if expiry is None:
+        return
+
+    msg = format_deprecation(func.__name__, expiry, relocate=relocate)
+    handler = handler or _default_deprecation_error_handler
+    handler(msg)
+
 
-        # Remove the import of the auto_deprecator if no more
-        # deprecate decorator is found
-        if not self.check_tree_deprecator_exists(tree):
-            deprecated_lines += deprecator_import_lines
+def format_deprecation(name, expiry, relocate=None):
+    """Format the message of the deprecated function.
 
-        # Remove the deprecated functions from backward
-        deprecated_lines = sorted(
-            deprecated_lines, key=lambda x: x[0], reverse=True
+    :param name: `str` Function name.
+    :param expiry: `str` Expiry version or date.
+    :param relocate: `str` Relocated function / method name.
+    :returns: `str` The message.
+    """
+    if relocate:
+        hints = ' Please use function / method "{relocate}"'.format(
+            relocate=relocate
         )
+    else:
+        hints = ""
 
-        for start_lineno, end_lineno in deprecated_lines:
-            filestream = (
-                filestream[: start_lineno - 1] + filestream[end_lineno - 1 :]
-            )
+    return (
+        'Function "{func}" is deprecated since {version}.' "{hints}"
+    ).format(func=name, version=format_expiry(expiry), hints=hints)
 
-        # Remove the redundant newline
-        filestream = "".join(filestream).rstrip()
 
-        # Write back the file
-        open(self._filename, "w+").write(filestream)
+def alert_future_deprecation(handler, func, expiry=None, relocate=None):
+    msg = format_future_deprecation(func.__name__, expiry, relocate=relocate)
+    handler = handler or _default_deprecation_warn_handler
+    handler(msg)
 
-        return True
 
+def format_future_deprecation(name, expiry=None, relocate=None):
+    """Format the message of the function to be deprecated.
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Automatical removal of deprecated source code."
-    )
-    parser.add_argument(
-        "path", type=str, help="The source code path.")
-    parser.add_argument(
-        "--version", dest="current", type=str, help="Current package version."
+    :param name: `str` Function name.
+    :param expiry: `str` Expiry version or date.
+    :param relocate: `str` Relocated function / method name.
+    :returns: `str` The message.
+    """
+    if expiry is None:
+        version_msg = "soon"
+    else:
+        version_msg = "on {version}".format(version=format_expiry(expiry))
+
+    if relocate:
+        hints = ' Please use function / method "{relocate}"'.format(
+            relocate=relocate
+        )
+    else:
+        hints = ""
+
+    return 'Function "{func}" will be deprecated {version_msg}.{hints}'.format(
+        func=name, version_msg=version_msg, hints=hints
     )
-    parser.add_argument(
-        "--debug", dest="debug", help='Debug mode', action='store_true',
+
+
+def describe_argument(argument):
+    """Describe the argument in the messages.
+
+    :param argument: `str` or `int` The keyword name or positional index.
+    :returns: `str` The description, e.g. Argument "name" or Positional
+        argument 1.
+    """
+    if isinstance(argument, int):
+        return "Positional argument {index}".format(index=argument)
+
+    return 'Argument "{name}"'.format(name=argument)
+
+
+def format_argument_hints(relocate=None):
+    if not relocate:
+        return ""
+
+    return ' Please use argument "{relocate}"'.format(relocate=relocate)
+
+
+def format_argument_deprecation(name, argument, expiry, relocate=None):
+    """Format the message of the deprecated argument.
+
+    :param name: `str` Function name.
+    :param argument: `str` or `int` The keyword name or positional index.
+    :param expiry: `str` Expiry version or date.
+    :param relocate: `str` Relocated keyword name.
+    :returns: `str` The message.
+    """
+    return (
+        '{argument} of function "{func}" is deprecated since {version}.'
+        "{hints}"
+    ).format(
+        argument=describe_argument(argument),
+        func=name,
+        version=format_expiry(expiry),
+        hints=format_argument_hints(relocate),
     )
-    args = parser.parse_args()
 
-    # Set up logger
-    level = logging.DEBUG if args.debug else logging.INFO
-    logging.basicConfig(level=level, format='%(asctime)-15s %(message)s')
 
-    # Get the argument values
-    path = args.path
-    current = args.current
-    assert current, "Current version is not provided"
+def format_future_argument_deprecation(
+        name, argument, expiry=None, relocate=None):
+    """Format the message of the argument to be deprecated.
 
-    if isfile(path):
-        SingleFileAutoDeprecator(filename=path, current=current).run()
+    :param name: `str` Function name.
+    :param argument: `str` or `int` The keyword name or positional index.
+    :param expiry: `str` Expiry version or date.
+    :param relocate: `str` Relocated keyword name.
+    :returns: `str` The message.
+    """
+    if expiry is None:
+        version_msg = "soon"
     else:
-        for root, subdirs, files in walk(path):
-            LOGGER.debug('Walk through root %s with files %s', root, files)
-            for python_file in files:
-                if python_file[-3:] != '.py':
-                    continue
+        version_msg = "on {version}".format(version=format_expiry(expiry))
+
+    return (
+        '{argument} of function "{func}" will be deprecated {version_msg}.'
+        "{hints}"
+    ).format(
+        argument=describe_argument(argument),
+        func=name,
+        version_msg=version_msg,
+        hints=format_argument_hints(relocate),
+    )
+
 
-                python_file = join(root, python_file)
-                SingleFileAutoDeprecator(
-                    filename=python_file,
-                    current=current
-                ).run()
+def format_expiry(expiry):
+    """Format the expiry in the messages.
+
+    :returns: `str` The expiry date in the ISO format, e.g. 2021-01-01,
+        or the expiry version, e.g. version 2.0.0.
+    """
+    expiry = parse_expiry(expiry)
 
+    if is_date(expiry):
+        return expiry.isoformat()
 
-if __name__ == '__main__':
-    main()
+    return "version {version}".format(version=expiry)
+
+
+def _default_deprecation_error_handler(msg):
+    raise RuntimeError(msg)
+
+
+def _default_deprecation_warn_handler(msg):
+    warn(msg, DeprecationWarning)
@@ -0,0 +1,3 @@
+from auto_deprecator.cli import main
+
+main()
@@ -0,0 +1,241 @@
+"""Removal of the deprecated source code in the built artifacts.
+
+The wheels and the source distributions are processed member by member
+without unpacking to the disk, so the memory usage is bounded by the
+largest member. The hashes in the wheel ``RECORD`` are recomputed for the
+modified members.
+"""
+from base64 import urlsafe_b64encode
+import csv
+from hashlib import sha256
+from importlib.util import decode_source
+from io import BytesIO, StringIO
+import logging
+from os import remove, replace
+from os.path import basename, dirname
+import tarfile
+from tempfile import NamedTemporaryFile
+import zipfile
+
+from auto_deprecator.cleaner import SingleFileAutoDeprecator
+
+LOGGER = logging.getLogger(__name__)
+
+SDIST_SUFFIXES = (".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".tar")
+
+
+def deprecate_member(name, data, current, today=None):
+    """Deprecate the source code of the artifact member.
+
+    :param name: `str` Member name.
+    :param data: `bytes` Member content.
+    :param current: `str` Current version.
+    :param today: `date` Current date.
+    :returns: `bytes` The deprecated content, or None if nothing is
+        deprecated or the member cannot be analyzed.
+    """
+    if not name.endswith(".py") or b"deprecate" not in data:
+        return None
+
+    deprecator = SingleFileAutoDeprecator(
+        filename=name, current=current, today=today
+    )
+
+    try:
+        file_content = deprecator.deprecate_source(decode_source(data))
+    except Exception as err:
+        # The member is copied unchanged, e.g. the test data with the
+        # invalid syntax, instead of failing the whole artifact
+        LOGGER.warning("Cannot analyze the member %s: %s", name, err)
+        return None
+
+    if file_content is None:
+        return None
+
+    LOGGER.info("Deprecating the member %s", name)
+    return file_content.encode("utf-8")
+
+
+def record_hash(data):
+    """Hash of the wheel RECORD entry.
+
+    :returns: `str` The hash, e.g. sha256=<urlsafe base64 digest>.
+    """
+    digest = urlsafe_b64encode(sha256(data).digest()).rstrip(b"=")
+    return "sha256=" + digest.decode("ascii")
+
+
+def clean_wheel(source, destination, current, today=None):
+    """Remove the deprecated source code in the wheel.
+
+    :param source: `str` Source wheel path.
+    :param destination: `str` Destination wheel path.
+    :param current: `str` Current version.
+    :param today: `date` Current date.
+    :returns: `List[str]` The deprecated members.
+    """
+    deprecated = []
+    records = {}
+
+    with zipfile.ZipFile(source, "r") as source_wheel, \
+            zipfile.ZipFile(destination, "w") as destination_wheel:
+        record_name = None
+
+        for info in source_wheel.infolist():
+            if info.filename.endswith(".dist-info/RECORD"):
+                record_name = info.filename
+                continue
+
+            data = source_wheel.read(info)
+            deprecated_data = deprecate_member(
+                info.filename, data, current=current, today=today
+            )
+
+            if deprecated_data is not None:
+                deprecated.append(info.filename)
+                data = deprecated_data
+
+            records[info.filename] = (record_hash(data), str(len(data)))
+            destination_wheel.writestr(info, data)
+
+        if record_name is None:
+            raise RuntimeError("Cannot find RECORD in the wheel %s" % source)
+
+        # Keep the order of the original records
+        source_record = source_wheel.read(record_name).decode("utf-8")
+        output = StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+
+        for row in csv.reader(StringIO(source_record)):
+            if row and row[0] in records:
+                row = [row[0]] + list(records[row[0]])
+            writer.writerow(row)
+
+        destination_wheel.writestr(
+            source_wheel.getinfo(record_name), output.getvalue()
+        )
+
+    return deprecated
+
+
+def clean_sdist(source, destination, current, today=None):
+    """Remove the deprecated source code in the source distribution.
+
+    :param source: `str` Source distribution path.
+    :param destination: `str` Destination path, of which the compression
+        follows the suffix.
+    :param current: `str` Current version.
+    :param today: `date` Current date.
+    :returns: `List[str]` The deprecated members.
+    """
+    deprecated = []
+    compression = destination.rsplit(".", 1)[-1]
+    mode = "w|" + {"tgz": "gz", "gz": "gz", "bz2": "bz2", "xz": "xz"}.get(
+        compression, ""
+    )
+
+    # Stream the archives, so the members are processed one by one
+    with tarfile.open(source, "r|*") as source_sdist, \
+            tarfile.open(destination, mode) as destination_sdist:
+        for info in source_sdist:
+            if not info.isfile():
+                destination_sdist.addfile(info)
+                continue
+
+            data = source_sdist.extractfile(info).read()
+            deprecated_data = deprecate_member(
+                info.name, data, current=current, today=today
+            )
+
+            if deprecated_data is not None:
+                deprecated.append(info.name)
+                data = deprecated_data
+                info.size = len(data)
+
+            destination_sdist.addfile(info, BytesIO(data))
+
+    return deprecated
+
+
+def clean_artifact(source, destination=None, current=None, today=None):
+    """Remove the deprecated source code in the wheel or sdist.
+
+    :param source: `str` Source artifact path.
+    :param destination: `str` Destination artifact path. The source is
+        replaced if it is not provided.
+    :param current: `str` Current version. Default is the version in the
+        artifact file name.
+    :param today: `date` Current date.
+    :returns: `List[str]` The deprecated members.
+    """
+    if current is None and today is None:
+        current = artifact_version(source)
+
+    if source.endswith(".whl"):
+        clean = clean_wheel
+    elif source.endswith(SDIST_SUFFIXES):
+        clean = clean_sdist
+    else:
+        raise RuntimeError("Unsupported artifact %s" % source)
+
+    if destination is not None:
+        return clean(source, destination, current=current, today=today)
+
+    # Replace the source after the artifact is fully written
+    with NamedTemporaryFile(
+        dir=dirname(source) or ".", suffix=_suffix(source), delete=False
+    ) as temp_file:
+        temp_path = temp_file.name
+
+    try:
+        deprecated = clean(source, temp_path, current=current, today=today)
+    except Exception:
+        remove(temp_path)
+        raise
+
+    replace(temp_path, source)
+    return deprecated
+
+
+def _suffix(path):
+    for suffix in (".whl",) + SDIST_SUFFIXES:
+        if path.endswith(suffix):
+            return suffix
+
+    return None
+
+
+def is_artifact(path):
+    """Check whether the path is a wheel or source distribution."""
+    return _suffix(path) is not None
+
+
+def artifact_version(path):
+    """Get the version from the artifact file name.
+
+    The file name is parsed from the right, as the project name of the
+    source distribution can contain the hyphens. For example, the version
+    of the wheel ``auto_deprecator-2020.5.0-py3-none-any.whl`` and the
+    source distribution ``auto-deprecator-2020.5.0.tar.gz`` is 2020.5.0.
+    """
+    name = basename(path)
+    suffix = _suffix(name)
+    if suffix is not None:
+        name = name[:-len(suffix)]
+
+    parts = name.split("-")
+
+    if suffix == ".whl":
+        # The name, the version, the optional build tag and the python,
+        # ABI and platform tags
+        if len(parts) not in (5, 6):
+            raise RuntimeError(
+                "Cannot find the version of the artifact %s" % path
+            )
+
+        return parts[1]
+
+    if len(parts) < 2:
+        raise RuntimeError("Cannot find the version of the artifact %s" % path)
+
+    return parts[-1]
@@ -0,0 +1,54 @@
+"""PEP 517 build backend shipping the artifacts without expired code.
+
+The backend wraps ``setuptools.build_meta``, and removes the deprecated
+source code from the built wheel and sdist, without modifying the source
+repository. The current version is the version of the built artifact,
+or the config setting ``auto-deprecate-version``.
+
+    [build-system]
+    requires = ["setuptools", "wheel", "auto_deprecator"]
+    build-backend = "auto_deprecator.build_backend"
+
+"""
+from os.path import join
+
+from setuptools import build_meta
+from setuptools.build_meta import (  # noqa: F401
+    get_requires_for_build_sdist,
+    get_requires_for_build_wheel,
+    prepare_metadata_for_build_wheel,
+)
+
+try:
+    # The editable installs of PEP 660 are built by setuptools 64 or later,
+    # and are not cleaned as they load the source repository
+    from setuptools.build_meta import (  # noqa: F401
+        build_editable,
+        get_requires_for_build_editable,
+        prepare_metadata_for_build_editable,
+    )
+except ImportError:
+    pass
+
+from auto_deprecator.artifact import clean_artifact
+
+VERSION_SETTING = "auto-deprecate-version"
+
+
+def _clean(directory, filename, config_settings):
+    current = (config_settings or {}).get(VERSION_SETTING)
+    clean_artifact(join(directory, filename), current=current)
+    return filename
+
+
+def build_wheel(
+        wheel_directory, config_settings=None, metadata_directory=None):
+    filename = build_meta.build_wheel(
+        wheel_directory, config_settings, metadata_directory
+    )
+    return _clean(wheel_directory, filename, config_settings)
+
+
+def build_sdist(sdist_directory, config_settings=None):
+    filename = build_meta.build_sdist(sdist_directory, config_settings)
+    return _clean(sdist_directory, filename, config_settings)
@@ -0,0 +1,954 @@
+"""Automatic removal of the deprecated source code.
+
+The deprecated components are removed by their spans, from the first
+decorator to the end of the component, including the comments indented in
+its body. The blank lines to the next statement are removed with the
+component, or the blank lines from the previous statement if it is the last
+one in the body, so the code and comments around are kept as they are. The
+spans are found in a single pass over the syntax tree, and the source is
+rebuilt in a single pass over the lines.
+"""
+import ast
+from bisect import bisect_left
+from datetime import date, datetime
+from io import BytesIO, StringIO
+import logging
+from os import walk
+from os.path import isfile, join
+from time import perf_counter
+from tokenize import tokenize, COMMENT
+
+from auto_deprecator import (
+    FunctionStage,
+    check_stage,
+    check_version_stage,
+    format_deprecation,
+    parse_expiry,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# The components which can be deprecated and contain the others
+NESTABLE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# Replace the deprecated components by the raising stubs, or collect the
+# module level ones into the module __getattr__
+STUB_MODES = ("def", "getattr")
+
+STUB_GETATTR_TEMPLATE = """
+
+
+# Removed by auto-deprecate
+_DEPRECATED_SYMBOLS = {{
+{symbols}
+}}
+
+
+class _DeprecatedSymbolError(AttributeError, RuntimeError):
+    pass
+
+
+def __getattr__(name):
+    if name in _DEPRECATED_SYMBOLS:
+        raise _DeprecatedSymbolError(_DEPRECATED_SYMBOLS[name])
+
+    raise AttributeError(
+        "module {{!r}} has no attribute {{!r}}".format(__name__, name)
+    )"""
+
+
+class CleanResult:
+    """Result of cleaning a file.
+
+    The result is true if the file is changed.
+    """
+
+    __slots__ = (
+        "filename",
+        "current",
+        "changed",
+        "symbols",
+        "stubbed",
+        "imports",
+        "arguments",
+        "bytes_before",
+        "bytes_after",
+        "timings",
+    )
+
+    def __init__(
+            self, filename, current=None, changed=False, symbols=None,
+            imports=None, arguments=None, bytes_before=0, bytes_after=0,
+            timings=None, stubbed=None):
+        """Constructor.
+
+        :param filename: `str` File path.
+        :param current: `str` Current version.
+        :param changed: `bool` Whether the file is changed.
+        :param symbols: `List[dict]` The removed symbols with the qualified
+            name (symbol), the start and end line numbers (start and end),
+            the expiry version (expiry) and the relocated name (relocate).
+        :param imports: `List[(int, int)]` The start and end line numbers
+            of the removed imports of the auto_deprecator.
+        :param arguments: `List[(str, str or int, str, str)]` The arguments
+            left to be removed by hand.
+        :param bytes_before: `int` Size of the source code before cleaning.
+        :param bytes_after: `int` Size of the source code after cleaning.
+        :param timings: `Dict[str, float]` The time of each stage, e.g.
+            read, analyze and write, in seconds.
+        :param stubbed: `List[dict]` The symbols replaced by the stubs
+            instead of removed, in the same form as the removed symbols.
+        """
+        self.filename = filename
+        self.current = current
+        self.changed = changed
+        self.symbols = symbols or []
+        self.stubbed = stubbed or []
+        self.imports = imports or []
+        self.arguments = arguments or []
+        self.bytes_before = bytes_before
+        self.bytes_after = bytes_after
+        self.timings = timings or {}
+
+    def __bool__(self):
+        return self.changed
+
+    def __repr__(self):
+        return "CleanResult(filename=%r, changed=%r, symbols=%d)" % (
+            self.filename, self.changed, len(self.symbols)
+        )
+
+    def to_dict(self):
+        """Convert the result into the JSON serializable object.
+
+        :returns: `dict` The result.
+        """
+        return {
+            "filename": self.filename,
+            "current": self.current,
+            "changed": self.changed,
+            "symbols": [dict(symbol) for symbol in self.symbols],
+            "stubbed": [dict(symbol) for symbol in self.stubbed],
+            "imports": [list(span) for span in self.imports],
+            "arguments": [
+                {
+                    "symbol": name,
+                    "argument": argument,
+                    "expiry": expiry,
+                    "relocate": relocate,
+                }
+                for name, argument, expiry, relocate in self.arguments
+            ],
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "timings": dict(self.timings),
+        }
+
+
+class SingleFileAutoDeprecator:
+    """Auto deprecator.
+    """
+
+    def __init__(self, filename, current, today=None, stub=None):
+        """Constructor.
+
+        :param filename: `str` File path.
+        :param current: `str` Current version.
+        :param today: `date` Current date. The components with the expiry
+            date are not removed if it is not provided.
+        :param stub: `str` Stub mode. The deprecated components are replaced
+            by the one-line functions raising the deprecation message (def),
+            or the module level ones are collected into the module
+            __getattr__ (getattr). The components are removed if it is not
+            provided.
+        """
+        assert stub is None or stub in STUB_MODES, (
+            'Invalid stub mode "%s"' % stub
+        )
+        self._filename = filename
+        self._current = current
+        self._today = today
+        self._stub = stub
+        self._deprecate_tokens = []
+        self._deprecate_token_rows = []
+        self._deprecated_symbols = []
+        self._deprecated_arguments = []
+        self._removed_symbols = []
+        self._stubbed_symbols = []
+        self._removed_imports = []
+        self._stubs = {}
+        self._getattr_symbols = []
+        self._has_module_getattr = False
+
+    @property
+    def deprecated_symbols(self):
+        """Symbols removed in the last run.
+
+        :returns: `List[(str, str, str)]` List of tuples of the qualified
+            name, the expiry version and the relocated function name.
+        """
+        return list(self._deprecated_symbols)
+
+    @property
+    def deprecated_arguments(self):
+        """Arguments to be removed found in the last run.
+
+        The functions with the deprecated arguments are not removed, so
+        the arguments are left to be removed by hand.
+
+        :returns: `List[(str, str or int, str, str)]` List of tuples of
+            the qualified function name, the keyword name or positional
+            index, the expiry version and the relocated keyword name.
+        """
+        return list(self._deprecated_arguments)
+
+    @staticmethod
+    def is_nestable(body):
+        return isinstance(body, NESTABLE_TYPES)
+
+    @staticmethod
+    def is_deprecator_import(body):
+        return (
+            isinstance(body, ast.ImportFrom)
+            and body.module is not None
+            and "auto_deprecator" in body.module
+        )
+
+    @classmethod
+    def get_body_deprecate_deprecator(cls, body):
+        def has_deprecate_decorator(decorator):
+            if not hasattr(decorator, 'func'):
+                return False
+
+            if (hasattr(decorator.func, 'id') and
+                    decorator.func.id == 'deprecate'):
+                return True
+            elif (hasattr(decorator.func, 'attr') and
+                    decorator.func.attr == 'deprecate'):
+                return True
+
+            return False
+
+        if not hasattr(body, "decorator_list"):
+            return None
+
+        deprecate_list = [
+            d for d in body.decorator_list
+            if has_deprecate_decorator(d)
+        ]
+
+        if len(deprecate_list) == 0:
+            return None
+
+        assert len(deprecate_list) == 1, (
+            "More than one deprecate decorator is found "
+            'in the function "{func}"'.format(func=body.func.name)
+        )
+
+        return deprecate_list[0]
+
+    @classmethod
+    def get_function_lineno(cls, body):
+        if hasattr(body, "decorator_list") and len(body.decorator_list) > 0:
+            return body.decorator_list[0].lineno
+        else:
+            return body.lineno
+
+    @classmethod
+    def get_deprecate_tokens(cls, file_content):
+        """Get deprecate tokens.
+
+        :returns: `List[(int, int, str)]` List of tuples of which
+            the first and second is the start and end of the line
+            number, and the third is the expiry version.
+        """
+        if "auto-deprecate" not in file_content:
+            return []
+
+        source_tokens = list(
+            tokenize(BytesIO(file_content.encode('utf-8')).readline)
+        )
+
+        deprecate_tokens = []
+
+        for (t_type, t_string,
+             (srow, _), (erow, _), _) in source_tokens:
+            if t_type != COMMENT:
+                continue
+
+            t_string = t_string.lstrip('# ')
+            if not t_string.startswith('auto-deprecate:'):
+                continue
+
+            expiry = t_string.replace('auto-deprecate:', '').strip(' ')
+            assert 'expiry=' in expiry, (
+                "Invalid auto-deprecate option (%s)" % expiry
+            )
+
+            expiry = expiry.replace('expiry=', '').strip(' ')
+
+            deprecate_tokens.append((srow, erow, expiry))
+
+        return deprecate_tokens
+
+    def _load_deprecate_tokens(self, file_content):
+        self._deprecate_tokens = self.get_deprecate_tokens(file_content)
+        self._deprecate_token_rows = [
+            srow for (srow, _, _) in self._deprecate_tokens
+        ]
+
+    def get_deprecate_expiry_from_comment(
+            self, body, start_lineno, end_lineno):
+        """Get deprecate expiry from comment.
+
+        The comment should be like
+
+            # auto-deprecate: expiry=2.0.0
+
+        and located in the function in the first place, after
+        the docstring.
+
+        For example,
+
+            def abc():
+                \"\"\"Abc.\"\"\"
+                # auto-deprecate: expiry=2.0.0
+                pass
+
+        is valid, but not
+
+            def abc()
+                \"\"\"Abc.\"\"\"
+                print('hello world')
+                # auto-deprecate: expiry=2.0.0
+                pass
+
+        """
+        if hasattr(body, 'body'):
+            for inner_body in body.body:
+                end_lineno = self.get_function_lineno(inner_body)
+                if self.is_nestable(inner_body):
+                    break
+
+        # The tokens are sorted by the start row
+        index = bisect_left(self._deprecate_token_rows, start_lineno)
+
+        for (srow, erow, expiry) in self._deprecate_tokens[index:]:
+            if srow >= end_lineno:
+                break
+
+            if erow < end_lineno:
+                return expiry
+
+        return None
+
+    @classmethod
+    def get_expiry_value(cls, node):
+        """Get the expiry value from the syntax node.
+
+        The expiry is either a string, e.g. "2.0.0" or "2021-01-01", or
+        the date constructed by the literals, e.g. date(2021, 1, 1) or
+        datetime.datetime(2021, 1, 1, 12, 0).
+
+        :returns: `str` Expiry version or date in the ISO format, or
+            None if it is not a literal.
+        """
+        if isinstance(node, ast.Call):
+            func_name = getattr(node.func, "id", None) or getattr(
+                node.func, "attr", None
+            )
+            values = [cls.get_literal_value(arg) for arg in node.args]
+
+            if (
+                func_name not in ("date", "datetime")
+                or node.keywords
+                or not all(isinstance(v, int) for v in values)
+            ):
+                return None
+
+            if func_name == "date":
+                return date(*values).isoformat()
+
+            return datetime(*values).isoformat()
+
+        expiry = cls.get_literal_value(node)
+        return expiry if isinstance(expiry, str) else None
+
+    @staticmethod
+    def get_literal_value(node):
+        """Get the value of the literal syntax node.
+
+        :returns: The literal value, or None if it is not a literal.
+        """
+        if isinstance(node, ast.Constant):
+            return node.value
+
+        # Python 3.7 or before
+        return getattr(node, "s", getattr(node, "n", None))
+
+    @classmethod
+    def check_expiry_stage(cls, expiry, current=None, today=None):
+        """Check the stage of the expiry without the clock.
+
+        :param expiry: `str` Expiry version or date.
+        :param current: `str` Current version.
+        :param today: `date` Current date.
+        :returns: `int` The stage, or the warning stage if the current
+            version or date is not provided for the type of the expiry.
+        """
+        expiry = parse_expiry(expiry)
+
+        if isinstance(expiry, date):
+            if today is None:
+                return FunctionStage.WARNING
+
+            return check_stage(expiry=expiry, today=today)
+
+        if expiry is None or current is None:
+            return FunctionStage.WARNING
+
+        # The current version of the file is given explicitly, e.g. by the
+        # version map, so it is not overridden by the process-wide version
+        return check_version_stage(expiry, current)
+
+    @classmethod
+    def get_body_deprecate_relocate(cls, body):
+        """Get the relocated function / method name of the body.
+
+        :returns: `str` Relocated name, or None if it is not specified
+            in the deprecate decorator.
+        """
+        deprecate_decorator = cls.get_body_deprecate_deprecator(body)
+
+        if deprecate_decorator is None:
+            return None
+
+        for keyword in deprecate_decorator.keywords:
+            if keyword.arg == "relocate":
+                return cls.get_literal_value(keyword.value)
+
+        return None
+
+    @classmethod
+    def get_body_deprecate_arguments(cls, body):
+        """Get the deprecated arguments of the body.
+
+        :returns: `Dict[str or int, str]` The deprecated arguments and
+            their relocated keyword names, which are empty if they are not
+            literals, or None if the arguments are not deprecated.
+        """
+        deprecate_decorator = cls.get_body_deprecate_deprecator(body)
+
+        if deprecate_decorator is None:
+            return None
+
+        for keyword in deprecate_decorator.keywords:
+            if keyword.arg != "args":
+                continue
+
+            try:
+                arguments = ast.literal_eval(keyword.value)
+            except ValueError:
+                return {}
+
+            return arguments if isinstance(arguments, dict) else {}
+
+        return None
+
+    def get_body_deprecate_expiry(
+            self, body, start_lineno, end_lineno):
+        """Get the expiry version of the body.
+
+        :returns: `str` Expiry version, or None if the component is
+            deprecated without the expiry, e.g. only its arguments.
+        """
+        if not isinstance(body, NESTABLE_TYPES):
+            return None
+
+        deprecate_decorator = self.get_body_deprecate_deprecator(body)
+
+        if deprecate_decorator is not None:
+            keywords = {
+                k.arg: self.get_expiry_value(k.value)
+                for k in deprecate_decorator.keywords
+            }
+
+            return (
+                self.get_expiry_value(deprecate_decorator.args[0])
+                if deprecate_decorator.args
+                else keywords.get("expiry")
+            )
+
+        expiry = self.get_deprecate_expiry_from_comment(
+            body, start_lineno, end_lineno
+        )
+
+        return expiry
+
+    def find_deprecated_spans(self, tree, lines, prefix, spans):
+        """Find the spans of the deprecated components in the body.
+
+        The inner components are only searched if the outer component is
+        kept.
+
+        :param tree: `ast.AST` The module or the component.
+        :param lines: `List[str]` The source lines.
+        :param prefix: `str` The qualified name prefix of the components.
+        :param spans: `List[(int, int)]` The spans, i.e. the start
+            (inclusive) and end (exclusive) line numbers, which the found
+            spans are appended to.
+        :returns: `(bool, bool)` Whether all the statements of the body are
+            removed, and whether any deprecate decorator is kept.
+        """
+        body = tree.body
+        removed = 0
+        has_deprecator = False
+
+        for index, node in enumerate(body):
+            if not self.is_nestable(node):
+                continue
+
+            start_lineno = self.get_function_lineno(node)
+            expiry = self.get_body_deprecate_expiry(
+                node, start_lineno, node.end_lineno + 1
+            )
+            stage = self.check_expiry_stage(
+                expiry=expiry, current=self._current, today=self._today
+            )
+            name = prefix + node.name
+            arguments = self.get_body_deprecate_arguments(node)
+
+            if arguments is None and stage == FunctionStage.CLEANING:
+                relocate = self.get_body_deprecate_relocate(node)
+                end_lineno = self.get_end_lineno(node, lines)
+                self._deprecated_symbols.append((name, expiry, relocate))
+
+                # The symbols replaced by the stubs can still be imported
+                removed_symbols = (
+                    self._removed_symbols if self._stub is None
+                    else self._stubbed_symbols
+                )
+                removed_symbols.append({
+                    "symbol": name,
+                    "start": start_lineno,
+                    "end": end_lineno,
+                    "expiry": expiry,
+                    "relocate": relocate,
+                })
+
+                # The collected symbols are kept by name, as their spans
+                # can be extended and merged with the others
+                if self.is_collected(name):
+                    self._getattr_symbols.append((
+                        name,
+                        format_deprecation(name, expiry, relocate=relocate),
+                    ))
+                elif self._stub is not None:
+                    self._stubs[start_lineno] = (
+                        name, node.lineno, expiry, relocate
+                    )
+
+                if self.is_collected(name) or self._stub is None:
+                    spans.append(self.get_removed_span(body, index, lines))
+                else:
+                    # The stub replaces only the lines of the component
+                    spans.append((start_lineno, end_lineno + 1))
+
+                removed += 1
+                continue
+
+            # Only the arguments are deprecated, so the function is kept
+            if arguments is not None and stage == FunctionStage.CLEANING:
+                self._deprecated_arguments += [
+                    (name, argument, expiry, relocate)
+                    for argument, relocate in arguments.items()
+                ]
+
+            inner_spans = []
+            is_empty, inner_deprecator = self.find_deprecated_spans(
+                node, lines, name + ".", inner_spans
+            )
+
+            # Remove the component if no statement is left in its body. The
+            # component is kept with the stubs
+            if is_empty and self._stub is None:
+                spans.append(self.get_removed_span(body, index, lines))
+                removed += 1
+                continue
+
+            spans += inner_spans
+            has_deprecator = (
+                has_deprecator
+                or inner_deprecator
+                or self.get_body_deprecate_deprecator(node) is not None
+            )
+
+        return removed == len(body), has_deprecator
+
+    def is_collected(self, name):
+        """Check whether the symbol is collected into the module
+        __getattr__ instead of the stub."""
+        return (
+            self._stub == "getattr"
+            and "." not in name
+            and not self._has_module_getattr
+        )
+
+    @staticmethod
+    def get_end_lineno(node, lines):
+        """Get the end line number of the component.
+
+        The comments indented in the body after the last statement are
+        included.
+
+        :param node: `ast.AST` The component.
+        :param lines: `List[str]` The source lines.
+        :returns: `int` The end line number (inclusive).
+        """
+        end_lineno = lineno = node.end_lineno
+
+        while lineno < len(lines):
+            line = lines[lineno]
+            stripped = line.strip()
+            lineno += 1
+
+            if not stripped:
+                continue
+
+            indent = len(line) - len(line.lstrip())
+            if not stripped.startswith("#") or indent <= node.col_offset:
+                break
+
+            end_lineno = lineno
+
+        return end_lineno
+
+    def get_removed_span(self, body, index, lines):
+        """Get the span of the removed statement with the blank lines.
+
+        The blank lines to the next statement are removed with the
+        statement, or the blank lines from the previous statement if it is
+        the last one in the body, so the next statement is still separated
+        by the same blank lines.
+
+        :param body: `List[ast.AST]` The statements of the body.
+        :param index: `int` The index of the removed statement.
+        :param lines: `List[str]` The source lines.
+        :returns: `(int, int)` The start (inclusive) and end (exclusive)
+            line numbers.
+        """
+        node = body[index]
+        start_lineno = self.get_function_lineno(node)
+        end_lineno = self.get_end_lineno(node, lines) + 1
+
+        if index + 1 < len(body):
+            while (
+                end_lineno <= len(lines)
+                and not lines[end_lineno - 1].strip()
+            ):
+                end_lineno += 1
+        else:
+            while start_lineno > 1 and not lines[start_lineno - 2].strip():
+                start_lineno -= 1
+
+        return start_lineno, end_lineno
+
+    def get_import_spans(self, tree, lines):
+        """Get the spans of the imports of the auto_deprecator.
+
+        The imports sharing the lines with the other statements are kept.
+
+        :param tree: `ast.Module` The module.
+        :param lines: `List[str]` The source lines.
+        :returns: `List[(int, int)]` The spans.
+        """
+        body = tree.body
+        spans = []
+
+        for index, node in enumerate(body):
+            if not self.is_deprecator_import(node):
+                continue
+
+            if (
+                (index > 0 and body[index - 1].end_lineno == node.lineno)
+                or (
+                    index + 1 < len(body)
+                    and body[index + 1].lineno == node.end_lineno
+                )
+            ):
+                continue
+
+            self._removed_imports.append((node.lineno, node.end_lineno))
+            spans.append(self.get_removed_span(body, index, lines))
+
+        return spans
+
+    def find_deprecate_markers(self, file_content):
+        """Find the deprecate markers in the source code.
+
+        The markers are either the deprecate decorators or the
+        auto-deprecate comments. The decorator deprecating the arguments
+        has a marker of each argument, of which the symbol is the function
+        name with the argument, e.g. hello(name).
+
+        :param file_content: `str` Source code of the file.
+        :returns: `List[dict]` The markers with the qualified name
+            (symbol), the start and end line numbers (start and end),
+            the expiry version (expiry), the relocated name (relocate)
+            and the marker type (decorator, comment or argument).
+        """
+        tree = ast.parse(file_content)
+        self._load_deprecate_tokens(file_content)
+        last_lineno = len(StringIO(file_content, newline="").readlines()) + 1
+        markers = []
+        self._find_deprecate_markers(tree, last_lineno, "", markers)
+        return markers
+
+    def _find_deprecate_markers(self, tree, last_lineno, prefix, markers):
+        for index, body in enumerate(tree.body):
+            start_lineno = self.get_function_lineno(body)
+
+            if index != len(tree.body) - 1:
+                end_lineno = self.get_function_lineno(
+                    tree.body[index + 1]
+                )
+            else:
+                end_lineno = last_lineno
+
+            expiry = self.get_body_deprecate_expiry(
+                body, start_lineno, end_lineno
+            )
+
+            arguments = self.get_body_deprecate_arguments(body)
+
+            if expiry is not None and arguments is not None:
+                for argument, relocate in arguments.items():
+                    markers.append({
+                        "symbol": "%s(%s)" % (prefix + body.name, argument),
+                        "start": start_lineno,
+                        "end": getattr(body, "end_lineno", end_lineno - 1),
+                        "expiry": expiry,
+                        "relocate": relocate,
+                        "marker": "argument",
+                    })
+            elif expiry is not None:
+                is_decorator = (
+                    self.get_body_deprecate_deprecator(body) is not None
+                )
+                markers.append({
+                    "symbol": prefix + body.name,
+                    "start": start_lineno,
+                    "end": getattr(body, "end_lineno", end_lineno - 1),
+                    "expiry": expiry,
+                    "relocate": self.get_body_deprecate_relocate(body),
+                    "marker": "decorator" if is_decorator else "comment",
+                })
+
+            if self.is_nestable(body):
+                self._find_deprecate_markers(
+                    body, end_lineno, prefix + body.name + ".", markers
+                )
+
+    def get_deprecated_lines(self, file_content):
+        """Get the lines of the deprecated components.
+
+        :param file_content: `str` Source code of the file.
+        :returns: `List[(int, int)]` List of tuples of the start (inclusive)
+            and end (exclusive) line numbers, sorted backward.
+        """
+        self._deprecated_symbols = []
+        self._deprecated_arguments = []
+        self._removed_symbols = []
+        self._stubbed_symbols = []
+        self._removed_imports = []
+        self._stubs = {}
+        self._getattr_symbols = []
+
+        assert self._current is not None or self._today is not None, (
+            "Current version or date must be provided"
+        )
+
+        # Split the lines without translating the line endings
+        lines = StringIO(file_content, newline="").readlines()
+        tree = ast.parse(file_content)
+        self._has_module_getattr = any(
+            isinstance(body, (ast.FunctionDef, ast.AsyncFunctionDef))
+            and body.name == "__getattr__"
+            for body in tree.body
+        )
+        self._load_deprecate_tokens(file_content)
+
+        spans = []
+        _, has_deprecator = self.find_deprecated_spans(tree, lines, "", spans)
+
+        if not spans:
+            return []
+
+        # Remove the import of the auto_deprecator if no more
+        # deprecate decorator is found
+        if not has_deprecator:
+            spans += self.get_import_spans(tree, lines)
+
+        # Merge the spans sharing the blank lines
+        merged_spans = []
+        for start_lineno, end_lineno in sorted(spans):
+            if merged_spans and start_lineno < merged_spans[-1][1]:
+                merged_spans[-1] = (
+                    merged_spans[-1][0], max(end_lineno, merged_spans[-1][1])
+                )
+            else:
+                merged_spans.append((start_lineno, end_lineno))
+
+        return merged_spans[::-1]
+
+    def deprecate_source(self, file_content):
+        """Deprecate the source code.
+
+        :param file_content: `str` Source code of the file.
+        :returns: `str` The source code without the deprecated
+            components, or None if nothing is deprecated.
+        """
+        deprecated_lines = self.get_deprecated_lines(file_content)
+
+        if not deprecated_lines:
+            return None
+
+        lines = StringIO(file_content, newline="").readlines()
+        filestream = []
+        lineno = 1
+
+        for start_lineno, end_lineno in reversed(deprecated_lines):
+            filestream += lines[lineno - 1 : start_lineno - 1]
+            filestream += self.get_stub_lines(
+                lines[start_lineno - 1 : end_lineno - 1], start_lineno
+            )
+            lineno = end_lineno
+
+        filestream += lines[lineno - 1 :]
+
+        # Remove the blank lines at the end, and keep the line ending of
+        # the file
+        last_line = lines[-1]
+        line_ending = last_line[len(last_line.rstrip("\r\n")):]
+        while filestream and not filestream[-1].strip():
+            filestream.pop()
+
+        file_content = "".join(filestream).rstrip("\r\n")
+
+        if self._getattr_symbols:
+            file_content += STUB_GETATTR_TEMPLATE.format(
+                symbols="\n".join(
+                    "    %r: %r," % symbol
+                    for symbol in self._getattr_symbols
+                )
+            )
+            file_content = file_content.lstrip("\n")
+
+        if file_content:
+            file_content += line_ending
+
+        return file_content
+
+    def get_stub_lines(self, lines, start_lineno):
+        """Get the stub lines replacing the deprecated lines.
+
+        :param lines: `List[str]` The deprecated lines.
+        :param start_lineno: `int` The start line number.
+        :returns: `List[str]` The stub lines, which is empty if the lines
+            are removed.
+        """
+        if start_lineno not in self._stubs:
+            return []
+
+        name, def_lineno, expiry, relocate = self._stubs[start_lineno]
+        message = format_deprecation(name, expiry, relocate=relocate)
+
+        def_line = lines[def_lineno - start_lineno]
+        indent = def_line[: len(def_line) - len(def_line.lstrip())]
+
+        # Keep the blank lines to the next component
+        blank_lines = []
+        for line in reversed(lines[def_lineno - start_lineno + 1 :]):
+            if line.strip():
+                break
+
+            blank_lines.insert(0, line)
+
+        stub_line = "%sdef %s(*args, **kwargs): raise RuntimeError(%r)\n" % (
+            indent, name.rsplit(".", 1)[-1], message
+        )
+        return [stub_line] + blank_lines
+
+    def make_result(self, file_content, deprecated_content, timings=None):
+        """Make the result of the last run.
+
+        :param file_content: `str` Source code of the file.
+        :param deprecated_content: `str` The deprecated source code, or
+            None if nothing is deprecated.
+        :param timings: `Dict[str, float]` The time of each stage.
+        :returns: `CleanResult` The result.
+        """
+        bytes_before = len(file_content.encode("utf-8"))
+        bytes_after = bytes_before
+        if deprecated_content is not None:
+            bytes_after = len(deprecated_content.encode("utf-8"))
+
+        return CleanResult(
+            self._filename,
+            current=self._current,
+            changed=deprecated_content is not None,
+            symbols=[dict(symbol) for symbol in self._removed_symbols],
+            stubbed=[dict(symbol) for symbol in self._stubbed_symbols],
+            imports=list(self._removed_imports),
+            arguments=self.deprecated_arguments,
+            bytes_before=bytes_before,
+            bytes_after=bytes_after,
+            timings=timings,
+        )
+
+    def run(self):
+        """Deprecate the file.
+
+        :returns: `CleanResult` The result, which is true if the file is
+            changed.
+        """
+        LOGGER.info('Deprecating the file %s', self._filename)
+        timings = {}
+
+        # Read file stream
+        start = perf_counter()
+        with open(self._filename, "r") as source_file:
+            file_content = source_file.read()
+        timings["read"] = perf_counter() - start
+
+        start = perf_counter()
+        deprecated_content = self.deprecate_source(file_content)
+        timings["analyze"] = perf_counter() - start
+
+        # Write back the file
+        if deprecated_content is not None:
+            start = perf_counter()
+            with open(self._filename, "w+") as source_file:
+                source_file.write(deprecated_content)
+            timings["write"] = perf_counter() - start
+
+        return self.make_result(file_content, deprecated_content, timings)
+
+
+def iter_python_files(path):
+    """Iterate the Python source files in the path.
+
+    :param path: `str` File or directory path.
+    :returns: `Iterator[str]` Python file paths.
+    """
+    if isfile(path):
+        yield path
+        return
+
+    for root, subdirs, files in walk(path):
+        LOGGER.debug('Walk through root %s with files %s', root, files)
+        for python_file in files:
+            if python_file[-3:] != '.py':
+                continue
+
+            yield join(root, python_file)
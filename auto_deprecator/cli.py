@@ -0,0 +1,242 @@
+"""Command line interface."""
+import argparse
+from datetime import date
+import json
+import logging
+import sys
+from time import perf_counter
+
+from auto_deprecator import parse_expiry
+from auto_deprecator.artifact import clean_artifact, is_artifact
+from auto_deprecator.cleaner import STUB_MODES, iter_python_files
+from auto_deprecator.pipeline import DEFAULT_IN_FLIGHT, CleanSummary, clean
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # Subcommands
+    if argv[:1] == ["timeline"]:
+        from auto_deprecator.timeline import main as timeline_main
+        return timeline_main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Automatical removal of deprecated source code."
+    )
+    parser.add_argument(
+        "path", type=str, nargs="?", help="The source code path.")
+    parser.add_argument(
+        "--version", dest="current", type=str, help="Current package version."
+    )
+    parser.add_argument(
+        "--version-map", dest="version_map", type=str,
+        help="The JSON file of the current versions by the path prefixes, "
+             "relative to the file. The files not matched use --version.",
+    )
+    parser.add_argument(
+        "--auto-version", dest="auto_version", action="store_true",
+        help="Detect the current version of each file by the __version__ "
+             "of its top level package, if it is not in the version map.",
+    )
+    parser.add_argument(
+        "--date", dest="today", type=str,
+        help="Current date in the ISO format, e.g. 2021-01-01. The "
+             "components with the expiry date before it are removed.",
+    )
+    parser.add_argument(
+        "--debug", dest="debug", help='Debug mode', action='store_true',
+    )
+    parser.add_argument(
+        "--stub", dest="stub", default=None, choices=STUB_MODES,
+        help="Replace the deprecated components by the one-line functions "
+             "raising the deprecation message (def), or collect the module "
+             "level ones into the module __getattr__ (getattr), instead of "
+             "removing them.",
+    )
+    parser.add_argument(
+        "--check-imports", dest="check_imports", action="store_true",
+        help="Report the imports and references of the removed symbols "
+             "in the other modules.",
+    )
+    parser.add_argument(
+        "--fix-imports", dest="fix_imports", action="store_true",
+        help="Remove the imports of the removed symbols in the other "
+             "modules, or replace them by the relocated symbols.",
+    )
+    parser.add_argument(
+        "--jobs", dest="jobs", type=int,
+        help="Number of the processes to clean the files and index the "
+             "symbols.",
+    )
+    parser.add_argument(
+        "--in-flight", dest="in_flight", type=int, default=DEFAULT_IN_FLIGHT,
+        help="Maximum number of the files read ahead or analyzed at the "
+             "same time.",
+    )
+    parser.add_argument(
+        "--jsonl", dest="jsonl", type=str,
+        help="Write the result of each file, i.e. the removed symbols and "
+             "imports, the sizes and the timings, as a JSON line to the "
+             "file, or the standard output if it is -.",
+    )
+    parser.add_argument(
+        "--build-manifest", dest="manifest", type=str,
+        help="Build the manifest file of the deprecate markers instead of "
+             "removing the deprecated source code.",
+    )
+    parser.add_argument(
+        "--output", dest="output", type=str,
+        help="The output path if the source code path is a wheel or "
+             "source distribution. Default is to replace it.",
+    )
+    parser.add_argument(
+        "--watch", dest="watch", action="store_true",
+        help="Watch the source code and report the changes of the "
+             "components to remove, without removing them.",
+    )
+    parser.add_argument(
+        "--interval", dest="interval", type=float, default=1.0,
+        help="Interval in seconds between the polls in the watch mode.",
+    )
+    parser.add_argument(
+        "--serve", dest="serve", action="store_true",
+        help="Serve the JSON-RPC requests on the standard input / output, "
+             "or the Unix domain socket if --socket is provided.",
+    )
+    parser.add_argument(
+        "--socket", dest="socket", type=str,
+        help="The Unix domain socket path of the server.",
+    )
+    args = parser.parse_args(argv)
+
+    # Set up logger
+    level = logging.DEBUG if args.debug else logging.INFO
+    logging.basicConfig(level=level, format='%(asctime)-15s %(message)s')
+
+    if args.serve:
+        from auto_deprecator.server import serve
+        serve(current=args.current, socket_path=args.socket)
+        return
+
+    # Get the argument values
+    path = args.path
+    current = args.current
+    assert path, "Source code path is not provided"
+
+    if args.manifest:
+        from auto_deprecator.manifest import build_manifest
+        build_manifest(path, args.manifest, package_version=current)
+        return
+
+    today = parse_expiry(args.today)
+    assert today is None or isinstance(today, date), (
+        'Invalid date "%s"' % args.today
+    )
+
+    if is_artifact(path):
+        # The current version is the artifact version if not provided
+        clean_artifact(
+            path, destination=args.output, current=current, today=today
+        )
+        return
+
+    versions = None
+    if args.version_map or args.auto_version:
+        from auto_deprecator.version_map import VersionMap
+
+        if args.version_map:
+            versions = VersionMap.load(
+                args.version_map, auto=args.auto_version, default=current
+            )
+        else:
+            versions = VersionMap(auto=True, default=current)
+
+    assert current or today or versions is not None, (
+        "Current version or date is not provided"
+    )
+
+    if args.watch:
+        assert versions is None, "Version map is not supported in watch mode"
+        from auto_deprecator.watch import watch
+        watch(path, current=current, today=today, interval=args.interval)
+        return
+
+    python_files = None
+    index = None
+
+    # Index the symbols before they are removed
+    if args.check_imports or args.fix_imports:
+        from auto_deprecator.index import SymbolIndex, fix_imports
+        python_files = list(iter_python_files(path))
+        index = SymbolIndex.build(python_files, jobs=args.jobs)
+
+    removed = {}
+    summary = CleanSummary()
+    start = perf_counter()
+
+    jsonl_file = None
+    if args.jsonl == "-":
+        jsonl_file = sys.stdout
+    elif args.jsonl:
+        jsonl_file = open(args.jsonl, "w")
+
+    try:
+        for result in clean(
+            path,
+            current=current,
+            versions=versions,
+            today=today,
+            stub=args.stub,
+            jobs=args.jobs,
+            in_flight=args.in_flight,
+            filenames=python_files,
+        ):
+            summary.add(result.record)
+
+            if jsonl_file is not None:
+                jsonl_file.write(json.dumps(result.record.to_dict()) + "\n")
+
+            process_result(result, index, removed)
+    finally:
+        if jsonl_file is not None and jsonl_file is not sys.stdout:
+            jsonl_file.close()
+
+    LOGGER.info("%s in %.3f seconds", summary, perf_counter() - start)
+
+    if index is not None and removed:
+        fix_imports(index, removed, write=args.fix_imports)
+
+
+def process_result(result, index, removed):
+    """Report the expired arguments and collect the removed symbols.
+
+    :param result: `FileResult` The result of the file.
+    :param index: `SymbolIndex` The symbol index, or None if the imports
+        are not checked.
+    :param removed: `Dict[(str, str), str]` The relocated names by the
+        module and the removed symbol, which the symbols are added to.
+    """
+    # The functions are kept, so only their arguments are reported
+    for name, argument, expiry, _ in result.arguments:
+        LOGGER.warning(
+            "The argument %s of %s in %s is expired on %s and should be "
+            "removed", argument, name, result.filename, expiry,
+        )
+
+    if index is None:
+        return
+
+    # The stubs are kept, so their imports still resolve
+    stubbed = {symbol["symbol"] for symbol in result.record.stubbed}
+    module = index.module_of(result.filename)
+    for name, _, relocate in result.symbols:
+        # Only the module level symbols can be imported
+        if "." not in name and name not in stubbed:
+            removed[(module, name)] = relocate
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Lightweight client of the deprecator server.
+
+The client only sends the request to the running server, i.e.
+``auto-deprecate --serve --socket <path>``, and prints the deprecated
+symbols, so it starts much faster than the full command.
+"""
+import argparse
+import json
+from os import environ
+from os.path import abspath
+import socket
+import sys
+
+SOCKET_ENV = "AUTO_DEPRECATE_SOCKET"
+
+
+def request(socket_path, method, params=None, request_id=1):
+    """Send a request to the server.
+
+    :param socket_path: `str` The Unix domain socket path of the server.
+    :param method: `str` The method name, e.g. analyze or clean.
+    :param params: `dict` The method parameters.
+    :returns: The result of the method.
+    """
+    message = json.dumps({
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": method,
+        "params": params or {},
+    })
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall(message.encode("utf-8") + b"\n")
+        conn.shutdown(socket.SHUT_WR)
+
+        with conn.makefile("r", encoding="utf-8") as reader:
+            response = json.loads(reader.readline())
+
+    if "error" in response:
+        raise RuntimeError(
+            "Server error (%s): %s" % (
+                response["error"]["code"], response["error"]["message"]
+            )
+        )
+
+    return response["result"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Client of the auto-deprecate server."
+    )
+    parser.add_argument(
+        "paths", type=str, nargs="+", help="The source code paths.")
+    parser.add_argument(
+        "--version", dest="current", type=str, help="Current package version."
+    )
+    parser.add_argument(
+        "--socket", dest="socket", type=str,
+        default=environ.get(SOCKET_ENV),
+        help="The Unix domain socket path of the server. Default is the "
+             "environment variable %s." % SOCKET_ENV,
+    )
+    parser.add_argument(
+        "--clean", dest="clean", action="store_true",
+        help="Remove the deprecated source code instead of reporting it.",
+    )
+    args = parser.parse_args(argv)
+    assert args.socket, "Server socket path is not provided"
+
+    params = {"paths": [abspath(path) for path in args.paths]}
+    if args.current:
+        params["version"] = args.current
+
+    results = request(
+        args.socket, "clean" if args.clean else "analyze", params
+    )
+
+    status = 0
+
+    for result in results:
+        # The files which cannot be processed are reported with the error
+        if "error" in result:
+            sys.stderr.write("%s: %s\n" % (result["path"], result["error"]))
+            status = 1
+            continue
+
+        for symbol in result["symbols"]:
+            sys.stdout.write("%s: %s (expiry %s)\n" % (
+                result["path"], symbol["name"], symbol["expiry"]
+            ))
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Asynchronous deprecation handlers.
+
+The warning and error handlers are called in the thread calling the
+deprecated function. The asynchronous handler moves the handler off the
+calling thread, so the handlers shipping the messages to the logging
+backend do not add the latency to the deprecated calls.
+
+For example,
+
+    from auto_deprecator import deprecate
+    from auto_deprecator.handlers import AsyncHandler
+
+    warn_handler = AsyncHandler(LOGGER.warning, policy="coalesce")
+
+    @deprecate(expiry="2.1.0", warn_handler=warn_handler)
+    def old_hello_world():
+        pass
+
+"""
+import atexit
+from collections import deque
+import logging
+import os
+import threading
+import time
+import weakref
+
+LOGGER = logging.getLogger(__name__)
+
+# Policies on the pending messages
+POLICIES = ("drop", "coalesce")
+
+# Timeout in seconds of flushing all the handlers on exit
+EXIT_FLUSH_TIMEOUT = 5.0
+
+# Live handlers, which are flushed on exit and reset in the forked child
+_HANDLERS = weakref.WeakSet()
+
+
+class AsyncHandler:
+    """Handler delivering the messages in a background thread.
+
+    The messages are queued in a bounded queue, and delivered to the
+    handler in batches by a daemon thread, which is started on the first
+    message. The new messages are dropped if the queue is full. With the
+    coalesce policy, the messages identical to a pending one are
+    delivered once. The pending messages are flushed on exit, waiting
+    for at most ``EXIT_FLUSH_TIMEOUT`` seconds in total.
+    """
+
+    def __init__(self, handler, maxsize=1024, policy="drop"):
+        """Constructor.
+
+        :param handler: `Callable[msg]` The handler with message as the
+            parameter.
+        :param maxsize: `int` The maximum number of the pending messages.
+        :param policy: `str` The policy on the pending messages, either
+            drop or coalesce.
+        """
+        assert maxsize > 0, "Maximum size must be positive"
+        assert policy in POLICIES, 'Invalid policy "%s"' % policy
+        self.handler = handler
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self._queue = deque()
+        self._pending = set()
+        self._condition = threading.Condition(threading.Lock())
+        self._thread = None
+        self._busy = False
+        self._closed = False
+        _HANDLERS.add(self)
+
+    def __call__(self, msg):
+        """Queue the message.
+
+        :param msg: `str` The message.
+        """
+        with self._condition:
+            if self._closed:
+                self.dropped += 1
+                return
+
+            if self.policy == "coalesce" and msg in self._pending:
+                self.coalesced += 1
+                return
+
+            if len(self._queue) >= self.maxsize:
+                self.dropped += 1
+                return
+
+            self._queue.append(msg)
+            self._pending.add(msg)
+
+            # The thread is not inherited by the forked process, so it is
+            # checked on every message
+            if self._thread is None or not self._thread.is_alive():
+                self._start()
+
+            self._condition.notify()
+
+    def _start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="auto-deprecator-handler", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._busy = False
+                    self._condition.notify_all()
+                    self._condition.wait()
+
+                if not self._queue:
+                    self._busy = False
+                    self._condition.notify_all()
+                    return
+
+                # Take all the pending messages as a batch
+                batch = list(self._queue)
+                self._queue.clear()
+                self._pending.clear()
+                self._busy = True
+
+            for msg in batch:
+                try:
+                    self.handler(msg)
+                except Exception:
+                    LOGGER.exception("Failed to handle the message %s", msg)
+
+    def flush(self, timeout=None):
+        """Wait until the pending messages are delivered.
+
+        :param timeout: `float` Timeout in seconds.
+        :returns: `bool` True if all the messages are delivered.
+        """
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                return not self._queue
+
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._busy, timeout=timeout
+            )
+
+    def close(self, timeout=None):
+        """Deliver the pending messages and stop the background thread.
+
+        The messages after closing are dropped.
+
+        :param timeout: `float` Timeout in seconds.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join(timeout)
+
+        _HANDLERS.discard(self)
+
+    def _reset_after_fork(self):
+        """Reset the handler in the forked child process.
+
+        The condition is replaced instead of acquired, as it can be held
+        by the background thread of the parent process, which does not
+        exist in the child. The pending messages are delivered by the
+        parent process, so they are discarded.
+        """
+        self._condition = threading.Condition(threading.Lock())
+        self._thread = None
+        self._busy = False
+        self._queue.clear()
+        self._pending.clear()
+
+
+def _flush_handlers(timeout=EXIT_FLUSH_TIMEOUT):
+    """Flush the live handlers on exit.
+
+    :param timeout: `float` Timeout in seconds for all the handlers.
+    """
+    deadline = time.monotonic() + timeout
+    for handler in list(_HANDLERS):
+        if not handler.flush(timeout=max(deadline - time.monotonic(), 0)):
+            LOGGER.warning(
+                "Timed out flushing the pending messages of %r", handler
+            )
+
+
+def _reset_handlers_after_fork():
+    for handler in list(_HANDLERS):
+        handler._reset_after_fork()
+
+
+atexit.register(_flush_handlers)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_handlers_after_fork)
@@ -0,0 +1,242 @@
+"""Import hook removing the deprecated components on module load.
+
+The hook applies the same analysis as ``auto-deprecate`` to the modules as
+they are imported, so the function objects, closures and wrappers of the
+expired components are never created. The removed lines are blanked
+instead of deleted, so the line numbers in the tracebacks are kept.
+
+The transformed bytecode is cached in ``__pycache__`` alongside the
+standard bytecode, and keyed by the version of auto_deprecator and the
+current version, e.g.
+``module.cpython-38.auto_deprecator-2020.5.0.deprecate-2.0.0.pyc``.
+
+Only the modules of the given packages are analyzed, and the modules which
+cannot be analyzed, e.g. with another deprecate decorator, are loaded as
+they are.
+
+For example,
+
+    from auto_deprecator.importhook import install
+
+    install(current="2.0.0", packages=["your_package"])
+
+    import your_package
+
+"""
+from importlib.abc import MetaPathFinder
+from importlib.machinery import PathFinder, SourceFileLoader
+from importlib.util import MAGIC_NUMBER, decode_source
+from io import StringIO
+import logging
+import marshal
+from os import getpid, makedirs, replace
+from os.path import basename, dirname, join, splitext
+import re
+import struct
+import sys
+
+from auto_deprecator import __version__
+from auto_deprecator.cleaner import SingleFileAutoDeprecator
+
+LOGGER = logging.getLogger(__name__)
+
+# Header of the cache: magic number, source modified time and size
+_CACHE_HEADER = struct.Struct("<4sQQ")
+
+
+def blank_deprecated_lines(file_content, current, today=None):
+    """Blank the lines of the deprecated components.
+
+    :param file_content: `str` Source code of the file.
+    :param current: `str` Current version.
+    :param today: `date` Current date.
+    :returns: `str` The source code with the deprecated lines blanked,
+        or None if nothing is deprecated.
+    """
+    deprecator = SingleFileAutoDeprecator(
+        filename=None, current=current, today=today
+    )
+    deprecated_lines = deprecator.get_deprecated_lines(file_content)
+
+    if not deprecated_lines:
+        return None
+
+    # Split the lines as the parser does
+    lines = StringIO(file_content, newline="").readlines()
+    for start_lineno, end_lineno in deprecated_lines:
+        for index in range(start_lineno - 1, min(end_lineno - 1, len(lines))):
+            line = lines[index]
+            # Keep the line ending
+            lines[index] = line[len(line.rstrip("\r\n")):]
+
+    return "".join(lines)
+
+
+class DeprecatingLoader(SourceFileLoader):
+    """Source file loader removing the deprecated components.
+    """
+
+    def __init__(self, fullname, path, current, today=None):
+        """Constructor.
+
+        :param fullname: `str` Module name.
+        :param path: `str` Source file path.
+        :param current: `str` Current version.
+        :param today: `date` Current date.
+        """
+        super().__init__(fullname, path)
+        self.current = current
+        self.today = today
+
+    def cache_path(self, source_path):
+        """Path of the bytecode cache keyed by the engine and the current
+        version."""
+        key = self.current or ""
+        if self.today is not None:
+            key += "-" + self.today.isoformat()
+
+        key = re.sub(r"[^\w.-]", "_", key)
+        return join(
+            dirname(source_path),
+            "__pycache__",
+            "%s.%s.auto_deprecator-%s.deprecate-%s.pyc" % (
+                splitext(basename(source_path))[0],
+                sys.implementation.cache_tag,
+                __version__,
+                key,
+            ),
+        )
+
+    def _load_cache(self, cache_path, mtime, size):
+        try:
+            with open(cache_path, "rb") as cache_file:
+                data = cache_file.read()
+        except OSError:
+            return None
+
+        if len(data) < _CACHE_HEADER.size:
+            return None
+
+        if _CACHE_HEADER.unpack_from(data) != (MAGIC_NUMBER, mtime, size):
+            return None
+
+        return marshal.loads(data[_CACHE_HEADER.size:])
+
+    def _write_cache(self, cache_path, mtime, size, code):
+        data = _CACHE_HEADER.pack(MAGIC_NUMBER, mtime, size)
+        data += marshal.dumps(code)
+        temp_path = "%s.%s.tmp" % (cache_path, getpid())
+
+        try:
+            makedirs(dirname(cache_path), exist_ok=True)
+            with open(temp_path, "wb") as cache_file:
+                cache_file.write(data)
+            replace(temp_path, cache_path)
+        except OSError as err:
+            LOGGER.debug("Cannot write the cache %s: %s", cache_path, err)
+
+    def get_code(self, fullname):
+        source_path = self.get_filename(fullname)
+        source_bytes = self.get_data(source_path)
+
+        # Load the standard bytecode if nothing can be deprecated
+        if b"deprecate" not in source_bytes:
+            return super().get_code(fullname)
+
+        stats = self.path_stats(source_path)
+        mtime, size = int(stats["mtime"]), stats["size"]
+        cache_path = self.cache_path(source_path)
+
+        code = self._load_cache(cache_path, mtime, size)
+        if code is not None:
+            return code
+
+        source = decode_source(source_bytes)
+
+        try:
+            deprecated_source = blank_deprecated_lines(
+                source, current=self.current, today=self.today
+            )
+        except Exception as err:
+            # The module is loaded as it is if it cannot be analyzed, e.g.
+            # by the syntax errors or another deprecate decorator
+            LOGGER.warning("Cannot analyze the module %s: %s", fullname, err)
+            return super().get_code(fullname)
+
+        if deprecated_source is not None:
+            LOGGER.debug("Removed deprecated components in %s", fullname)
+            source = deprecated_source
+
+        code = compile(source, source_path, "exec", dont_inherit=True)
+
+        if not sys.dont_write_bytecode:
+            self._write_cache(cache_path, mtime, size, code)
+
+        return code
+
+
+class DeprecatingFinder(MetaPathFinder):
+    """Meta path finder removing the deprecated components.
+    """
+
+    def __init__(self, current, packages, today=None):
+        """Constructor.
+
+        :param current: `str` Current version.
+        :param packages: `List[str]` The packages to apply.
+        :param today: `date` Current date.
+        """
+        assert packages, "Packages must be provided"
+        self.current = current
+        self.packages = packages
+        self.today = today
+
+    def is_applied(self, fullname):
+        return any(
+            fullname == package or fullname.startswith(package + ".")
+            for package in self.packages
+        )
+
+    def find_spec(self, fullname, path, target=None):
+        if not self.is_applied(fullname):
+            return None
+
+        spec = PathFinder.find_spec(fullname, path)
+
+        if spec is None or not isinstance(spec.loader, SourceFileLoader):
+            return spec
+
+        spec.loader = DeprecatingLoader(
+            fullname, spec.origin, current=self.current, today=self.today
+        )
+        return spec
+
+    def invalidate_caches(self):
+        PathFinder.invalidate_caches()
+
+
+def install(current, packages, today=None):
+    """Install the import hook.
+
+    The modules imported before the installation are not affected.
+
+    :param current: `str` Current version.
+    :param packages: `List[str]` The packages to apply, so the other
+        packages are not analyzed.
+    :param today: `date` Current date.
+    :returns: `DeprecatingFinder` The installed finder.
+    """
+    finder = DeprecatingFinder(
+        current=current, packages=packages, today=today
+    )
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def uninstall(finder):
+    """Uninstall the import hook.
+
+    :param finder: `DeprecatingFinder` The installed finder.
+    """
+    if finder in sys.meta_path:
+        sys.meta_path.remove(finder)
@@ -0,0 +1,684 @@
+"""Project-wide symbol index.
+
+The index is built in a single (parallel) pass over the modules, and maps
+each module level definition to the modules importing it and the
+references to it. It is used to find the imports and the call sites of
+the symbols removed by ``auto-deprecate``, without parsing every file
+again for every removed symbol.
+"""
+import ast
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+import logging
+from os import cpu_count
+from os.path import abspath, basename, dirname, isfile, join, splitext
+import re
+
+LOGGER = logging.getLogger(__name__)
+
+# The symbol is identified by the tuple (module, name). The position of
+# the importer is the span of its import statement, and the column offsets
+# are in UTF-8 bytes
+Importer = namedtuple(
+    "Importer",
+    "filename lineno end_lineno module name asname col_offset end_col_offset",
+)
+Reference = namedtuple(
+    "Reference", "filename lineno col_offset end_col_offset local"
+)
+ModuleScan = namedtuple(
+    "ModuleScan", "filename module definitions imports references"
+)
+
+
+def module_name(filename):
+    """Get the module name of the file.
+
+    The module name is resolved by walking up the directories as long as
+    they are packages, i.e. containing ``__init__.py``.
+
+    :param filename: `str` Python file path.
+    :returns: `str` Module name, e.g. package.module.
+    """
+    filename = abspath(filename)
+    name = splitext(basename(filename))[0]
+    parts = [] if name == "__init__" else [name]
+    directory = dirname(filename)
+
+    while isfile(join(directory, "__init__.py")):
+        parts.insert(0, basename(directory))
+        parent = dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+
+    return ".".join(parts)
+
+
+def _resolve_import_module(module, is_package, node):
+    if not node.level:
+        return node.module
+
+    package = module if is_package else module.rpartition(".")[0]
+    for _ in range(node.level - 1):
+        package = package.rpartition(".")[0]
+
+    if node.module:
+        return package + "." + node.module if package else node.module
+
+    return package
+
+
+def _attribute_path(node):
+    parts = []
+
+    while isinstance(node, ast.Attribute):
+        parts.insert(0, node.attr)
+        node = node.value
+
+    if not isinstance(node, ast.Name):
+        return None
+
+    parts.insert(0, node.id)
+    return parts
+
+
+_FUNCTION_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+_COMPREHENSION_SCOPES = (
+    ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp
+)
+# The capture patterns of the match statement, since Python 3.10
+_MATCH_CAPTURES = tuple(
+    getattr(ast, name) for name in ("MatchAs", "MatchStar")
+    if hasattr(ast, name)
+)
+
+
+def _argument_names(args):
+    names = [
+        arg.arg
+        for arg in (
+            getattr(args, "posonlyargs", []) + args.args + args.kwonlyargs
+        )
+    ]
+    names.extend(arg.arg for arg in (args.vararg, args.kwarg) if arg)
+    return names
+
+
+def _scope_bindings(scope):
+    """Get the names bound locally in the function scope.
+
+    The names bound by the imports are not counted, as the imports are
+    tracked by the index, and the names declared ``global`` are excluded.
+    """
+    bound = set(_argument_names(scope.args))
+    declared_global = set()
+    nodes = [scope.body] if isinstance(scope, ast.Lambda) else list(scope.body)
+
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            bound.add(node.id)
+        elif isinstance(node, ast.Global):
+            declared_global.update(node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(
+            node, (ast.AsyncFunctionDef, ast.FunctionDef, ast.ClassDef)
+        ):
+            # The nested scopes have their own bindings
+            bound.add(node.name)
+            continue
+        elif isinstance(node, ast.Lambda):
+            continue
+        elif isinstance(node, ast.comprehension):
+            nodes.append(node.iter)
+            nodes.extend(node.ifs)
+            continue
+        elif isinstance(node, _MATCH_CAPTURES) and node.name:
+            bound.add(node.name)
+
+        nodes.extend(ast.iter_child_nodes(node))
+
+    return bound - declared_global
+
+
+def _walk_scopes(tree):
+    """Walk the nodes with the names shadowed in their scopes.
+
+    A name rebound in a function, e.g. by a parameter or an assignment,
+    or by the target of a comprehension, does not refer to the module
+    level import within the scope.
+
+    :param tree: `ast.AST` Parsed module.
+    :returns: `iterator` Tuples of the node and the `frozenset` of the
+        shadowed names.
+    """
+    nodes = deque([(tree, frozenset())])
+
+    while nodes:
+        node, shadowed = nodes.popleft()
+        yield node, shadowed
+
+        if isinstance(node, _FUNCTION_SCOPES):
+            args = node.args
+            outer = list(args.defaults) + [
+                default for default in args.kw_defaults if default
+            ]
+            if not isinstance(node, ast.Lambda):
+                outer.extend(node.decorator_list)
+                outer.extend(
+                    arg.annotation
+                    for arg in (
+                        getattr(args, "posonlyargs", []) + args.args
+                        + args.kwonlyargs + [args.vararg, args.kwarg]
+                    )
+                    if arg and arg.annotation
+                )
+                if node.returns:
+                    outer.append(node.returns)
+                body = node.body
+            else:
+                body = [node.body]
+
+            inner = shadowed | _scope_bindings(node)
+            nodes.extend((child, shadowed) for child in outer)
+            nodes.extend((child, inner) for child in body)
+        elif isinstance(node, _COMPREHENSION_SCOPES):
+            inner = shadowed | frozenset(
+                child.id
+                for generator in node.generators
+                for child in ast.walk(generator.target)
+                if isinstance(child, ast.Name)
+            )
+            # The first iterable is evaluated in the enclosing scope
+            nodes.append((node.generators[0].iter, shadowed))
+            nodes.extend(
+                (child, inner)
+                for child in ast.iter_child_nodes(node)
+                if child is not node.generators[0]
+            )
+            nodes.extend(
+                (child, inner)
+                for child in ast.iter_child_nodes(node.generators[0])
+                if child is not node.generators[0].iter
+            )
+        else:
+            nodes.extend(
+                (child, shadowed) for child in ast.iter_child_nodes(node)
+            )
+
+
+def scan_source(filename, file_content, module=None):
+    """Scan the definitions, imports and references of the source code.
+
+    :param filename: `str` Python file path.
+    :param file_content: `str` Source code of the file.
+    :param module: `str` Module name. Resolved from the file path
+        if it is not provided.
+    :returns: `ModuleScan` Scanned module.
+    """
+    if module is None:
+        module = module_name(filename)
+
+    is_package = basename(filename) == "__init__.py"
+    tree = ast.parse(file_content)
+    definitions = set()
+    imports = []
+    references = []
+    # Local name to the imported symbol (module, name)
+    imported_symbols = {}
+    # Local name to the imported module
+    imported_modules = {}
+
+    for body in tree.body:
+        if isinstance(
+            body, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        ):
+            definitions.add(body.name)
+        elif isinstance(body, ast.Assign):
+            definitions.update(
+                t.id for t in body.targets if isinstance(t, ast.Name)
+            )
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            import_module = _resolve_import_module(module, is_package, node)
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+
+                imports.append(Importer(
+                    filename=filename,
+                    lineno=node.lineno,
+                    end_lineno=node.end_lineno,
+                    module=import_module,
+                    name=alias.name,
+                    asname=alias.asname,
+                    col_offset=node.col_offset,
+                    end_col_offset=node.end_col_offset,
+                ))
+                local = alias.asname or alias.name
+                imported_symbols[local] = (import_module, alias.name)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    imported_modules[alias.asname] = alias.name
+                else:
+                    top_level = alias.name.split(".")[0]
+                    imported_modules[top_level] = top_level
+
+    for node, shadowed in _walk_scopes(tree):
+        end_col_offset = getattr(node, "end_col_offset", None)
+
+        if (
+            isinstance(node, ast.Name)
+            and isinstance(node.ctx, ast.Load)
+            and node.id in imported_symbols
+            and node.id not in shadowed
+        ):
+            references.append((imported_symbols[node.id], Reference(
+                filename=filename,
+                lineno=node.lineno,
+                col_offset=node.col_offset,
+                end_col_offset=end_col_offset,
+                local=node.id,
+            )))
+        elif isinstance(node, ast.Attribute):
+            parts = _attribute_path(node)
+            if not parts or len(parts) < 2 or parts[0] in shadowed:
+                continue
+
+            # The attributes of the imported modules, e.g. by import
+            # package.module, or from package import module
+            if parts[0] in imported_modules:
+                root = imported_modules[parts[0]]
+            elif parts[0] in imported_symbols:
+                root = "%s.%s" % imported_symbols[parts[0]]
+            else:
+                continue
+
+            target_module = ".".join([root] + parts[1:-1])
+            # Only the attribute name is rewritten, and it is located
+            # at the end of the node
+            references.append(((target_module, node.attr), Reference(
+                filename=filename,
+                lineno=getattr(node, "end_lineno", node.lineno),
+                col_offset=(
+                    end_col_offset - len(node.attr)
+                    if end_col_offset is not None else None
+                ),
+                end_col_offset=end_col_offset,
+                local=None,
+            )))
+
+    return ModuleScan(
+        filename=filename,
+        module=module,
+        definitions=definitions,
+        imports=imports,
+        references=references,
+    )
+
+
+def scan_file(filename):
+    """Scan the Python file.
+
+    :returns: `ModuleScan` Scanned module, or None if the file cannot
+        be parsed.
+    """
+    try:
+        return scan_source(filename, open(filename, "r").read())
+    except (SyntaxError, UnicodeDecodeError, ValueError) as err:
+        LOGGER.warning("Cannot scan the file %s: %s", filename, err)
+        return None
+
+
+class SymbolIndex:
+    """Symbol index.
+    """
+
+    def __init__(self, scans=()):
+        """Constructor.
+
+        :param scans: `Iterable[ModuleScan]` Scanned modules.
+        """
+        self.modules = {}
+        self.filenames = {}
+        self.definitions = {}
+        self.importers = {}
+        self.references = {}
+
+        for scan in scans:
+            self.add(scan)
+
+    @classmethod
+    def build(cls, filenames, jobs=None):
+        """Build the index in a single pass over the files.
+
+        :param filenames: `Iterable[str]` Python file paths.
+        :param jobs: `int` Number of the processes. The files are
+            scanned in the current process if it is 1.
+        :returns: `SymbolIndex` Symbol index.
+        """
+        filenames = list(filenames)
+
+        if jobs == 1 or len(filenames) <= 1:
+            scans = map(scan_file, filenames)
+            return cls(s for s in scans if s is not None)
+
+        jobs = jobs or cpu_count() or 1
+        chunksize = max(1, len(filenames) // (4 * jobs))
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            scans = executor.map(scan_file, filenames, chunksize=chunksize)
+            return cls(s for s in scans if s is not None)
+
+    def add(self, scan):
+        """Add the scanned module into the index."""
+        self.modules[scan.module] = scan.filename
+        self.filenames[abspath(scan.filename)] = scan.module
+
+        for name in scan.definitions:
+            self.definitions[(scan.module, name)] = scan.filename
+
+        for importer in scan.imports:
+            self.importers.setdefault(
+                (importer.module, importer.name), []
+            ).append(importer)
+
+        for symbol, reference in scan.references:
+            self.references.setdefault(symbol, []).append(reference)
+
+    def module_of(self, filename):
+        """Get the module name of the indexed file."""
+        filename = abspath(filename)
+        module = self.filenames.get(filename)
+
+        if module is None:
+            module = module_name(filename)
+
+        return module
+
+    def resolve_relocate(self, module, relocate):
+        """Resolve the relocated name into a symbol.
+
+        :param module: `str` Module of the deprecated symbol.
+        :param relocate: `str` Relocated function name, either in the
+            same module, e.g. new_func, or with the module path, e.g.
+            package.module.new_func.
+        :returns: `(str, str)` The symbol (module, name), or None if it
+            cannot be imported.
+        """
+        if not relocate:
+            return None
+
+        if "." not in relocate:
+            return (module, relocate)
+
+        relocate_module, _, name = relocate.rpartition(".")
+        if relocate_module in self.modules:
+            return (relocate_module, name)
+
+        return None
+
+    def dangling(self, removed):
+        """Find the imports of the removed symbols.
+
+        The re-exported symbols, e.g. imported in the package
+        ``__init__.py``, are treated as removed as well.
+
+        :param removed: `Dict[(str, str), str]` The removed symbols
+            (module, name) and their relocated names.
+        :returns: `Dict[(str, str), (str, str)]` The removed symbols,
+            including the re-exported ones, and their relocated
+            symbols (None if not importable).
+        """
+        pending = [
+            (symbol, self.resolve_relocate(symbol[0], relocate))
+            for symbol, relocate in removed.items()
+        ]
+        resolved = {}
+
+        while pending:
+            symbol, relocate = pending.pop()
+            if symbol in resolved:
+                continue
+
+            resolved[symbol] = relocate
+
+            for importer in self.importers.get(symbol, []):
+                module = self.module_of(importer.filename)
+                local = importer.asname or importer.name
+                reexport = (module, local)
+
+                if relocate is None:
+                    pending.append((reexport, None))
+                elif importer.asname:
+                    pending.append((reexport, reexport))
+                else:
+                    pending.append((reexport, (module, relocate[1])))
+
+        return resolved
+
+    def affected_files(self, removed):
+        """Files importing or referencing the removed symbols.
+
+        :param removed: `Dict[(str, str), (str, str)]` The result
+            of the method ``dangling``.
+        :returns: `List[str]` Sorted file paths.
+        """
+        filenames = set()
+
+        for symbol in removed:
+            filenames.update(i.filename for i in self.importers.get(symbol, []))
+            filenames.update(
+                r.filename for r in self.references.get(symbol, [])
+            )
+
+        return sorted(filenames)
+
+
+# The module of the import statement, keeping the relative prefix
+_IMPORT_FROM_MODULE = re.compile(r"from\s+(\S+?)\s*import\b")
+
+
+def _format_import_from(module, names):
+    return "from %s import %s" % (module, ", ".join(
+        "%s as %s" % (name, asname) if asname else name
+        for name, asname in names
+    ))
+
+
+def _line_offsets(lines):
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    return offsets
+
+
+def _char_offset(line, col_offset):
+    # The column offsets of the syntax tree are in UTF-8 bytes
+    return len(line.encode("utf-8")[:col_offset].decode("utf-8"))
+
+
+def fix_source(filename, file_content, removed, module=None):
+    """Rewrite the imports and references of the removed symbols.
+
+    The imports of the removed symbols are dropped, or replaced by the
+    relocated symbols. Only the import statements are rewritten, so the
+    other statements sharing their lines are kept. The references, either
+    the imported names or the attributes of the imported modules, are
+    renamed to the relocated symbols, while those without relocation are
+    left and reported.
+
+    :param filename: `str` Python file path.
+    :param file_content: `str` Source code of the file.
+    :param removed: `Dict[(str, str), (str, str)]` The result
+        of the method ``SymbolIndex.dangling``.
+    :param module: `str` Module name of the file.
+    :returns: `(str, List[((str, str), Reference)])` The rewritten source
+        code, or None if nothing is changed, and the unresolved references
+        with their symbols.
+    """
+    scan = scan_source(filename, file_content, module=module)
+    # Split the lines as the parser does
+    lines = StringIO(file_content, newline="").readlines()
+    offsets = _line_offsets(lines)
+    # Edits of the (start, end, replacement) character offsets
+    edits = []
+    renamed = {}
+    unresolved = []
+
+    def offset_of(lineno, col_offset):
+        return offsets[lineno - 1] + _char_offset(lines[lineno - 1], col_offset)
+
+    statements = {}
+    for importer in scan.imports:
+        statements.setdefault((
+            importer.lineno,
+            importer.col_offset,
+            importer.end_lineno,
+            importer.end_col_offset,
+        ), []).append(importer)
+
+    for position, importers in statements.items():
+        if not any((i.module, i.name) in removed for i in importers):
+            continue
+
+        kept = []
+        extra = []
+        for importer in importers:
+            symbol = (importer.module, importer.name)
+            if symbol not in removed:
+                kept.append((importer.name, importer.asname))
+                continue
+
+            relocate = removed[symbol]
+            if relocate is None:
+                continue
+
+            if not importer.asname:
+                renamed[importer.name] = relocate[1]
+
+            if relocate[0] == importer.module:
+                kept.append((relocate[1], importer.asname))
+            else:
+                extra.append((relocate[0], relocate[1], importer.asname))
+
+        lineno, col_offset, end_lineno, end_col_offset = position
+        start = offset_of(lineno, col_offset)
+        end = offset_of(end_lineno, end_col_offset)
+        first_line = lines[lineno - 1]
+        indent = first_line[:len(first_line) - len(first_line.lstrip())]
+        is_alone = (
+            not first_line[:start - offsets[lineno - 1]].strip()
+            and file_content[end:offsets[end_lineno]].strip()[:1] in ("", "#")
+        )
+
+        import_module = _IMPORT_FROM_MODULE.match(
+            file_content[start:end]
+        ).group(1)
+        replacements = []
+
+        if kept:
+            replacements.append(_format_import_from(import_module, kept))
+
+        for extra_module, name, asname in extra:
+            replacements.append(
+                _format_import_from(extra_module, [(name, asname)])
+            )
+
+        if not is_alone:
+            # The other statements on the lines are kept
+            replacement = "; ".join(replacements) or "pass"
+        elif replacements:
+            replacement = ("\n" + indent).join(replacements)
+        elif indent:
+            # Keep the block valid if the import is its only statement
+            replacement = "pass"
+        else:
+            # Remove the lines of the import
+            start = offsets[lineno - 1]
+            end = offsets[end_lineno]
+            replacement = ""
+
+        edits.append((start, end, replacement))
+
+    for symbol, reference in scan.references:
+        if symbol not in removed:
+            continue
+
+        relocate = removed[symbol]
+        if reference.local is not None:
+            if reference.local not in renamed:
+                if relocate is None:
+                    unresolved.append((symbol, reference))
+                continue
+
+            replacement = renamed[reference.local]
+        elif relocate is not None and relocate[0] == symbol[0]:
+            replacement = relocate[1]
+        else:
+            unresolved.append((symbol, reference))
+            continue
+
+        if reference.end_col_offset is None:
+            unresolved.append((symbol, reference))
+            continue
+
+        edits.append((
+            offset_of(reference.lineno, reference.col_offset),
+            offset_of(reference.lineno, reference.end_col_offset),
+            replacement,
+        ))
+
+    if not edits:
+        return None, unresolved
+
+    for start, end, replacement in sorted(edits, reverse=True):
+        file_content = file_content[:start] + replacement + file_content[end:]
+
+    return file_content, unresolved
+
+
+def fix_imports(index, removed, write=True):
+    """Report and rewrite the dangling imports of the removed symbols.
+
+    :param index: `SymbolIndex` Index built before the removal.
+    :param removed: `Dict[(str, str), str]` The removed symbols
+        (module, name) and their relocated names.
+    :param write: `bool` Rewrite the files if it is True, otherwise
+        only report them.
+    :returns: `List[str]` The rewritten, or to be rewritten, files.
+    """
+    removed = index.dangling(removed)
+    changed = []
+
+    for filename in index.affected_files(removed):
+        file_content = open(filename, "r").read()
+        file_content, unresolved = fix_source(
+            filename, file_content, removed, module=index.module_of(filename)
+        )
+
+        for (module, name), reference in unresolved:
+            LOGGER.warning(
+                '%s:%s: Reference to the removed symbol "%s.%s"',
+                reference.filename, reference.lineno, module, name,
+            )
+
+        if file_content is None:
+            continue
+
+        changed.append(filename)
+        LOGGER.info(
+            "%s the imports of the removed symbols in the file %s",
+            "Rewriting" if write else "Found", filename,
+        )
+
+        if write:
+            open(filename, "w+").write(file_content)
+
+    return changed
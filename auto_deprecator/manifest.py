@@ -0,0 +1,158 @@
+"""Deprecation manifest.
+
+The manifest compiles all the deprecate markers, i.e. the deprecate
+decorators and the auto-deprecate comments, of a package into a single
+index file at build time. The release tooling can then answer which
+components expire in a version by loading the file, instead of parsing
+all the source files again.
+
+The manifest is a compact JSON file like
+
+    {"format": 1, "package_version": "2.0.0", "entries": [
+        {"symbol": "old_hello_world", "file": "hello_world.py",
+         "start": 4, "end": 6, "expiry": "2.0.0", "relocate": null,
+         "marker": "decorator"}]}
+
+"""
+from datetime import date
+import json
+import logging
+from os.path import dirname, isfile, relpath
+
+from auto_deprecator import FunctionStage, parse_expiry
+from auto_deprecator.cleaner import SingleFileAutoDeprecator, iter_python_files
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+
+
+class Manifest:
+    """Deprecation manifest.
+    """
+
+    def __init__(self, entries, package_version=None):
+        """Constructor.
+
+        :param entries: `List[dict]` The deprecate markers with the
+            file path relative to the package root (file).
+        :param package_version: `str` The package version when the
+            manifest is built.
+        """
+        self.entries = entries
+        self.package_version = package_version
+
+    @classmethod
+    def build(cls, path, package_version=None):
+        """Build the manifest from the source code.
+
+        :param path: `str` The source code path.
+        :param package_version: `str` The package version.
+        :returns: `Manifest` The manifest.
+        """
+        root = dirname(path) if isfile(path) else path
+        entries = []
+
+        for python_file in iter_python_files(path):
+            LOGGER.debug("Collecting deprecate markers in %s", python_file)
+            deprecator = SingleFileAutoDeprecator(
+                filename=python_file, current=package_version
+            )
+            markers = deprecator.find_deprecate_markers(
+                open(python_file, "r").read()
+            )
+
+            for marker in markers:
+                marker["file"] = relpath(python_file, root)
+                entries.append(marker)
+
+        entries.sort(key=lambda e: (e["file"], e["start"]))
+        return cls(entries, package_version=package_version)
+
+    @classmethod
+    def load(cls, filename):
+        """Load the manifest file.
+
+        :param filename: `str` The manifest file path.
+        :returns: `Manifest` The manifest.
+        """
+        with open(filename, "r") as manifest_file:
+            content = json.load(manifest_file)
+
+        if content.get("format") != MANIFEST_FORMAT:
+            raise RuntimeError(
+                "Unsupported manifest format (%s) in the file %s" % (
+                    content.get("format"), filename
+                )
+            )
+
+        return cls(
+            content["entries"],
+            package_version=content.get("package_version"),
+        )
+
+    def save(self, filename):
+        """Save the manifest into the file.
+
+        :param filename: `str` The manifest file path.
+        """
+        with open(filename, "w") as manifest_file:
+            json.dump(
+                {
+                    "format": MANIFEST_FORMAT,
+                    "package_version": self.package_version,
+                    "entries": self.entries,
+                },
+                manifest_file,
+                separators=(",", ":"),
+            )
+
+    def _filter(self, version, stage):
+        version = parse_expiry(version)
+
+        if isinstance(version, date):
+            current, today = None, version
+        else:
+            current, today = version, None
+
+        return [
+            entry for entry in self.entries
+            if SingleFileAutoDeprecator.check_expiry_stage(
+                expiry=entry["expiry"], current=current, today=today
+            ) == stage
+        ]
+
+    def expiring(self, version):
+        """Entries expiring in the version.
+
+        :param version: `str` The version, or the date in the ISO format.
+        :returns: `List[dict]` The entries of which the expiry version is
+            the same as the given version.
+        """
+        return self._filter(version, FunctionStage.EXPIRED)
+
+    def removed(self, version):
+        """Entries removed by ``auto-deprecate`` in the version.
+
+        :param version: `str` The version, or the date in the ISO format.
+        :returns: `List[dict]` The entries of which the expiry version is
+            before the given version.
+        """
+        return self._filter(version, FunctionStage.CLEANING)
+
+
+def build_manifest(path, filename, package_version=None):
+    """Build the manifest of the source code into the file.
+
+    :param path: `str` The source code path.
+    :param filename: `str` The manifest file path.
+    :param package_version: `str` The package version.
+    :returns: `Manifest` The manifest.
+    """
+    manifest = Manifest.build(path, package_version=package_version)
+    manifest.save(filename)
+    LOGGER.info(
+        "Built the manifest %s with %d entries", filename,
+        len(manifest.entries),
+    )
+    return manifest
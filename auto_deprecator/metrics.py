@@ -0,0 +1,212 @@
+"""Exporter of the deprecated function calls in the Prometheus format.
+
+The exporter renders the call counters of the deprecate decorator in the
+Prometheus text exposition format, either as bytes or on a local HTTP
+endpoint, so the usage of the deprecated functions can be scraped into
+the dashboards. No more than the counter increment is added to the calls.
+
+For example,
+
+    from auto_deprecator.metrics import start_http_server
+
+    start_http_server(9105)
+
+serves the metrics like
+
+    auto_deprecator_calls_total{function="hello_world.old_hello_world",\
+stage="warning",expiry="2.1.0",relocate="hello_world"} 3.0
+
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from time import time
+
+from auto_deprecator import CALL_COUNTER, FunctionStage, is_date
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_NAMES = {
+    FunctionStage.WARNING: "warning",
+    FunctionStage.EXPIRED: "expired",
+    FunctionStage.CLEANING: "cleaning",
+}
+
+METRICS = (
+    (
+        "auto_deprecator_calls_total",
+        "counter",
+        "Number of the deprecated function calls.",
+    ),
+    (
+        "auto_deprecator_first_seen_seconds",
+        "gauge",
+        "Time of the first deprecated function call.",
+    ),
+    (
+        "auto_deprecator_last_seen_seconds",
+        "gauge",
+        "Time of the last scrape observing the deprecated function calls.",
+    ),
+)
+
+
+def escape_label(value):
+    """Escape the label value in the Prometheus format."""
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def format_labels(state, stage):
+    """Format the labels of the deprecated function.
+
+    :param state: `CounterKey` The function key of the call counter.
+    :param stage: `int` The function stage.
+    :returns: `str` The labels, e.g. {function="f",stage="warning",...}.
+    """
+    expiry = state.expiry
+    if is_date(expiry):
+        expiry = expiry.isoformat()
+
+    labels = (
+        ("function", state.name),
+        ("stage", STAGE_NAMES[stage]),
+        ("expiry", "" if expiry is None else str(expiry)),
+        ("relocate", state.relocate or ""),
+    )
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, escape_label(value)) for name, value in labels
+    )
+
+
+class MetricsCollector:
+    """Collector of the deprecated function calls.
+
+    The decorator only counts the calls, so the last seen time is the time
+    of the scrape observing the count changed, i.e. it is accurate to the
+    scrape interval.
+    """
+
+    def __init__(self, counter=CALL_COUNTER):
+        """Constructor.
+
+        :param counter: `CallCounter` The call counter.
+        """
+        self.counter = counter
+        self._lock = threading.Lock()
+        self._last_counts = {}
+        self._last_seen = {}
+
+    def collect(self):
+        """Collect the metrics.
+
+        :returns: `List[(str, int, int, float, float)]` List of tuples of
+            the labels, the stage, the number of calls, and the first and
+            last seen timestamps, sorted by the labels.
+        """
+        now = time()
+        counts = self.counter.snapshot()
+        first_seen = self.counter.first_seen()
+        samples = {}
+
+        with self._lock:
+            for key, count in counts.items():
+                if self._last_counts.get(key) != count:
+                    self._last_seen[key] = now
+
+                state, stage = key
+                labels = format_labels(state, stage)
+                sample = (
+                    labels,
+                    stage,
+                    count,
+                    first_seen.get(key, now),
+                    self._last_seen[key],
+                )
+
+                # Merge the functions of the same name, e.g. redefined
+                if labels in samples:
+                    other = samples[labels]
+                    sample = (
+                        labels,
+                        stage,
+                        count + other[2],
+                        min(sample[3], other[3]),
+                        max(sample[4], other[4]),
+                    )
+
+                samples[labels] = sample
+
+            self._last_counts = counts
+
+        return [samples[labels] for labels in sorted(samples)]
+
+    def generate_latest(self):
+        """Render the metrics in the Prometheus text format.
+
+        :returns: `bytes` The metrics.
+        """
+        samples = self.collect()
+        lines = []
+
+        for index, (name, metric_type, description) in enumerate(METRICS):
+            lines.append("# HELP %s %s" % (name, description))
+            lines.append("# TYPE %s %s" % (name, metric_type))
+
+            for sample in samples:
+                lines.append("%s%s %r" % (
+                    name, sample[0], float(sample[index + 2])
+                ))
+
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+COLLECTOR = MetricsCollector()
+
+
+def generate_latest():
+    """Render the metrics of the deprecated function calls.
+
+    :returns: `bytes` The metrics in the Prometheus text format.
+    """
+    return COLLECTOR.generate_latest()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """HTTP handler serving the metrics on any path."""
+
+    collector = COLLECTOR
+
+    def do_GET(self):
+        output = self.collector.generate_latest()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(output)))
+        self.end_headers()
+        self.wfile.write(output)
+
+    def log_message(self, format, *args):
+        # Do not log the scrapes on the standard error
+        pass
+
+
+def start_http_server(port, addr="127.0.0.1", collector=COLLECTOR):
+    """Serve the metrics on the HTTP endpoint in a daemon thread.
+
+    :param port: `int` The port. A free port is chosen if it is 0.
+    :param addr: `str` The address.
+    :param collector: `MetricsCollector` The collector.
+    :returns: `ThreadingHTTPServer` The server, which is stopped by
+        ``shutdown``.
+    """
+    handler = type(
+        "MetricsHandler", (MetricsHandler,), {"collector": collector}
+    )
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="auto-deprecator-metrics",
+        daemon=True,
+    )
+    thread.start()
+    return server
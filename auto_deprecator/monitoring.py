@@ -0,0 +1,193 @@
+"""Wrapper-free tracking of the deprecated functions on Python 3.12+.
+
+The deprecate decorator with ``backend="monitoring"`` returns the function
+itself instead of the wrapper, and registers its code object for the
+``PY_START`` events of ``sys.monitoring``. The first hits of each function
+are recorded and counted in the call counts, and then the event is
+disabled, so the later calls run without any overhead.
+
+For example,
+
+    @deprecate(expiry="2.1.0", backend="monitoring")
+    def old_hello_world():
+        pass
+
+The warning and error handlers are not called by the tracker, so the
+backend is for the usage tracking only. The wrapper is used on Python 3.11
+or before.
+"""
+import sys
+import threading
+from time import time
+
+from auto_deprecator import CALL_COUNTER
+
+# The tool identifiers without the predefined purpose are preferred
+TOOL_IDS = (4, 3, 5, 2, 1, 0)
+
+TOOL_NAME = "auto_deprecator"
+
+
+class Hit:
+    """Hit of the deprecated function.
+    """
+
+    __slots__ = ("stage", "timestamp", "caller")
+
+    def __init__(self, stage, timestamp, caller):
+        """Constructor.
+
+        :param stage: `int` The function stage.
+        :param timestamp: `float` The time of the call.
+        :param caller: `str` The caller location, e.g. hello.py:10.
+        """
+        self.stage = stage
+        self.timestamp = timestamp
+        self.caller = caller
+
+    def __repr__(self):
+        return "Hit(stage=%r, timestamp=%r, caller=%r)" % (
+            self.stage, self.timestamp, self.caller
+        )
+
+
+class MonitoringTracker:
+    """Tracker of the deprecated functions by ``sys.monitoring``.
+
+    The tool identifier is acquired on the first tracked function.
+    """
+
+    def __init__(self, max_hits=1):
+        """Constructor.
+
+        :param max_hits: `int` Number of the hits recorded for each
+            function before the event is disabled.
+        """
+        assert max_hits > 0, "Maximum number of hits must be positive"
+        self.max_hits = max_hits
+        self.tool_id = None
+        self._lock = threading.Lock()
+        # State and hits by the code object
+        self._states = {}
+        self._hits = {}
+
+    def _acquire_tool_id(self):
+        monitoring = sys.monitoring
+
+        for tool_id in TOOL_IDS:
+            if monitoring.get_tool(tool_id) is not None:
+                continue
+
+            try:
+                monitoring.use_tool_id(tool_id, TOOL_NAME)
+            except ValueError:
+                continue
+
+            monitoring.register_callback(
+                tool_id, monitoring.events.PY_START, self._on_start
+            )
+            return tool_id
+
+        raise RuntimeError("No sys.monitoring tool identifier is available")
+
+    def track(self, state):
+        """Track the deprecated function.
+
+        :param state: `DeprecationState` The state of the function.
+        """
+        code = state.func.__code__
+
+        with self._lock:
+            if self.tool_id is None:
+                self.tool_id = self._acquire_tool_id()
+
+            self._states[code] = state
+            self._hits[code] = []
+            sys.monitoring.set_local_events(
+                self.tool_id, code, sys.monitoring.events.PY_START
+            )
+
+    def _on_start(self, code, instruction_offset):
+        state = self._states.get(code)
+        if state is None:
+            return sys.monitoring.DISABLE
+
+        stage = state.get_stage()
+
+        # The frames are the callback, the function and its caller
+        try:
+            frame = sys._getframe(2)
+            caller = "%s:%d" % (frame.f_code.co_filename, frame.f_lineno)
+        except ValueError:
+            caller = None
+
+        # The function can be called in the other threads before the event
+        # is disabled, so the hits are recorded under the lock
+        with self._lock:
+            hits = self._hits.get(code)
+            if hits is None or len(hits) >= self.max_hits:
+                return sys.monitoring.DISABLE
+
+            hits.append(Hit(stage=stage, timestamp=time(), caller=caller))
+            is_full = len(hits) >= self.max_hits
+
+        CALL_COUNTER.increment(state.counter_keys[stage])
+
+        if is_full:
+            return sys.monitoring.DISABLE
+
+        return None
+
+    def hits(self):
+        """Get the recorded hits.
+
+        :returns: `Dict[str, List[Hit]]` The hits by the qualified
+            function name.
+        """
+        with self._lock:
+            return {
+                self._states[code].name: list(hits)
+                for code, hits in self._hits.items()
+            }
+
+    def restart(self):
+        """Clear the recorded hits and enable the disabled events.
+
+        The events of the tracked functions are registered again instead of
+        ``sys.monitoring.restart_events``, which enables the disabled
+        events of all the other tools as well.
+        """
+        with self._lock:
+            for code in self._hits:
+                self._hits[code] = []
+
+                if self.tool_id is not None:
+                    sys.monitoring.set_local_events(self.tool_id, code, 0)
+                    sys.monitoring.set_local_events(
+                        self.tool_id, code, sys.monitoring.events.PY_START
+                    )
+
+    def close(self):
+        """Stop tracking all the functions and free the tool identifier."""
+        with self._lock:
+            if self.tool_id is None:
+                return
+
+            for code in self._states:
+                sys.monitoring.set_local_events(self.tool_id, code, 0)
+
+            sys.monitoring.register_callback(
+                self.tool_id, sys.monitoring.events.PY_START, None
+            )
+            sys.monitoring.free_tool_id(self.tool_id)
+            self.tool_id = None
+            self._states = {}
+            self._hits = {}
+
+
+TRACKER = MonitoringTracker()
+
+
+def is_supported():
+    """Check whether sys.monitoring is supported."""
+    return hasattr(sys, "monitoring")
@@ -0,0 +1,282 @@
+"""Streaming pipeline of cleaning the source files.
+
+The files are processed by the composable stages
+
+    discover -> assign versions -> read -> analyze -> rewrite
+
+Each stage is an iterator over the results of the previous one, and the
+stages running in the executors keep at most ``in_flight`` files pending,
+so the reads on the slow file systems overlap with the parsing while the
+memory stays bounded regardless of the number of files. The source code
+of each file is dropped once it is rewritten.
+
+For example,
+
+    for result in rewrite_files(analyze_files(read_files(
+        assign_versions(discover("hello_world"), current="2.1.0")
+    ))):
+        print(result.filename, result.symbols)
+
+"""
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import logging
+from time import perf_counter
+
+from auto_deprecator.cleaner import SingleFileAutoDeprecator, iter_python_files
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_IN_FLIGHT = 16
+
+# The file path, the current version, the source code (None if it is not
+# changed or written already), the removed symbols, the arguments left
+# to be removed by hand and the CleanResult record
+FileResult = namedtuple(
+    "FileResult",
+    ["filename", "current", "content", "symbols", "arguments", "record"],
+)
+
+
+def bounded_map(func, iterable, executor=None, in_flight=DEFAULT_IN_FLIGHT):
+    """Map the items in the executor with a bounded number of pending items.
+
+    The results are yielded in the order of the items. The next item is
+    only submitted once the pending ones are fewer than in_flight.
+
+    :param func: `Callable` The function taking the item as the arguments.
+    :param iterable: `Iterable[tuple]` The arguments of the items.
+    :param executor: `Executor` The executor. The items are mapped in the
+        current thread if it is not provided.
+    :param in_flight: `int` Maximum number of the pending items.
+    :returns: `Iterator` The results.
+    """
+    assert in_flight > 0, "In-flight limit must be positive"
+
+    if executor is None:
+        for args in iterable:
+            yield func(*args)
+        return
+
+    pending = deque()
+
+    for args in iterable:
+        pending.append(executor.submit(func, *args))
+
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def discover(path):
+    """Discover the Python source files.
+
+    :param path: `str` File or directory path.
+    :returns: `Iterator[str]` The file paths.
+    """
+    return iter_python_files(path)
+
+
+def assign_versions(filenames, current=None, versions=None, today=None):
+    """Assign the current version to the files.
+
+    The files without the current version are skipped unless the current
+    date is provided.
+
+    :param filenames: `Iterable[str]` The file paths.
+    :param current: `str` Current version.
+    :param versions: `VersionMap` The versions by the file paths.
+    :param today: `date` Current date.
+    :returns: `Iterator[(str, str)]` The file paths and the versions.
+    """
+    for filename in filenames:
+        file_current = current
+        if versions is not None:
+            file_current = versions.get(filename)
+
+        if file_current is None and today is None:
+            LOGGER.warning("No current version of the file %s", filename)
+            continue
+
+        yield filename, file_current
+
+
+def read_file(filename, current):
+    with open(filename, "r") as source_file:
+        return filename, current, source_file.read()
+
+
+def read_files(tasks, executor=None, in_flight=DEFAULT_IN_FLIGHT):
+    """Read the source files.
+
+    :param tasks: `Iterable[(str, str)]` The file paths and the versions.
+    :param executor: `Executor` The executor to read the files ahead.
+    :param in_flight: `int` Maximum number of the files read ahead.
+    :returns: `Iterator[(str, str, str)]` The file paths, the versions and
+        the source code.
+    """
+    return bounded_map(read_file, tasks, executor, in_flight)
+
+
+def analyze_source(filename, current, file_content, today=None, stub=None):
+    """Analyze the source code.
+
+    :returns: `FileResult` The result with the deprecated source code.
+    """
+    deprecator = SingleFileAutoDeprecator(
+        filename=filename, current=current, today=today, stub=stub
+    )
+    LOGGER.info("Deprecating the file %s", filename)
+    start = perf_counter()
+    deprecated_content = deprecator.deprecate_source(file_content)
+    timings = {"analyze": perf_counter() - start}
+    return FileResult(
+        filename,
+        current,
+        deprecated_content,
+        deprecator.deprecated_symbols,
+        deprecator.deprecated_arguments,
+        deprecator.make_result(file_content, deprecated_content, timings),
+    )
+
+
+def analyze_files(
+        items, today=None, stub=None, executor=None,
+        in_flight=DEFAULT_IN_FLIGHT):
+    """Analyze the source code.
+
+    :param items: `Iterable[(str, str, str)]` The file paths, the versions
+        and the source code.
+    :param today: `date` Current date.
+    :param stub: `str` Stub mode.
+    :param executor: `Executor` The executor, e.g. a process pool.
+    :param in_flight: `int` Maximum number of the files in the analysis.
+    :returns: `Iterator[FileResult]` The results.
+    """
+    return bounded_map(
+        analyze_source,
+        (item + (today, stub) for item in items),
+        executor,
+        in_flight,
+    )
+
+
+def rewrite_files(results):
+    """Write back the deprecated source code.
+
+    :param results: `Iterable[FileResult]` The results.
+    :returns: `Iterator[FileResult]` The results without the source code.
+    """
+    for result in results:
+        if result.content is not None:
+            start = perf_counter()
+            with open(result.filename, "w+") as source_file:
+                source_file.write(result.content)
+            result.record.timings["write"] = perf_counter() - start
+
+            result = result._replace(content=None)
+
+        yield result
+
+
+class CleanSummary:
+    """Summary of the cleaned files.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.changed = 0
+        self.symbols = 0
+        self.stubbed = 0
+        self.imports = 0
+        self.arguments = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        # Total time of each stage in seconds
+        self.timings = {}
+
+    def add(self, record):
+        """Add the result of a file.
+
+        :param record: `CleanResult` The result.
+        """
+        self.files += 1
+        self.changed += bool(record.changed)
+        self.symbols += len(record.symbols)
+        self.stubbed += len(record.stubbed)
+        self.imports += len(record.imports)
+        self.arguments += len(record.arguments)
+        self.bytes_before += record.bytes_before
+        self.bytes_after += record.bytes_after
+
+        for stage, elapsed in record.timings.items():
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def to_dict(self):
+        """Convert the summary into the JSON serializable object.
+
+        :returns: `dict` The summary.
+        """
+        return {
+            "files": self.files,
+            "changed": self.changed,
+            "symbols": self.symbols,
+            "stubbed": self.stubbed,
+            "imports": self.imports,
+            "arguments": self.arguments,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "timings": dict(self.timings),
+        }
+
+    def __str__(self):
+        return (
+            "Cleaned {changed} of {files} files: removed {symbols} symbols "
+            "and {imports} imports, stubbed {stubbed} symbols, "
+            "{arguments} arguments left, "
+            "{bytes_before} -> {bytes_after} bytes"
+        ).format(**self.to_dict())
+
+
+def clean(
+        path, current=None, versions=None, today=None, stub=None, jobs=None,
+        in_flight=DEFAULT_IN_FLIGHT, filenames=None):
+    """Clean the source files by the pipeline.
+
+    :param path: `str` File or directory path.
+    :param current: `str` Current version.
+    :param versions: `VersionMap` The versions by the file paths.
+    :param today: `date` Current date.
+    :param stub: `str` Stub mode.
+    :param jobs: `int` Number of the processes to analyze the files. The
+        files are analyzed in the current process if it is not more than 1.
+    :param in_flight: `int` Maximum number of the files in each stage.
+    :param filenames: `Iterable[str]` The file paths, which are discovered
+        in the path if it is not provided.
+    :returns: `Iterator[FileResult]` The results.
+    """
+    if filenames is None:
+        filenames = discover(path)
+
+    tasks = assign_versions(
+        filenames, current=current, versions=versions, today=today
+    )
+
+    with ThreadPoolExecutor(max_workers=in_flight) as read_executor:
+        analyze_executor = None
+        if jobs and jobs > 1:
+            analyze_executor = ProcessPoolExecutor(max_workers=jobs)
+
+        try:
+            yield from rewrite_files(analyze_files(
+                read_files(tasks, read_executor, in_flight),
+                today=today,
+                stub=stub,
+                executor=analyze_executor,
+                in_flight=in_flight,
+            ))
+        finally:
+            if analyze_executor is not None:
+                analyze_executor.shutdown()
@@ -0,0 +1,155 @@
+"""Pytest plugin simulating the current version of the deprecated functions.
+
+With the option ``--deprecate-version``, the tests run as if the package
+is released in the version, so the functions expiring in or before the
+version raise in the tests. The calls of the deprecated functions are
+collected by the test and summarised at the end of the session, so a
+single run reports the impact of a future release.
+
+    $ pytest --deprecate-version 2.1.0
+
+The calls are collected in the pytest-xdist workers and aggregated in the
+controller.
+"""
+import pytest
+
+from auto_deprecator import CALL_COUNTER, CONFIG, FunctionStage, is_date
+
+STAGE_NAMES = {
+    FunctionStage.WARNING: "warning",
+    FunctionStage.EXPIRED: "expired",
+    FunctionStage.CLEANING: "cleaning",
+}
+
+WORKER_OUTPUT_KEY = "auto_deprecator_hits"
+
+
+def format_expiry(expiry):
+    if expiry is None:
+        return ""
+
+    return expiry.isoformat() if is_date(expiry) else str(expiry)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("auto-deprecator")
+    group.addoption(
+        "--deprecate-version", dest="deprecate_version", default=None,
+        help="Run the tests as if the current version of the deprecated "
+             "functions is the version.",
+    )
+    group.addoption(
+        "--deprecate-report", dest="deprecate_report", action="store_true",
+        help="Report the deprecated function calls by the tests. It is "
+             "enabled by --deprecate-version as well.",
+    )
+
+
+def pytest_configure(config):
+    version = config.getoption("deprecate_version")
+
+    if version is None and not config.getoption("deprecate_report"):
+        return
+
+    config.pluginmanager.register(
+        DeprecationReporter(config, version), "auto_deprecator_reporter"
+    )
+
+
+class DeprecationReporter:
+    """Collector of the deprecated function calls by the tests.
+    """
+
+    def __init__(self, config, version=None):
+        """Constructor.
+
+        :param config: `Config` The pytest config.
+        :param version: `str` The simulated current version.
+        """
+        self.config = config
+        self.version = version
+        # Number of calls by the function name, stage, expiry and test
+        self.hits = {}
+        self._previous_version = None
+
+        if version is not None:
+            self._previous_version = CONFIG.set_version(version)
+
+    def pytest_unconfigure(self, config):
+        if self.version is not None:
+            CONFIG.set_version(self._previous_version)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        before = CALL_COUNTER.snapshot()
+        yield
+        after = CALL_COUNTER.snapshot()
+
+        for (state, stage), count in after.items():
+            count -= before.get((state, stage), 0)
+            if count > 0:
+                self.add_hit(
+                    state.name,
+                    STAGE_NAMES[stage],
+                    format_expiry(state.expiry),
+                    item.nodeid,
+                    count,
+                )
+
+    def add_hit(self, name, stage, expiry, nodeid, count):
+        tests = self.hits.setdefault((name, stage, expiry), {})
+        tests[nodeid] = tests.get(nodeid, 0) + count
+
+    def pytest_sessionfinish(self, session):
+        # Send the calls to the controller from the xdist worker
+        workeroutput = getattr(self.config, "workeroutput", None)
+        if workeroutput is not None:
+            workeroutput[WORKER_OUTPUT_KEY] = [
+                list(key) + [nodeid, count]
+                for key, tests in self.hits.items()
+                for nodeid, count in tests.items()
+            ]
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        workeroutput = getattr(node, "workeroutput", {})
+        for name, stage, expiry, nodeid, count in workeroutput.get(
+            WORKER_OUTPUT_KEY, []
+        ):
+            self.add_hit(name, stage, expiry, nodeid, count)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if hasattr(self.config, "workeroutput"):
+            return
+
+        title = "deprecated function calls"
+        if self.version is not None:
+            title += " (version %s)" % self.version
+
+        terminalreporter.write_sep("=", title)
+
+        if not self.hits:
+            terminalreporter.write_line("No deprecated function is called.")
+            return
+
+        rows = [("Function", "Stage", "Expiry", "Calls", "Tests")]
+        for (name, stage, expiry), tests in sorted(self.hits.items()):
+            rows.append((
+                name, stage, expiry,
+                str(sum(tests.values())), str(len(tests)),
+            ))
+
+        widths = [max(len(row[i]) for row in rows) for i in range(5)]
+        for row in rows:
+            terminalreporter.write_line("  ".join(
+                value.ljust(width) for value, width in zip(row, widths)
+            ).rstrip())
+
+        if self.config.getoption("verbose") <= 0:
+            return
+
+        terminalreporter.write_line("")
+        for (name, stage, _), tests in sorted(self.hits.items()):
+            terminalreporter.write_line("%s (%s):" % (name, stage))
+            for nodeid, count in sorted(tests.items()):
+                terminalreporter.write_line("    %s %d" % (nodeid, count))
@@ -0,0 +1,236 @@
+"""Resolution of the version in the version module.
+
+Importing the version module on the first deprecated call can run a heavy
+package ``__init__``, or even import the package in the middle of its own
+import. The resolver reads the version without importing the module if
+possible, in the order of
+
+  1. The module imported already.
+  2. The literal ``__version__`` in the module source, which is located
+     without importing the parent packages.
+  3. The version of the installed distribution of the same name.
+  4. Importing the module.
+
+The resolved versions are cached by the module name.
+"""
+import ast
+from importlib import import_module
+from importlib.machinery import PathFinder, SourceFileLoader
+import sys
+
+# Resolved versions by the module name
+_VERSIONS = {}
+
+# Maximum depth of following the imports of the version, e.g.
+# from ._version import __version__
+MAX_IMPORT_DEPTH = 3
+
+
+def find_module_source(name, path=None):
+    """Find the source file of the module without importing it.
+
+    The parent packages are searched on the path without being imported,
+    so the namespace packages and the custom importers are not supported.
+
+    :param name: `str` The module name.
+    :param path: `List[str]` The paths to search the top level package.
+        Default is sys.path.
+    :returns: `str` The source file path, or None if it is not found.
+    """
+    spec = None
+
+    for part in name.split("."):
+        if spec is not None:
+            path = spec.submodule_search_locations
+            if path is None:
+                return None
+
+        spec = PathFinder.find_spec(part, path)
+        if spec is None:
+            return None
+
+    if not isinstance(spec.loader, SourceFileLoader):
+        return None
+
+    return spec.origin
+
+
+def read_source_version(filename, package=None, depth=0, path=None):
+    """Read the literal version in the module source.
+
+    :param filename: `str` The source file path.
+    :param package: `str` The package of the module, to resolve the
+        relative imports of the version.
+    :param depth: `int` The depth of the followed imports.
+    :param path: `List[str]` The paths to search the imported modules.
+        Default is sys.path.
+    :returns: `str` The version, or None if it is not a literal.
+    """
+    with open(filename, "rb") as source_file:
+        source = source_file.read()
+
+    if b"__version__" not in source:
+        return None
+
+    version = None
+
+    # The last top level assignment is the version
+    for node in ast.parse(source, filename).body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if (alias.asname or alias.name) != "__version__":
+                    continue
+
+                if alias.name == "__version__":
+                    version = _read_imported_version(
+                        node, package, depth, path
+                    )
+                else:
+                    version = None
+
+            continue
+        else:
+            continue
+
+        if any(
+            isinstance(target, ast.Name) and target.id == "__version__"
+            for target in targets
+        ):
+            version = _literal_string(node.value)
+
+    return version
+
+
+def _literal_string(node):
+    if isinstance(node, ast.Constant):
+        value = node.value
+    else:
+        # Python 3.7 or before
+        value = getattr(node, "s", None)
+
+    return value if isinstance(value, str) else None
+
+
+def _read_imported_version(node, package, depth, path):
+    if depth >= MAX_IMPORT_DEPTH:
+        return None
+
+    if node.level:
+        if package is None:
+            return None
+
+        parts = package.split(".")
+        if node.level - 1 >= len(parts):
+            return None
+
+        base = ".".join(parts[: len(parts) - node.level + 1])
+        name = base + "." + node.module if node.module else base
+    else:
+        name = node.module
+
+    return version_from_source(name, depth=depth + 1, path=path)
+
+
+def version_from_source(name, depth=0, path=None):
+    """Get the literal version in the module source without importing it.
+
+    :param name: `str` The module name.
+    :param path: `List[str]` The paths to search the top level package.
+        Default is sys.path.
+    :returns: `str` The version, or None if it is not found.
+    """
+    filename = find_module_source(name, path=path)
+    if filename is None:
+        return None
+
+    # The package of the module itself is the package to resolve the
+    # relative imports if it is a package
+    if filename.endswith("__init__.py"):
+        package = name
+    else:
+        package = name.rpartition(".")[0] or None
+
+    try:
+        return read_source_version(
+            filename, package=package, depth=depth, path=path
+        )
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def version_from_metadata(name):
+    """Get the version of the installed distribution of the module name.
+
+    Only the top level module is matched with the distribution name.
+
+    :param name: `str` The module name.
+    :returns: `str` The version, or None if it is not installed.
+    """
+    if "." in name:
+        return None
+
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        # Python 3.7 or before
+        return None
+
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def version_from_import(name):
+    """Get the version by importing the module.
+
+    :param name: `str` The module name.
+    :returns: `str` The version.
+    """
+    try:
+        module = import_module(name, "")
+    except Exception:
+        raise RuntimeError('Cannot locate version module "%s"' % name)
+
+    try:
+        return getattr(module, "__version__")
+    except AttributeError:
+        raise RuntimeError(
+            "Cannot find version (__version__) from the version module "
+            '"%s"' % name
+        )
+
+
+def resolve_version(name):
+    """Resolve the version of the version module.
+
+    :param name: `str` The module name.
+    :returns: `str` The version.
+    """
+    try:
+        return _VERSIONS[name]
+    except KeyError:
+        pass
+
+    module = sys.modules.get(name)
+
+    if module is not None and hasattr(module, "__version__"):
+        version = module.__version__
+    else:
+        version = (
+            version_from_source(name)
+            or version_from_metadata(name)
+            or version_from_import(name)
+        )
+
+    _VERSIONS[name] = version
+    return version
+
+
+def clear_cache():
+    """Clear the cache of the resolved versions."""
+    _VERSIONS.clear()
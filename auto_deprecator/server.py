@@ -0,0 +1,441 @@
+"""Long-lived deprecation server.
+
+The server keeps the analysis of the source files warm between the
+requests so that the editor and pre-commit integrations do not pay
+for the interpreter startup on every file. The requests follow the
+JSON-RPC 2.0 specification, delimited by newlines, over either the
+standard input / output or a Unix domain socket.
+
+For example,
+
+    {"jsonrpc": "2.0", "id": 1, "method": "analyze",
+     "params": {"paths": ["hello_world.py"], "version": "2.0.0"}}
+
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat as stat_module
+import sys
+import threading
+import weakref
+
+from auto_deprecator.cleaner import SingleFileAutoDeprecator, iter_python_files
+
+LOGGER = logging.getLogger(__name__)
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class RPCError(Exception):
+    """JSON-RPC error."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class DeprecatorServer:
+    """Deprecator server.
+
+    The analysis of each file is cached with the hash of its content, so
+    that repeated requests on unchanged files skip the parsing. The content
+    is read on every request, as the modification time cannot tell the
+    edits within its granularity, and the cleaned source code must be
+    computed from the current content.
+    The least recently used analyses are dropped once the cache is full.
+    """
+
+    def __init__(
+            self, current=None, max_workers=None,
+            cache_size=DEFAULT_CACHE_SIZE):
+        """Constructor.
+
+        :param current: `str` Default current version if the request
+            does not provide one.
+        :param max_workers: `int` Maximum number of the worker threads.
+        :param cache_size: `int` Maximum number of the cached analyses.
+        """
+        assert cache_size > 0, "Cache size must be positive"
+        self._current = current
+        # Each level of work has its own pool, so that a task never
+        # waits on a task queued behind itself in the same pool
+        self._stream_executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._batch_executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._file_executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        # The lock of a file is dropped once no request holds it
+        self._file_locks = weakref.WeakValueDictionary()
+        self._file_locks_lock = threading.Lock()
+        self._running = True
+        self.methods = {
+            "analyze": self.analyze,
+            "clean": self.clean,
+            "ping": self.ping,
+            "shutdown": self.shutdown,
+        }
+
+    @property
+    def running(self):
+        return self._running
+
+    def _file_lock(self, filename):
+        with self._file_locks_lock:
+            lock = self._file_locks.get(filename)
+            if lock is None:
+                lock = self._file_locks[filename] = threading.Lock()
+
+            return lock
+
+    def _analyze_file(self, filename, current):
+        """Analyze the file with the cache.
+
+        :returns: `(str, str, list)` The content hash, the deprecated
+            source code (None if nothing is deprecated) and the deprecated
+            symbols.
+        """
+        with open(filename, "r") as source_file:
+            file_content = source_file.read()
+
+        content_hash = sha256(file_content.encode("utf-8")).hexdigest()
+        cache_key = (filename, current)
+
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None and cached[0] == content_hash:
+                LOGGER.debug("Cache hit on file %s", filename)
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        deprecator = SingleFileAutoDeprecator(
+            filename=filename, current=current
+        )
+        result = (
+            content_hash,
+            deprecator.deprecate_source(file_content),
+            deprecator.deprecated_symbols,
+        )
+
+        with self._cache_lock:
+            self._cache[cache_key] = result
+            self._cache.move_to_end(cache_key)
+
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def _handle_file(self, filename, current, write):
+        try:
+            return self._process_file(filename, current, write)
+        except Exception as err:
+            # The other files of the request are still processed
+            LOGGER.warning("Cannot process the file %s: %s", filename, err)
+            return {
+                "path": filename,
+                "error": "%s: %s" % (type(err).__name__, err),
+            }
+
+    def _process_file(self, filename, current, write):
+        with self._file_lock(filename):
+            _, file_content, symbols = self._analyze_file(filename, current)
+
+            if write and file_content is not None:
+                open(filename, "w+").write(file_content)
+
+        return {
+            "path": filename,
+            "changed": file_content is not None,
+            "symbols": [
+                {"name": name, "expiry": expiry, "relocate": relocate}
+                for name, expiry, relocate in symbols
+            ],
+        }
+
+    def _process(self, params, write):
+        if not isinstance(params, dict):
+            raise RPCError(INVALID_PARAMS, "Parameters must be an object")
+
+        paths = params.get("paths")
+        current = params.get("version") or self._current
+
+        if not isinstance(paths, list) or not paths:
+            raise RPCError(INVALID_PARAMS, "Parameter paths is not provided")
+
+        if not current:
+            raise RPCError(INVALID_PARAMS, "Current version is not provided")
+
+        filenames = [
+            filename
+            for path in paths
+            for filename in iter_python_files(path)
+        ]
+
+        return list(
+            self._file_executor.map(
+                lambda filename: self._handle_file(filename, current, write),
+                filenames,
+            )
+        )
+
+    def analyze(self, params):
+        """Report the deprecated symbols without modifying the files."""
+        return self._process(params, write=False)
+
+    def clean(self, params):
+        """Remove the deprecated symbols from the files."""
+        return self._process(params, write=True)
+
+    def ping(self, params):
+        return "pong"
+
+    def shutdown(self, params):
+        self._running = False
+        return True
+
+    def handle_request(self, request):
+        """Handle a single JSON-RPC request.
+
+        :returns: `dict` The response, or None for notifications.
+        """
+        request_id = None
+
+        try:
+            if not isinstance(request, dict) or "method" not in request:
+                raise RPCError(INVALID_REQUEST, "Invalid request")
+
+            request_id = request.get("id")
+            method = self.methods.get(request["method"])
+
+            if method is None:
+                raise RPCError(
+                    METHOD_NOT_FOUND,
+                    'Method "%s" not found' % request["method"],
+                )
+
+            response = {"result": method(request.get("params", {}))}
+        except RPCError as err:
+            response = {"error": {"code": err.code, "message": err.message}}
+        except Exception as err:
+            LOGGER.exception("Failed to handle request %s", request)
+            response = {"error": {"code": SERVER_ERROR, "message": str(err)}}
+
+        if isinstance(request, dict) and "id" not in request:
+            return None
+
+        response.update({"jsonrpc": "2.0", "id": request_id})
+        return response
+
+    def handle_message(self, message):
+        """Handle a message of a request or a batch of requests.
+
+        The requests in a batch are handled concurrently.
+
+        :param message: `str` The JSON message.
+        :returns: `str` The JSON response, or None if nothing
+            is responded.
+        """
+        try:
+            request = json.loads(message)
+        except ValueError:
+            return json.dumps({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": PARSE_ERROR, "message": "Parse error"},
+            })
+
+        return self.handle_parsed_message(request)
+
+    def handle_parsed_message(self, request):
+        """Handle a parsed request or a batch of requests.
+
+        :param request: The parsed JSON message.
+        :returns: `str` The JSON response, or None if nothing
+            is responded.
+        """
+        if isinstance(request, list):
+            if not request:
+                response = self.handle_request(None)
+            else:
+                response = [
+                    r for r in self._batch_executor.map(
+                        self.handle_request, request
+                    )
+                    if r is not None
+                ] or None
+        else:
+            response = self.handle_request(request)
+
+        if response is None:
+            return None
+
+        return json.dumps(response)
+
+    def serve_stream(self, reader, writer):
+        """Serve the requests line by line from the stream.
+
+        The requests are handled concurrently, except the shutdown
+        requests, which are handled in the reading thread, so no more line
+        is read after the shutdown.
+
+        :param reader: Readable text stream.
+        :param writer: Writable text stream.
+        """
+        write_lock = threading.Lock()
+        futures = []
+
+        def respond(handle, message):
+            response = handle(message)
+            if response is None:
+                return
+
+            with write_lock:
+                writer.write(response + "\n")
+                writer.flush()
+
+        for line in reader:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except ValueError:
+                # Respond with the parse error
+                futures.append(self._stream_executor.submit(
+                    respond, self.handle_message, line
+                ))
+                continue
+
+            if is_shutdown_request(request):
+                respond(self.handle_parsed_message, request)
+
+                if not self._running:
+                    break
+
+                continue
+
+            futures.append(self._stream_executor.submit(
+                respond, self.handle_parsed_message, request
+            ))
+
+        for future in futures:
+            future.result()
+
+    def serve_unix_socket(self, address):
+        """Serve the requests on the Unix domain socket.
+
+        The stale socket file left by a server which is not running is
+        removed at start-up, and the socket file is removed once the
+        server is closed.
+
+        :param address: `str` The socket path.
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = (
+                    line.decode("utf-8") for line in self.rfile
+                )
+                writer = _SocketWriter(self.wfile)
+                server.serve_stream(reader, writer)
+
+                if not server.running:
+                    threading.Thread(target=unix_server.shutdown).start()
+
+        remove_stale_socket(address)
+        unix_server = socketserver.ThreadingUnixStreamServer(
+            address, Handler
+        )
+        LOGGER.info("Listening on socket %s", address)
+
+        try:
+            with unix_server:
+                unix_server.serve_forever()
+        finally:
+            os.unlink(address)
+
+    def close(self):
+        self._stream_executor.shutdown(wait=True)
+        self._batch_executor.shutdown(wait=True)
+        self._file_executor.shutdown(wait=True)
+
+
+def is_shutdown_request(request):
+    """Check whether the request, or any request of the batch, is a
+    shutdown request.
+
+    :param request: The parsed JSON message.
+    :returns: `bool` True if it is a shutdown request.
+    """
+    if isinstance(request, list):
+        return any(is_shutdown_request(r) for r in request)
+
+    return isinstance(request, dict) and request.get("method") == "shutdown"
+
+
+def remove_stale_socket(address):
+    """Remove the socket file if no server is listening on it.
+
+    :param address: `str` The socket path.
+    """
+    try:
+        mode = os.stat(address).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat_module.S_ISSOCK(mode):
+        raise RuntimeError("File %s exists and is not a socket" % address)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        try:
+            conn.connect(address)
+        except ConnectionRefusedError:
+            LOGGER.info("Removing the stale socket %s", address)
+            os.unlink(address)
+            return
+
+    raise RuntimeError("Server is already listening on socket %s" % address)
+
+
+class _SocketWriter:
+    def __init__(self, wfile):
+        self._wfile = wfile
+
+    def write(self, data):
+        self._wfile.write(data.encode("utf-8"))
+
+    def flush(self):
+        self._wfile.flush()
+
+
+def serve(current=None, socket_path=None):
+    """Start the deprecator server.
+
+    :param current: `str` Default current version.
+    :param socket_path: `str` The Unix domain socket path. If it is not
+        provided, the requests are served on the standard input / output.
+    """
+    server = DeprecatorServer(current=current)
+
+    try:
+        if socket_path:
+            server.serve_unix_socket(socket_path)
+        else:
+            server.serve_stream(sys.stdin, sys.stdout)
+    finally:
+        server.close()
@@ -0,0 +1,252 @@
+"""Release timeline of the deprecated components.
+
+The timeline collects the expiries of all the deprecate markers once and
+sorts them by the version order, so the queries over any number of
+versions, e.g. which components expire between two versions, are
+answered by the binary search without parsing the source code again.
+
+For example,
+
+    $ auto-deprecate timeline hello_world --from 2.0.0 --to 2.2.0
+    $ auto-deprecate timeline manifest.json --counts --json
+
+"""
+import argparse
+from bisect import bisect_left, bisect_right
+from datetime import date, time
+import json
+import sys
+
+from auto_deprecator import parse_expiry, version_key
+from auto_deprecator.manifest import Manifest
+
+TABLE_COLUMNS = ("expiry", "symbol", "file", "start", "relocate")
+
+
+class Timeline:
+    """Timeline of the deprecate markers sorted by the expiry.
+
+    The expiry versions and dates are kept in separate timelines, which
+    are queried by the versions and dates respectively.
+    """
+
+    def __init__(self, entries):
+        """Constructor.
+
+        :param entries: `List[dict]` The deprecate markers in the manifest.
+        """
+        self._versions = []
+        self._dates = []
+
+        for entry in entries:
+            expiry = parse_expiry(entry["expiry"])
+
+            if isinstance(expiry, date):
+                self._dates.append((self.date_key(expiry), entry))
+            else:
+                self._versions.append((version_key(expiry), entry))
+
+        for timeline in (self._versions, self._dates):
+            timeline.sort(key=lambda item: (
+                item[0], item[1]["file"], item[1]["start"]
+            ))
+
+        self._version_keys = [key for key, _ in self._versions]
+        self._date_keys = [key for key, _ in self._dates]
+
+    @classmethod
+    def build(cls, path):
+        """Build the timeline from the source code or manifest file.
+
+        :param path: `str` The source code path, or the manifest file
+            path if it ends with .json.
+        :returns: `Timeline` The timeline.
+        """
+        if path.endswith(".json"):
+            return cls(Manifest.load(path).entries)
+
+        return cls(Manifest.build(path).entries)
+
+    @property
+    def entries(self):
+        """All the entries sorted by the expiry.
+
+        :returns: `List[dict]` The entries of the expiry versions, followed
+            by the entries of the expiry dates.
+        """
+        return [entry for _, entry in self._versions + self._dates]
+
+    @staticmethod
+    def date_key(value, end=False):
+        """Key to order the dates and datetimes.
+
+        :param value: `date` or `datetime` The date.
+        :param end: `bool` Whether the date is the end of the day, or the
+            start otherwise.
+        :returns: `tuple` The key.
+        """
+        if hasattr(value, "time"):
+            return (value.date(), value.time().replace(tzinfo=None))
+
+        return (value, time.max if end else time.min)
+
+    def _timeline(self, version):
+        version = parse_expiry(version)
+
+        if isinstance(version, date):
+            return (
+                self._dates,
+                self._date_keys,
+                self.date_key(version),
+                self.date_key(version, end=True),
+            )
+
+        key = version_key(version)
+        return self._versions, self._version_keys, key, key
+
+    def between(self, start=None, end=None):
+        """Entries expiring between the versions, both inclusive.
+
+        :param start: `str` The start version or date. Unbounded if it
+            is not provided.
+        :param end: `str` The end version or date. Unbounded if it is not
+            provided.
+        :returns: `List[dict]` The entries sorted by the expiry.
+        """
+        assert start is not None or end is not None, (
+            "Start or end must be provided"
+        )
+        timeline, keys, start_key, end_key = self._timeline(
+            start if start is not None else end
+        )
+        lower, upper = 0, len(keys)
+
+        if start is not None and end is not None:
+            end_timeline, _, _, end_key = self._timeline(end)
+            # The versions and dates are in separate timelines
+            assert end_timeline is timeline, (
+                'Start "%s" and end "%s" must be both versions or both '
+                "dates" % (start, end)
+            )
+
+        if start is not None:
+            lower = bisect_left(keys, start_key)
+
+        if end is not None:
+            upper = bisect_right(keys, end_key)
+
+        return [entry for _, entry in timeline[lower:upper]]
+
+    def expiring(self, version):
+        """Entries expiring in the version.
+
+        :param version: `str` The version or date.
+        :returns: `List[dict]` The entries.
+        """
+        return self.between(version, version)
+
+    def removed(self, version):
+        """Entries removed by ``auto-deprecate`` in the version.
+
+        :param version: `str` The version or date.
+        :returns: `List[dict]` The entries expiring before the version.
+        """
+        timeline, keys, key, _ = self._timeline(version)
+        return [entry for _, entry in timeline[:bisect_left(keys, key)]]
+
+    def counts(self):
+        """Number of the entries by the expiry.
+
+        :returns: `List[(str, int)]` The expiries and their numbers of
+            entries, sorted by the expiry.
+        """
+        counts = []
+        for timeline in (self._versions, self._dates):
+            last_key = None
+
+            for key, entry in timeline:
+                if counts and key == last_key:
+                    counts[-1] = (counts[-1][0], counts[-1][1] + 1)
+                else:
+                    counts.append((entry["expiry"], 1))
+                last_key = key
+
+        return counts
+
+
+def format_table(rows, columns):
+    """Format the rows into a table.
+
+    :param rows: `List[dict]` The rows.
+    :param columns: `List[str]` The columns.
+    :returns: `str` The table.
+    """
+    lines = [[column.capitalize() for column in columns]]
+    for row in rows:
+        lines.append([
+            "" if row[column] is None else str(row[column])
+            for column in columns
+        ])
+
+    widths = [
+        max(len(line[i]) for line in lines) for i in range(len(columns))
+    ]
+    return "\n".join(
+        "  ".join(
+            value.ljust(width) for value, width in zip(line, widths)
+        ).rstrip()
+        for line in lines
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="auto-deprecate timeline",
+        description="Query the expiries of the deprecated components.",
+    )
+    parser.add_argument(
+        "path", type=str,
+        help="The source code path, or the manifest file (.json).",
+    )
+    parser.add_argument(
+        "--from", dest="start", type=str,
+        help="The start version or date (inclusive).",
+    )
+    parser.add_argument(
+        "--to", dest="end", type=str,
+        help="The end version or date (inclusive).",
+    )
+    parser.add_argument(
+        "--counts", dest="counts", action="store_true",
+        help="Report the number of the components by the expiry.",
+    )
+    parser.add_argument(
+        "--json", dest="json", action="store_true",
+        help="Output in JSON.",
+    )
+    args = parser.parse_args(argv)
+
+    timeline = Timeline.build(args.path)
+
+    if args.start is None and args.end is None:
+        entries = timeline.entries
+    else:
+        entries = timeline.between(args.start, args.end)
+
+    if args.counts:
+        rows = [
+            {"expiry": expiry, "count": count}
+            for expiry, count in Timeline(entries).counts()
+        ]
+        columns = ("expiry", "count")
+    else:
+        rows = entries
+        columns = TABLE_COLUMNS
+
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        sys.stdout.write(format_table(rows, columns) + "\n")
+
+    return 0
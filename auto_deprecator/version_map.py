@@ -0,0 +1,140 @@
+"""Current versions of the files in a multi-package tree.
+
+The version map assigns the current version to each file by the longest
+path prefix, so the packages in a monorepo are cleaned in a single pass,
+each against its own version. The map file is a JSON object of the paths,
+relative to the map file, and the versions, e.g.
+
+    {"packages/hello": "2.1.0", "packages/world": "1.0.0"}
+
+The version of a file can also be detected by the literal ``__version__``
+of its top level package, without importing the package.
+"""
+import json
+import logging
+from os.path import abspath, basename, dirname, isfile, join, normpath
+
+from auto_deprecator.resolver import read_source_version
+
+LOGGER = logging.getLogger(__name__)
+
+
+class VersionMap:
+    """Current versions by the path prefixes.
+    """
+
+    def __init__(self, versions=None, auto=False, default=None):
+        """Constructor.
+
+        :param versions: `Dict[str, str]` The versions by the path prefixes.
+        :param auto: `bool` Whether to detect the version by the top level
+            package if the file is not matched by any prefix.
+        :param default: `str` The version if the file is not matched.
+        """
+        self.versions = {
+            normpath(abspath(prefix)): version
+            for prefix, version in (versions or {}).items()
+        }
+        self.auto = auto
+        self.default = default
+        # The versions by the directory and the package root
+        self._directories = {}
+        self._packages = {}
+
+    @classmethod
+    def load(cls, filename, auto=False, default=None):
+        """Load the version map file.
+
+        :param filename: `str` The map file path.
+        :param auto: `bool` Whether to detect the version by the package.
+        :param default: `str` The version if the file is not matched.
+        :returns: `VersionMap` The version map.
+        """
+        with open(filename, "r") as map_file:
+            content = json.load(map_file)
+
+        if not isinstance(content, dict):
+            raise RuntimeError(
+                "The version map %s must be a JSON object" % filename
+            )
+
+        root = dirname(abspath(filename))
+        return cls(
+            {
+                join(root, prefix): version
+                for prefix, version in content.items()
+            },
+            auto=auto,
+            default=default,
+        )
+
+    def get(self, filename):
+        """Get the current version of the file.
+
+        :param filename: `str` The file path.
+        :returns: `str` The version, or None if it is not found.
+        """
+        filename = normpath(abspath(filename))
+
+        if filename in self.versions:
+            return self.versions[filename]
+
+        directory = dirname(filename)
+        try:
+            return self._directories[directory]
+        except KeyError:
+            pass
+
+        version = self._match(directory)
+
+        if version is None and self.auto:
+            version = self.detect(directory)
+
+        if version is None:
+            version = self.default
+
+        self._directories[directory] = version
+        return version
+
+    def _match(self, directory):
+        # Walk up to the longest prefix
+        while True:
+            if directory in self.versions:
+                return self.versions[directory]
+
+            parent = dirname(directory)
+            if parent == directory:
+                return None
+
+            directory = parent
+
+    def detect(self, directory):
+        """Detect the version by the top level package of the directory.
+
+        :param directory: `str` The directory path.
+        :returns: `str` The literal ``__version__`` of the top level
+            package, or None if it is not found.
+        """
+        root = None
+        while isfile(join(directory, "__init__.py")):
+            root = directory
+            directory = dirname(directory)
+
+        if root is None:
+            return None
+
+        if root not in self._packages:
+            try:
+                version = read_source_version(
+                    join(root, "__init__.py"),
+                    package=basename(root),
+                    path=[dirname(root)],
+                )
+            except (OSError, SyntaxError, ValueError) as err:
+                LOGGER.warning("Cannot read the version of %s: %s", root, err)
+                version = None
+
+            LOGGER.debug("Detected the version %s of %s", version, root)
+            self._packages[root] = version
+
+        return self._packages[root]
@@ -0,0 +1,191 @@
+"""Watch mode reporting the components removed in the version.
+
+The watcher polls the modification time and size of the source files, and
+only analyzes the files changed since the last poll. The deprecated
+symbols of each file are kept in memory, so only the symbols added or
+removed since the last poll are reported. The files are never written.
+
+For example,
+
+    $ auto-deprecate hello_world --version 2.1.0 --watch
+    + hello_world/hello.py: old_hello_world (expiry 2.0.0)
+
+"""
+import logging
+from os import scandir, stat
+from os.path import isfile
+import sys
+import time
+
+from auto_deprecator.cleaner import SingleFileAutoDeprecator
+
+LOGGER = logging.getLogger(__name__)
+
+
+def snapshot(path):
+    """Snapshot the status of the Python source files.
+
+    :param path: `str` File or directory path.
+    :returns: `Dict[str, (int, int)]` The modified time in nanoseconds and
+        the size by the file path.
+    """
+    if isfile(path):
+        file_stat = stat(path)
+        return {path: (file_stat.st_mtime_ns, file_stat.st_size)}
+
+    files = {}
+    directories = [path]
+
+    while directories:
+        directory = directories.pop()
+
+        try:
+            entries = scandir(directory)
+        except OSError as err:
+            LOGGER.debug("Cannot scan the directory %s: %s", directory, err)
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        file_stat = entry.stat()
+                        files[entry.path] = (
+                            file_stat.st_mtime_ns, file_stat.st_size
+                        )
+                except OSError:
+                    # The file is removed during the scan
+                    continue
+
+    return files
+
+
+class Watcher:
+    """Watcher of the deprecated components in the source code.
+    """
+
+    def __init__(self, path, current, today=None):
+        """Constructor.
+
+        :param path: `str` File or directory path.
+        :param current: `str` Current version.
+        :param today: `date` Current date.
+        """
+        self.path = path
+        self.current = current
+        self.today = today
+        self._snapshot = {}
+        # Deprecated symbols by the file path
+        self._results = {}
+
+    @property
+    def results(self):
+        """Deprecated symbols by the file path.
+
+        :returns: `Dict[str, List[(str, str, str)]]` List of tuples of the
+            qualified name, the expiry and the relocated name by the file.
+        """
+        return {
+            filename: list(symbols)
+            for filename, symbols in self._results.items()
+        }
+
+    def analyze(self, filename):
+        """Analyze the deprecated symbols in the file.
+
+        :param filename: `str` File path.
+        :returns: `List[(str, str, str)]` The deprecated symbols, or None
+            if the file cannot be analyzed.
+        """
+        deprecator = SingleFileAutoDeprecator(
+            filename=filename, current=self.current, today=self.today
+        )
+
+        try:
+            with open(filename, "r") as source_file:
+                deprecator.get_deprecated_lines(source_file.read())
+        except (OSError, SyntaxError, ValueError) as err:
+            # The file can be in the middle of editing
+            LOGGER.warning("Cannot analyze the file %s: %s", filename, err)
+            return None
+
+        return deprecator.deprecated_symbols
+
+    def poll(self):
+        """Analyze the files changed since the last poll.
+
+        :returns: `List[(str, str, (str, str, str))]` List of tuples of the
+            change, i.e. + (added) or - (removed), the file path and the
+            deprecated symbol.
+        """
+        current_snapshot = snapshot(self.path)
+        changes = []
+
+        for filename in sorted(set(self._snapshot) - set(current_snapshot)):
+            for symbol in self._results.pop(filename, []):
+                changes.append(("-", filename, symbol))
+
+        for filename, file_status in sorted(current_snapshot.items()):
+            if self._snapshot.get(filename) == file_status:
+                continue
+
+            LOGGER.debug("Analyzing the changed file %s", filename)
+            symbols = self.analyze(filename)
+
+            # Keep the last results if the file cannot be analyzed
+            if symbols is None:
+                continue
+
+            previous = self._results.get(filename, [])
+            changes += [
+                ("-", filename, symbol)
+                for symbol in previous
+                if symbol not in symbols
+            ]
+            changes += [
+                ("+", filename, symbol)
+                for symbol in symbols
+                if symbol not in previous
+            ]
+            self._results[filename] = symbols
+
+        self._snapshot = current_snapshot
+        return changes
+
+    def run(self, interval=1.0, output=sys.stdout, polls=None):
+        """Poll the changes and print them until interrupted.
+
+        :param interval: `float` Interval between the polls in seconds.
+        :param output: `TextIO` The output stream.
+        :param polls: `int` Number of the polls. Run until interrupted if
+            it is not provided.
+        """
+        count = 0
+
+        try:
+            while polls is None or count < polls:
+                if count > 0:
+                    time.sleep(interval)
+
+                for change, filename, (name, expiry, _) in self.poll():
+                    output.write("%s %s: %s (expiry %s)\n" % (
+                        change, filename, name, expiry
+                    ))
+
+                output.flush()
+                count += 1
+        except KeyboardInterrupt:
+            pass
+
+
+def watch(path, current, today=None, interval=1.0):
+    """Watch the deprecated components in the source code.
+
+    :param path: `str` File or directory path.
+    :param current: `str` Current version.
+    :param today: `date` Current date.
+    :param interval: `float` Interval between the polls in seconds.
+    """
+    Watcher(path, current=current, today=today).run(interval=interval)
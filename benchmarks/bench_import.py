@@ -0,0 +1,45 @@
+"""Import time of the deprecate decorator and the command line interface.
+
+The import time is measured by ``-X importtime`` in the new interpreters,
+and the median of the cumulative time is reported.
+
+    $ python benchmarks/bench_import.py
+"""
+import statistics
+import subprocess
+import sys
+
+RUNS = 20
+
+STATEMENTS = [
+    ("decorator", "from auto_deprecator import deprecate", "auto_deprecator"),
+    ("cli", "from auto_deprecator.cli import main", "auto_deprecator.cli"),
+]
+
+
+def import_time(statement, module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    for line in result.stderr.splitlines():
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+
+    raise RuntimeError("Module %s is not imported" % module)
+
+
+def main():
+    print("%10s %20s" % ("import", "cumulative time (us)"))
+
+    for name, statement, module in STATEMENTS:
+        times = [import_time(statement, module) for _ in range(RUNS)]
+        print("%10s %20d" % (name, statistics.median(times)))
+
+
+if __name__ == "__main__":
+    main()
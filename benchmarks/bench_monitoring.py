@@ -0,0 +1,52 @@
+"""Overhead of the deprecated function calls by the backend.
+
+The calls of the plain function are compared with the functions
+deprecated by the wrapper and the sys.monitoring backends. The monitoring
+backend requires Python 3.12+.
+
+    $ python benchmarks/bench_monitoring.py
+"""
+import sys
+import timeit
+
+from auto_deprecator import deprecate
+
+NUMBER = 1000000
+
+
+def plain_function():
+    pass
+
+
+@deprecate(expiry="2.1.0", current="2.0.0", warn_handler=lambda msg: None)
+def wrapper_function():
+    pass
+
+
+@deprecate(expiry="2.1.0", current="2.0.0", backend="monitoring")
+def monitoring_function():
+    pass
+
+
+FUNCTIONS = [
+    ("plain", plain_function),
+    ("wrapper", wrapper_function),
+    ("monitoring", monitoring_function),
+]
+
+
+def main():
+    if not hasattr(sys, "monitoring"):
+        print("sys.monitoring is not supported, the wrapper is used instead")
+
+    print("%12s %15s" % ("backend", "ns per call"))
+
+    for name, function in FUNCTIONS:
+        # Record the first hit before timing
+        function()
+        elapsed = min(timeit.repeat(function, number=NUMBER, repeat=5))
+        print("%12s %15.1f" % (name, elapsed / NUMBER * 1e9))
+
+
+if __name__ == "__main__":
+    main()
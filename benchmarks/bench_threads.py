@@ -0,0 +1,56 @@
+"""Throughput of the deprecated function calls by the number of threads.
+
+The decorator keeps no global lock on the hot path, so the throughput
+scales with the number of threads on the free-threaded CPython, while it
+stays flat (rather than dropping) under the GIL.
+
+    $ python benchmarks/bench_threads.py
+"""
+import sys
+import threading
+import time
+
+from auto_deprecator import deprecate
+
+CALLS = 200000
+
+
+@deprecate(expiry="2.1.0", current="2.0.0", warn_handler=lambda msg: None)
+def deprecated_function():
+    pass
+
+
+def run(threads):
+    barrier = threading.Barrier(threads + 1)
+
+    def call():
+        barrier.wait()
+        for _ in range(CALLS):
+            deprecated_function()
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+
+    return threads * CALLS / (time.perf_counter() - start)
+
+
+def main():
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("Python %s (GIL %s)" % (sys.version.split()[0], gil))
+    print("%8s %16s %8s" % ("threads", "calls / second", "scaling"))
+
+    baseline = None
+    for threads in (1, 2, 4, 8):
+        throughput = run(threads)
+        baseline = baseline or throughput
+        print("%8d %16.0f %8.2f" % (threads, throughput, throughput / baseline))
+
+
+if __name__ == "__main__":
+    main()
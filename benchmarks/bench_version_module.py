@@ -0,0 +1,90 @@
+"""First call latency of resolving the version module.
+
+A package with a heavy ``__init__`` is generated in a temporary directory,
+and the version is resolved by each strategy in new interpreters. The
+median time of the first resolution is reported.
+
+    $ python benchmarks/bench_version_module.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+
+RUNS = 20
+
+# The package imports a number of the standard modules on import
+PACKAGE_INIT = """
+import asyncio
+import decimal
+import email.mime.multipart
+import http.client
+import json
+import logging.handlers
+import unittest
+import xml.dom.minidom
+
+__version__ = "2.0.0"
+"""
+
+METADATA = """Metadata-Version: 2.1
+Name: heavy_package
+Version: 2.0.0
+"""
+
+STRATEGIES = [
+    ("import", "version_from_import"),
+    ("source", "version_from_source"),
+    ("metadata", "version_from_metadata"),
+    ("resolve", "resolve_version"),
+]
+
+STATEMENT = """
+from time import perf_counter
+from auto_deprecator.resolver import {function}
+start = perf_counter()
+assert {function}("heavy_package") == "2.0.0"
+print(perf_counter() - start)
+"""
+
+
+def make_package(path):
+    os.mkdir(os.path.join(path, "heavy_package"))
+    with open(os.path.join(path, "heavy_package", "__init__.py"), "w") as f:
+        f.write(PACKAGE_INIT)
+
+    dist_info = os.path.join(path, "heavy_package-2.0.0.dist-info")
+    os.mkdir(dist_info)
+    with open(os.path.join(dist_info, "METADATA"), "w") as f:
+        f.write(METADATA)
+
+
+def resolve_time(path, function):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [path, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", STATEMENT.format(function=function)],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        env=env,
+        check=True,
+    )
+    return float(result.stdout)
+
+
+def main():
+    print("%10s %20s" % ("strategy", "first call (ms)"))
+
+    with TemporaryDirectory() as path:
+        make_package(path)
+
+        for name, function in STRATEGIES:
+            times = [resolve_time(path, function) for _ in range(RUNS)]
+            print("%10s %20.3f" % (name, statistics.median(times) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Memory and decoration time of the deprecated function wrappers.
+
+A number of functions are decorated by the wrapper object and by the
+closure with ``functools.wraps`` of the baseline decorator, which is
+copied verbatim. The allocated bytes per decorated function and the
+decoration time are reported.
+
+    $ python benchmarks/bench_wrapper.py
+"""
+from functools import wraps
+from time import perf_counter
+import tracemalloc
+
+from auto_deprecator import (
+    DeprecatedFunction,
+    FunctionStage,
+    alert_future_deprecation,
+    check_stage,
+    deprecate,
+    handle_deprecation,
+)
+
+FUNCTIONS = 8000
+
+
+def baseline_deprecate(
+    expiry=None,
+    current=None,
+    relocate=None,
+    version_module=None,
+    error_handler=None,
+    warn_handler=None,
+):
+    """The deprecate decorator before the wrapper object."""
+    def _deprecate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Check whether the function is deprecated
+            stage = check_stage(
+                expiry=expiry, current=current, version_module=version_module
+            )
+
+            # Throw exception if deprecation
+            if stage != FunctionStage.WARNING:
+                handle_deprecation(
+                    handler=error_handler,
+                    func=func,
+                    expiry=expiry,
+                    relocate=relocate,
+                )
+
+            # Run the function
+            result = func(*args, **kwargs)
+
+            # Alert the user that the function will be
+            # deprecated
+            if stage == FunctionStage.WARNING:
+                alert_future_deprecation(
+                    handler=warn_handler,
+                    func=func,
+                    expiry=expiry,
+                    relocate=relocate,
+                )
+
+            return result
+
+        return wrapper
+
+    return _deprecate
+
+
+def make_functions():
+    functions = []
+    for index in range(FUNCTIONS):
+        def function():
+            """Function."""
+
+        function.__name__ = function.__qualname__ = "function_%d" % index
+        functions.append(function)
+
+    return functions
+
+
+def measure(decorator):
+    functions = make_functions()
+
+    tracemalloc.start()
+    start = perf_counter()
+    wrappers = [
+        decorator(expiry="2.1.0", current="2.0.0")(function)
+        for function in functions
+    ]
+    elapsed = perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(wrappers) == FUNCTIONS
+    return size / FUNCTIONS, elapsed / FUNCTIONS * 1e6
+
+
+def main():
+    assert isinstance(deprecate(current="2.0.0")(len), DeprecatedFunction)
+    print("%10s %15s %20s" % ("wrapper", "bytes/function", "decoration (us)"))
+
+    for name, decorator in [
+        ("baseline", baseline_deprecate),
+        ("object", deprecate),
+    ]:
+        size, elapsed = measure(decorator)
+        print("%10s %15.0f %20.2f" % (name, size, elapsed))
+
+
+if __name__ == "__main__":
+    main()
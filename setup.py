@@ -17,22 +17,20 @@ setup_requirements = [
 ]
 
 test_requirements = [
-    "pytest>=3",
+    "pytest>=6.2",
+    "pytest-xdist",
 ]
 
 setup(
     author="Gavin Chan",
     author_email="gavincyi@gmail.com",
-    python_requires=">=3.5",
+    python_requires=">=3.8",
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Natural Language :: English",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
     ],
     description="Python decorator and command to automate deprecating components",
@@ -52,6 +50,9 @@ setup(
     zip_safe=False,
     entry_points="""
         [console_scripts]
-        auto-deprecate = auto_deprecator:main
+        auto-deprecate = auto_deprecator.cli:main
+        auto-deprecate-client = auto_deprecator.client:main
+        [pytest11]
+        auto_deprecator = auto_deprecator.pytest_plugin
     """,
 )
@@ -0,0 +1,413 @@
+"""Random module generator and differential harness of the cleaning engines.
+
+The generator builds random modules of the nested functions and classes,
+the deprecate decorators stacked with the other decorators, and the
+auto-deprecate comments. The engines clean the same modules, and their
+outputs must be identical byte for byte. The engines supporting only some
+of the modules are compared on the modules generated with their options
+in ENGINE_MODULES. Run the harness to report the speedup of each engine
+over the reference in each case,
+
+    $ python -m tests.function.fuzz --cases 100
+
+"""
+import argparse
+from collections import namedtuple
+import difflib
+import random
+from time import perf_counter
+
+from auto_deprecator.cleaner import SingleFileAutoDeprecator
+
+from .legacy_cleaner import LegacyAutoDeprecator
+
+EXPIRIES = ("1.0.0", "2.0.0", "2.1.0", "2.2.0", "3.0.0")
+
+OTHER_DECORATORS = ("@staticmethod", "@functools.lru_cache()", "@property")
+
+CURRENT = "2.1.0"
+
+# The error raised by the engine, which is compared as the output
+EngineError = namedtuple("EngineError", ["type", "message"])
+
+
+class ModuleGenerator:
+    """Generator of the random Python modules.
+    """
+
+    def __init__(
+            self, seed, max_depth=2, max_components=6, async_defs=True,
+            trailing_code=True, comments=True, closed_bodies=False):
+        """Constructor.
+
+        :param seed: `int` The random seed.
+        :param max_depth: `int` Maximum depth of the nested components.
+        :param max_components: `int` Maximum number of the components in
+            each body.
+        :param async_defs: `bool` Whether to generate the async functions.
+        :param trailing_code: `bool` Whether to generate the code and the
+            comments after the last component of the bodies.
+        :param comments: `bool` Whether to generate the comments between
+            the components.
+        :param closed_bodies: `bool` Whether to follow the imports and the
+            last component of each class by a statement, which the
+            line-based engine requires to find the end of the components.
+        """
+        self._random = random.Random(seed)
+        self.max_depth = max_depth
+        self.max_components = max_components
+        self.async_defs = async_defs
+        self.trailing_code = trailing_code
+        self.comments = comments
+        self.closed_bodies = closed_bodies
+        self._count = 0
+
+    def _name(self, prefix):
+        self._count += 1
+        return "%s_%d" % (prefix, self._count)
+
+    def _marker(self):
+        """Marker of the component, i.e. decorator, comment or nothing."""
+        choice = self._random.random()
+
+        if choice < 0.4:
+            return "decorator", self._random.choice(EXPIRIES)
+        elif choice < 0.55:
+            return "comment", self._random.choice(EXPIRIES)
+
+        return None, None
+
+    def _statement(self, indent):
+        return indent + self._random.choice((
+            "pass",
+            "value = 1",
+            "print('hello world')",
+            "return None",
+        )) + "\n"
+
+    def _function(self, indent, depth):
+        marker, expiry = self._marker()
+        is_async = self.async_defs and self._random.random() < 0.2
+        lines = []
+
+        if marker == "decorator":
+            lines.append('%s@deprecate(expiry="%s")\n' % (indent, expiry))
+
+        if self._random.random() < 0.2:
+            lines.append(
+                indent + self._random.choice(OTHER_DECORATORS) + "\n"
+            )
+
+        lines.append("%s%sdef %s(*args, **kwargs):\n" % (
+            indent, "async " if is_async else "", self._name("function"),
+        ))
+
+        body_indent = indent + "    "
+        if self._random.random() < 0.3:
+            lines.append('%s"""Docstring."""\n' % body_indent)
+
+        if marker == "comment":
+            lines.append(
+                "%s# auto-deprecate: expiry=%s\n" % (body_indent, expiry)
+            )
+
+        if depth < self.max_depth and self._random.random() < 0.3:
+            lines += self._body(body_indent, depth + 1)
+
+        lines.append(self._statement(body_indent))
+        return lines
+
+    def _class(self, indent, depth):
+        marker, expiry = self._marker()
+        lines = []
+
+        if marker == "decorator":
+            lines.append('%s@deprecate(expiry="%s")\n' % (indent, expiry))
+
+        lines.append("%sclass %s:\n" % (indent, self._name("Class")))
+
+        body_indent = indent + "    "
+        if marker == "comment":
+            lines.append(
+                "%s# auto-deprecate: expiry=%s\n" % (body_indent, expiry)
+            )
+
+        if depth < self.max_depth:
+            lines += self._body(body_indent, depth + 1)
+
+        if depth >= self.max_depth or self.closed_bodies:
+            lines.append(body_indent + "value = 1\n")
+
+        return lines
+
+    def _body(self, indent, depth):
+        lines = []
+        separator = "\n\n" if not indent else "\n"
+
+        for _ in range(self._random.randint(1, self.max_components)):
+            if self.comments and self._random.random() < 0.2:
+                lines.append("%s# Comment %d\n" % (indent, self._count))
+
+            if depth < self.max_depth and self._random.random() < 0.3:
+                lines += self._class(indent, depth)
+            else:
+                lines += self._function(indent, depth)
+
+            lines.append(separator)
+
+        if self.trailing_code and self._random.random() < 0.3:
+            lines.append("%s# Trailing comment\n" % indent)
+            lines.append(self._statement(indent).replace(
+                "return None", "value = None"
+            ))
+
+        return lines
+
+    def generate(self):
+        """Generate the module.
+
+        :returns: `str` The source code.
+        """
+        lines = [
+            "import functools\n",
+            "\n",
+            "from auto_deprecator import deprecate\n",
+            "\n\n",
+        ]
+
+        if self.closed_bodies:
+            lines.append("VALUE = 1\n\n\n")
+
+        lines += self._body("", 0)
+
+        if self.trailing_code and self._random.random() < 0.5:
+            lines.append('if __name__ == "__main__":\n    print("main")\n')
+
+        return "".join(lines)
+
+
+def generate_module(seed, **kwargs):
+    """Generate a random module.
+
+    :param seed: `int` The random seed.
+    :returns: `str` The source code.
+    """
+    return ModuleGenerator(seed, **kwargs).generate()
+
+
+def reference_engine(file_content, current):
+    """Clean the source code by SingleFileAutoDeprecator.
+
+    :param file_content: `str` Source code.
+    :param current: `str` Current version.
+    :returns: `str` The cleaned source code, or None if it is unchanged.
+    """
+    return SingleFileAutoDeprecator(
+        filename=None, current=current
+    ).deprecate_source(file_content)
+
+
+def legacy_engine(file_content, current):
+    """Clean the source code by the line-based engine.
+
+    The engine strips the line ending at the end of the file, which is
+    restored, so the other differences are compared.
+
+    :param file_content: `str` Source code.
+    :param current: `str` Current version.
+    :returns: `str` The cleaned source code, or None if it is unchanged.
+    """
+    output = LegacyAutoDeprecator(current=current).deprecate_source(
+        file_content
+    )
+
+    if output:
+        output += "\n"
+
+    return output
+
+
+# The engines compared with the reference, which can be extended by the
+# optimized engines taking the source code and the current version
+ENGINES = {
+    "reference": reference_engine,
+    "legacy": legacy_engine,
+}
+
+# The options of the modules generated for the engines which do not
+# support all the modules. The line-based engine does not support the
+# async functions, requires a statement after the last component of the
+# bodies, and removes the comments up to the next component
+ENGINE_MODULES = {
+    "legacy": {
+        "async_defs": False,
+        "closed_bodies": True,
+        "comments": False,
+        "trailing_code": False,
+    },
+}
+
+
+def generate_engine_module(seed, name, **kwargs):
+    """Generate a random module supported by the engine.
+
+    :param seed: `int` The random seed.
+    :param name: `str` The engine name.
+    :returns: `str` The source code.
+    """
+    kwargs.update(ENGINE_MODULES.get(name, {}))
+    return generate_module(seed, **kwargs)
+
+
+def run_engine(engine, file_content, current, number=1):
+    """Run the engine and measure the time.
+
+    :returns: `(str, float)` The output, or the EngineError if the engine
+        raises an error, and the best time in seconds.
+    """
+    best = None
+
+    for _ in range(number):
+        start = perf_counter()
+        try:
+            output = engine(file_content, current)
+        except Exception as err:
+            output = EngineError(type(err).__name__, str(err))
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return output, best
+
+
+def format_output(output, file_content):
+    if output is None:
+        return file_content
+
+    if isinstance(output, EngineError):
+        return "%s: %s\n" % output
+
+    return output
+
+
+def compare_engines(file_content, current=CURRENT, engines=None, number=1):
+    """Compare the outputs of the engines with the reference.
+
+    :param file_content: `str` Source code.
+    :param current: `str` Current version.
+    :param engines: `Dict[str, Callable]` The engines by the name, of
+        which the first is the reference, supporting the module. Default
+        is all the engines.
+    :param number: `int` Number of the runs of each engine.
+    :returns: `Dict[str, float]` The best time of each engine.
+    :raises AssertionError: The output differs from the reference.
+    """
+    engines = engines or ENGINES
+    names = list(engines)
+    expected, reference_time = run_engine(
+        engines[names[0]], file_content, current, number
+    )
+    times = {names[0]: reference_time}
+
+    for name in names[1:]:
+        output, times[name] = run_engine(
+            engines[name], file_content, current, number
+        )
+
+        if output != expected:
+            diff = "".join(difflib.unified_diff(
+                format_output(expected, file_content).splitlines(True),
+                format_output(output, file_content).splitlines(True),
+                names[0],
+                name,
+            ))
+            raise AssertionError(
+                "The engine %s differs from %s:\n%s\nSource:\n%s" % (
+                    name, names[0], diff, file_content
+                )
+            )
+
+    return times
+
+
+def load_engine(spec):
+    """Load the engine by the specification.
+
+    :param spec: `str` The engine name and the function path, e.g.
+        fast=package.module:clean_source.
+    :returns: `(str, Callable)` The name and the engine.
+    """
+    from importlib import import_module
+
+    name, _, path = spec.partition("=")
+    module_name, _, function_name = path.partition(":")
+    assert name and module_name and function_name, (
+        'Invalid engine "%s"' % spec
+    )
+    return name, getattr(import_module(module_name), function_name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare the cleaning engines on the random modules."
+    )
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--number", type=int, default=5)
+    parser.add_argument("--max-depth", type=int, default=2)
+    parser.add_argument("--max-components", type=int, default=6)
+    parser.add_argument("--current", default=CURRENT)
+    parser.add_argument(
+        "--engine",
+        action="append",
+        default=[],
+        help="Engine compared with the reference, e.g. "
+             "fast=package.module:clean_source.",
+    )
+    parser.add_argument("--no-async", action="store_true")
+    parser.add_argument("--no-trailing-code", action="store_true")
+    parser.add_argument("--no-comments", action="store_true")
+    args = parser.parse_args(argv)
+
+    engines = dict(ENGINES)
+    engines.update(load_engine(spec) for spec in args.engine)
+    names = list(engines)
+    options = {
+        "max_depth": args.max_depth,
+        "max_components": args.max_components,
+        "async_defs": not args.no_async,
+        "trailing_code": not args.no_trailing_code,
+        "comments": not args.no_comments,
+    }
+
+    print("%6s %6s %15s %s" % (
+        "seed", "lines", names[0] + " (ms)",
+        " ".join("%12s" % name for name in names[1:]),
+    ))
+
+    for seed in range(args.seed, args.seed + args.cases):
+        file_content = generate_module(seed, **options)
+        _, reference_time = run_engine(
+            engines[names[0]], file_content, args.current, args.number
+        )
+        speedups = []
+
+        # Each engine is compared on the modules it supports
+        for name in names[1:]:
+            times = compare_engines(
+                generate_engine_module(seed, name, **options),
+                current=args.current,
+                engines={names[0]: engines[names[0]], name: engines[name]},
+                number=args.number,
+            )
+            speedups.append(times[names[0]] / times[name])
+
+        print("%6d %6d %15.3f %s" % (
+            seed,
+            file_content.count("\n"),
+            reference_time * 1000,
+            " ".join("%11.2fx" % speedup for speedup in speedups),
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Frozen copy of the line-based cleaning engine.
+
+The engine computes the end of each component by the start of the next
+sibling. Only the removal by the expiry versions is kept, which the
+differential harness in ``fuzz`` compares with the span-based engine in
+``auto_deprecator.cleaner`` on the modules the engine supports.
+"""
+import ast
+from io import BytesIO, StringIO
+from tokenize import tokenize, COMMENT
+
+from auto_deprecator import FunctionStage, check_stage
+
+
+class LegacyAutoDeprecator:
+    """Line-based auto deprecator.
+    """
+
+    def __init__(self, current):
+        """Constructor.
+
+        :param current: `str` Current version.
+        """
+        self._current = current
+        self._deprecate_tokens = []
+
+    @staticmethod
+    def is_nestable(body):
+        return isinstance(body, (ast.FunctionDef, ast.ClassDef))
+
+    @classmethod
+    def check_import_deprecator_exists(cls, tree, last_lineno):
+        import_deprecator_lines = []
+
+        for index, body in enumerate(tree.body):
+            if (
+                isinstance(body, ast.ImportFrom)
+                and body.module
+                and "auto_deprecator" in body.module
+            ):
+                if index != len(tree.body) - 1:
+                    end_lineno = tree.body[index + 1].lineno
+                else:
+                    end_lineno = last_lineno
+
+                import_deprecator_lines.append((body.lineno, end_lineno))
+
+        return import_deprecator_lines
+
+    @classmethod
+    def check_tree_deprecator_exists(cls, tree):
+        for body in tree.body:
+            if cls.is_nestable(body):
+                if cls.check_tree_deprecator_exists(body):
+                    return True
+
+            if cls.get_body_deprecate_deprecator(body):
+                return True
+
+        return False
+
+    @classmethod
+    def get_body_deprecate_deprecator(cls, body):
+        for decorator in getattr(body, "decorator_list", []):
+            func = getattr(decorator, "func", None)
+            if (
+                getattr(func, "id", None) == "deprecate"
+                or getattr(func, "attr", None) == "deprecate"
+            ):
+                return decorator
+
+        return None
+
+    @classmethod
+    def get_function_lineno(cls, body):
+        if getattr(body, "decorator_list", None):
+            return body.decorator_list[0].lineno
+
+        return body.lineno
+
+    @classmethod
+    def get_deprecate_tokens(cls, file_content):
+        """Get deprecate tokens.
+
+        :returns: `List[(int, int, str)]` List of tuples of which
+            the first and second is the start and end of the line
+            number, and the third is the expiry version.
+        """
+        deprecate_tokens = []
+
+        for (t_type, t_string, (srow, _), (erow, _), _) in tokenize(
+            BytesIO(file_content.encode("utf-8")).readline
+        ):
+            if t_type != COMMENT:
+                continue
+
+            t_string = t_string.lstrip("# ")
+            if not t_string.startswith("auto-deprecate:"):
+                continue
+
+            expiry = t_string.replace("auto-deprecate:", "").strip(" ")
+            expiry = expiry.replace("expiry=", "").strip(" ")
+            deprecate_tokens.append((srow, erow, expiry))
+
+        return deprecate_tokens
+
+    def get_deprecate_expiry_from_comment(
+            self, body, start_lineno, end_lineno):
+        # The comment is before the first inner component
+        for inner_body in body.body:
+            end_lineno = self.get_function_lineno(inner_body)
+            if self.is_nestable(inner_body):
+                break
+
+        for (srow, erow, expiry) in self._deprecate_tokens:
+            if srow >= start_lineno and erow < end_lineno:
+                return expiry
+
+        return None
+
+    def get_body_deprecate_expiry(self, body, start_lineno, end_lineno):
+        """Get the expiry version of the body.
+
+        :returns: `str` Expiry version.
+        """
+        if not self.is_nestable(body):
+            return None
+
+        deprecate_decorator = self.get_body_deprecate_deprecator(body)
+
+        if deprecate_decorator is not None:
+            if deprecate_decorator.args:
+                return deprecate_decorator.args[0].value
+
+            for keyword in deprecate_decorator.keywords:
+                if keyword.arg == "expiry":
+                    return keyword.value.value
+
+            return None
+
+        return self.get_deprecate_expiry_from_comment(
+            body, start_lineno, end_lineno
+        )
+
+    def find_deprecated_lines(self, tree, begin_lineno, last_lineno):
+        deprecated_lines = []
+        deprecated_body = []
+
+        for index, body in enumerate(tree.body):
+            start_lineno = self.get_function_lineno(body)
+
+            if index != len(tree.body) - 1:
+                end_lineno = self.get_function_lineno(tree.body[index + 1])
+            else:
+                end_lineno = last_lineno
+
+            expiry = self.get_body_deprecate_expiry(
+                body, start_lineno, end_lineno
+            )
+
+            # Loop into the body only if it can contain inner
+            # function / inner class
+            if self.is_nestable(body):
+                deprecated_lines += self.find_deprecated_lines(
+                    body, start_lineno, last_lineno
+                )
+
+                if len(body.body) == 0:
+                    deprecated_body.append(body)
+
+            if expiry is None or check_stage(
+                expiry=expiry, current=self._current
+            ) != FunctionStage.CLEANING:
+                continue
+
+            deprecated_lines.append((start_lineno, end_lineno))
+            deprecated_body.append(body)
+
+        # Remove the deprecated body from the tree
+        for body in deprecated_body:
+            tree.body.remove(body)
+
+        # If no element is found in the body, remove the whole tree
+        if len(tree.body) == 0:
+            deprecated_lines = [(begin_lineno, last_lineno)]
+
+        return deprecated_lines
+
+    def get_deprecated_lines(self, file_content):
+        """Get the lines of the deprecated components.
+
+        :param file_content: `str` Source code of the file.
+        :returns: `List[(int, int)]` List of tuples of the start (inclusive)
+            and end (exclusive) line numbers, sorted backward.
+        """
+        last_lineno = len(StringIO(file_content, newline="").readlines()) + 1
+        tree = ast.parse(file_content)
+        self._deprecate_tokens = self.get_deprecate_tokens(file_content)
+        deprecator_import_lines = self.check_import_deprecator_exists(
+            tree, last_lineno
+        )
+        deprecated_lines = self.find_deprecated_lines(tree, 1, last_lineno)
+
+        if not deprecated_lines:
+            return []
+
+        # Remove the import of the auto_deprecator if no more
+        # deprecate decorator is found
+        if not self.check_tree_deprecator_exists(tree):
+            deprecated_lines += deprecator_import_lines
+
+        # Skip the lines of the inner components if the outer component
+        # is deprecated as well
+        outer_lines = []
+        for start_lineno, end_lineno in sorted(
+            set(deprecated_lines), key=lambda x: (x[0], -x[1])
+        ):
+            if outer_lines and end_lineno <= outer_lines[-1][1]:
+                continue
+
+            outer_lines.append((start_lineno, end_lineno))
+
+        return sorted(outer_lines, key=lambda x: x[0], reverse=True)
+
+    def deprecate_source(self, file_content):
+        """Deprecate the source code.
+
+        :param file_content: `str` Source code of the file.
+        :returns: `str` The source code without the deprecated
+            components and the trailing line ending, or None if nothing
+            is deprecated.
+        """
+        deprecated_lines = self.get_deprecated_lines(file_content)
+
+        if not deprecated_lines:
+            return None
+
+        # Remove the deprecated functions from backward
+        filestream = StringIO(file_content, newline="").readlines()
+
+        for start_lineno, end_lineno in deprecated_lines:
+            del filestream[start_lineno - 1 : end_lineno - 1]
+
+        return "".join(filestream).rstrip()
@@ -0,0 +1,150 @@
+import csv
+import tarfile
+import zipfile
+from io import BytesIO, StringIO
+
+import pytest
+
+from auto_deprecator.artifact import (
+    artifact_version,
+    clean_artifact,
+    record_hash,
+)
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_0_0,
+    DEPRECATE_FUNCTION_2_2_0,
+)
+
+MODULE_SOURCE = (
+    IMPORT_STATEMENT
+    + NORMAL_FUNCTION
+    + DEPRECATE_FUNCTION_2_0_0
+    + DEPRECATE_FUNCTION_2_2_0
+)
+
+DEPRECATED_SOURCE = (
+    IMPORT_STATEMENT + NORMAL_FUNCTION + DEPRECATE_FUNCTION_2_2_0
+)
+
+MEMBERS = {
+    "package/__init__.py": b"",
+    "package/functions.py": MODULE_SOURCE.encode("utf-8"),
+    "package/data.txt": b"deprecate nothing",
+}
+
+
+def make_wheel(path):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as wheel:
+        record = StringIO()
+        writer = csv.writer(record, lineterminator="\n")
+
+        for name, data in MEMBERS.items():
+            wheel.writestr(name, data)
+            writer.writerow([name, record_hash(data), len(data)])
+
+        writer.writerow(["package-2.1.0.dist-info/RECORD", "", ""])
+        wheel.writestr("package-2.1.0.dist-info/RECORD", record.getvalue())
+
+
+def test_artifact_version():
+    assert artifact_version("dist/package-2.1.0-py3-none-any.whl") == "2.1.0"
+    assert artifact_version("dist/package-2.1.0-1-py3-none-any.whl") == (
+        "2.1.0"
+    )
+    assert artifact_version("dist/package-2.1.0.tar.gz") == "2.1.0"
+    assert artifact_version("dist/my-package-2.1.0.tar.gz") == "2.1.0"
+
+    with pytest.raises(RuntimeError):
+        artifact_version("dist/my-package-2.1.0-py3-none-any-extra.whl")
+
+
+def test_clean_wheel(tmp_path):
+    source = str(tmp_path / "package-2.1.0-py3-none-any.whl")
+    destination = str(tmp_path / "cleaned.whl")
+    make_wheel(source)
+
+    deprecated = clean_artifact(source, destination)
+
+    assert deprecated == ["package/functions.py"]
+
+    with zipfile.ZipFile(destination) as wheel:
+        data = wheel.read("package/functions.py")
+        assert data.decode("utf-8") == DEPRECATED_SOURCE
+        assert wheel.getinfo("package/functions.py").compress_type == (
+            zipfile.ZIP_DEFLATED
+        )
+
+        records = {
+            row[0]: row[1:]
+            for row in csv.reader(StringIO(
+                wheel.read("package-2.1.0.dist-info/RECORD").decode("utf-8")
+            ))
+        }
+
+        for name in MEMBERS:
+            member = wheel.read(name)
+            assert records[name] == [record_hash(member), str(len(member))]
+
+        assert records["package-2.1.0.dist-info/RECORD"] == ["", ""]
+
+
+def test_clean_sdist_in_place(tmp_path):
+    source = str(tmp_path / "package-2.1.0.tar.gz")
+
+    with tarfile.open(source, "w:gz") as sdist:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo("package-2.1.0/" + name)
+            info.size = len(data)
+            sdist.addfile(info, BytesIO(data))
+
+    deprecated = clean_artifact(source)
+
+    assert deprecated == ["package-2.1.0/package/functions.py"]
+
+    with tarfile.open(source, "r:gz") as sdist:
+        data = sdist.extractfile("package-2.1.0/package/functions.py").read()
+        assert data.decode("utf-8") == DEPRECATED_SOURCE
+        assert sorted(sdist.getnames()) == sorted(
+            "package-2.1.0/" + name for name in MEMBERS
+        )
+
+
+def test_clean_sdist_invalid_member(tmp_path, caplog):
+    source = str(tmp_path / "my-package-2.1.0.tar.gz")
+    members = dict(MEMBERS)
+    members["package/broken.py"] = b"from auto_deprecator import deprecate\n("
+
+    with tarfile.open(source, "w:gz") as sdist:
+        for name, data in members.items():
+            info = tarfile.TarInfo("my-package-2.1.0/" + name)
+            info.size = len(data)
+            sdist.addfile(info, BytesIO(data))
+
+    deprecated = clean_artifact(source)
+
+    assert deprecated == ["my-package-2.1.0/package/functions.py"]
+    assert "Cannot analyze the member my-package-2.1.0/package/broken.py" in (
+        caplog.text
+    )
+
+    with tarfile.open(source, "r:gz") as sdist:
+        data = sdist.extractfile("my-package-2.1.0/package/broken.py").read()
+        assert data == members["package/broken.py"]
+
+
+def test_build_backend_editable_hooks():
+    build_meta = pytest.importorskip("setuptools.build_meta")
+    if not hasattr(build_meta, "build_editable"):
+        pytest.skip("Editable installs are not supported by setuptools")
+
+    from auto_deprecator import build_backend
+
+    for hook in (
+        "build_editable",
+        "get_requires_for_build_editable",
+        "prepare_metadata_for_build_editable",
+    ):
+        assert getattr(build_backend, hook) is getattr(build_meta, hook)
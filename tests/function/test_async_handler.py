@@ -0,0 +1,169 @@
+import gc
+import os
+import threading
+import time
+import weakref
+
+import pytest
+
+from auto_deprecator import AsyncHandler, deprecate
+from auto_deprecator.handlers import _HANDLERS, _flush_handlers
+
+
+def test_async_handler_delivery():
+    messages = []
+    handler = AsyncHandler(messages.append)
+
+    @deprecate(expiry="2.1.0", current="2.0.0", warn_handler=handler)
+    def async_warn_handler():
+        return "hello"
+
+    assert async_warn_handler() == "hello"
+    assert handler.flush(timeout=5)
+    assert messages == [
+        'Function "async_warn_handler" will be deprecated on version 2.1.0.'
+    ]
+    handler.close(timeout=5)
+
+
+def test_async_handler_off_calling_thread():
+    release = threading.Event()
+    threads = []
+
+    def slow_handler(msg):
+        threads.append(threading.current_thread())
+        release.wait(5)
+
+    handler = AsyncHandler(slow_handler)
+
+    @deprecate(expiry="2.1.0", current="2.2.0", error_handler=handler)
+    def async_error_handler():
+        return "hello"
+
+    # The call returns before the handler finishes
+    assert async_error_handler() == "hello"
+    release.set()
+    assert handler.flush(timeout=5)
+    assert threads and threads[0] is not threading.current_thread()
+    handler.close(timeout=5)
+
+
+def test_async_handler_drop():
+    release = threading.Event()
+    messages = []
+
+    def blocking_handler(msg):
+        release.wait(5)
+        messages.append(msg)
+
+    handler = AsyncHandler(blocking_handler, maxsize=2)
+    handler("first")
+    # Wait until the worker takes the first message
+    while handler._queue:
+        pass
+
+    for index in range(5):
+        handler("message %d" % index)
+
+    assert handler.dropped == 3
+    release.set()
+    assert handler.flush(timeout=5)
+    assert messages == ["first", "message 0", "message 1"]
+    handler.close(timeout=5)
+
+
+def test_async_handler_coalesce():
+    release = threading.Event()
+    messages = []
+
+    def blocking_handler(msg):
+        release.wait(5)
+        messages.append(msg)
+
+    handler = AsyncHandler(blocking_handler, policy="coalesce")
+    handler("first")
+    while handler._queue:
+        pass
+
+    for _ in range(10):
+        handler("hello")
+        handler("world")
+
+    assert handler.coalesced == 18
+    release.set()
+    assert handler.flush(timeout=5)
+    assert messages == ["first", "hello", "world"]
+    handler.close(timeout=5)
+
+
+def test_async_handler_close():
+    messages = []
+    handler = AsyncHandler(messages.append)
+    handler("hello")
+    handler.close(timeout=5)
+    handler("world")
+
+    assert messages == ["hello"]
+    assert handler.dropped == 1
+
+
+def test_async_handler_flush_on_exit_timeout():
+    release = threading.Event()
+    handler = AsyncHandler(lambda msg: release.wait())
+    handler("hello")
+
+    try:
+        started = time.monotonic()
+        _flush_handlers(timeout=0.1)
+        assert time.monotonic() - started < 5
+    finally:
+        release.set()
+        handler.close(timeout=5)
+
+
+def test_async_handler_not_kept_alive():
+    handler = AsyncHandler(lambda msg: None)
+    assert handler in _HANDLERS
+    ref = weakref.ref(handler)
+    del handler
+    gc.collect()
+
+    assert ref() is None
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="Fork is not supported"
+)
+def test_async_handler_after_fork():
+    messages = []
+    release = threading.Event()
+
+    def handle(msg):
+        release.wait()
+        messages.append(msg)
+
+    handler = AsyncHandler(handle)
+    handler("parent")
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # The background thread holding the condition does not exist in
+        # the child process
+        try:
+            release.set()
+            handler("child")
+            ok = handler.flush(timeout=5) and messages == ["child"]
+            os.write(write_fd, b"1" if ok else b"0")
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    try:
+        assert os.read(read_fd, 1) == b"1"
+    finally:
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        release.set()
+        handler.close(timeout=5)
+
+    assert messages == ["parent"]
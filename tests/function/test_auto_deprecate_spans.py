@@ -0,0 +1,109 @@
+from auto_deprecator.cleaner import SingleFileAutoDeprecator
+
+
+def deprecate_source(file_content, current="2.1.0"):
+    return SingleFileAutoDeprecator(
+        filename=None, current=current
+    ).deprecate_source(file_content)
+
+
+def test_async_function():
+    file_content = (
+        "from auto_deprecator import deprecate\n"
+        "\n"
+        "\n"
+        "async def hello():\n"
+        "    pass\n"
+        "\n"
+        "\n"
+        '@deprecate(expiry="2.0.0")\n'
+        "async def old_hello():\n"
+        "    pass\n"
+    )
+
+    assert deprecate_source(file_content) == "async def hello():\n    pass\n"
+
+
+def test_import_with_decorated_function():
+    file_content = (
+        "from auto_deprecator import deprecate\n"
+        "@functools.lru_cache()\n"
+        "def hello():\n"
+        "    pass\n"
+        "\n"
+        "\n"
+        '@deprecate(expiry="2.0.0")\n'
+        "def old_hello():\n"
+        "    pass\n"
+    )
+
+    assert deprecate_source(file_content) == (
+        "@functools.lru_cache()\n"
+        "def hello():\n"
+        "    pass\n"
+    )
+
+
+def test_trailing_comments_and_code():
+    file_content = (
+        "from auto_deprecator import deprecate\n"
+        "\n"
+        "\n"
+        "class Hello:\n"
+        "    def hello(self):\n"
+        "        pass\n"
+        "\n"
+        '    @deprecate(expiry="2.0.0")\n'
+        "    def old_hello(self):\n"
+        "        pass\n"
+        "        # Comment in the body\n"
+        "\n"
+        "\n"
+        "# Comment after the class\n"
+        'if __name__ == "__main__":\n'
+        "    Hello().hello()\n"
+    )
+
+    assert deprecate_source(file_content) == (
+        "class Hello:\n"
+        "    def hello(self):\n"
+        "        pass\n"
+        "\n"
+        "\n"
+        "# Comment after the class\n"
+        'if __name__ == "__main__":\n'
+        "    Hello().hello()\n"
+    )
+
+
+def test_empty_class():
+    file_content = (
+        "from auto_deprecator import deprecate\n"
+        "\n"
+        "\n"
+        "class Hello:\n"
+        '    @deprecate(expiry="2.0.0")\n'
+        "    def old_hello(self):\n"
+        "        pass\n"
+        "\n"
+        "\n"
+        "VALUE = 1\n"
+    )
+
+    assert deprecate_source(file_content) == "VALUE = 1\n"
+
+
+def test_line_endings():
+    file_content = (
+        "from auto_deprecator import deprecate\r\n"
+        "\r\n"
+        "\r\n"
+        '@deprecate(expiry="2.0.0")\r\n'
+        "def old_hello():\r\n"
+        "    pass\r\n"
+        "\r\n"
+        "\r\n"
+        "VALUE = 1\r\n"
+    )
+
+    assert deprecate_source(file_content) == "VALUE = 1\r\n"
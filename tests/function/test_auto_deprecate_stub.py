@@ -0,0 +1,180 @@
+import importlib.util
+
+import pytest
+
+from auto_deprecator.cleaner import SingleFileAutoDeprecator
+from auto_deprecator.cli import main
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_0_0,
+    DEPRECATE_FUNCTION_2_2_0,
+)
+
+DEPRECATE_METHOD_2_0_0 = """
+
+
+class Hello:
+    @deprecate(expiry="2.0.0", relocate="Hello.world")
+    def hello(self):
+        return "hello"
+
+    def world(self):
+        return "world\""""
+
+
+@pytest.fixture
+def function_file_str():
+    return (
+        IMPORT_STATEMENT
+        + NORMAL_FUNCTION
+        + DEPRECATE_FUNCTION_2_0_0
+        + DEPRECATE_METHOD_2_0_0
+        + DEPRECATE_FUNCTION_2_2_0
+    )
+
+
+def load_module(filename):
+    spec = importlib.util.spec_from_file_location("stub", filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_stub_def(function_file):
+    assert SingleFileAutoDeprecator(
+        filename=function_file, current="2.1.0", stub="def"
+    ).run()
+
+    filestream = open(function_file, "r").read()
+    assert filestream.count("\n") == (
+        IMPORT_STATEMENT
+        + NORMAL_FUNCTION
+        + DEPRECATE_FUNCTION_2_0_0
+        + DEPRECATE_METHOD_2_0_0
+        + DEPRECATE_FUNCTION_2_2_0
+    ).count("\n") - 4
+    assert (
+        "\n\n\ndef deprecate_version_2_0_0(*args, **kwargs): raise "
+        "RuntimeError('Function \"deprecate_version_2_0_0\" is deprecated "
+        "since version 2.0.0.')\n\n\nclass Hello:\n"
+        "    def hello(*args, **kwargs): raise RuntimeError("
+    ) in filestream
+
+    module = load_module(function_file)
+    with pytest.raises(RuntimeError) as excinfo:
+        module.deprecate_version_2_0_0()
+
+    assert str(excinfo.value) == (
+        'Function "deprecate_version_2_0_0" is deprecated since '
+        "version 2.0.0."
+    )
+
+    with pytest.raises(RuntimeError) as excinfo:
+        module.Hello().hello()
+
+    assert str(excinfo.value) == (
+        'Function "Hello.hello" is deprecated since version 2.0.0. '
+        'Please use function / method "Hello.world"'
+    )
+    assert module.Hello().world() == "world"
+
+
+def test_stub_getattr(function_file):
+    assert SingleFileAutoDeprecator(
+        filename=function_file, current="2.1.0", stub="getattr"
+    ).run()
+
+    filestream = open(function_file, "r").read()
+    assert "def deprecate_version_2_0_0" not in filestream
+    assert "    def hello(*args, **kwargs): raise RuntimeError(" in filestream
+
+    module = load_module(function_file)
+    with pytest.raises(AttributeError) as excinfo:
+        module.deprecate_version_2_0_0
+
+    assert isinstance(excinfo.value, RuntimeError)
+    assert str(excinfo.value) == (
+        'Function "deprecate_version_2_0_0" is deprecated since '
+        "version 2.0.0."
+    )
+    assert not hasattr(module, "deprecate_version_2_0_0")
+    assert getattr(module, "deprecate_version_2_0_0", None) is None
+
+    with pytest.raises(AttributeError):
+        module.unknown_function
+
+    module.normal_function()
+    module.deprecate_version_2_2_0()
+
+
+def test_stub_getattr_existing():
+    file_content = (
+        "from auto_deprecator import deprecate\n\n\n"
+        "def __getattr__(name):\n"
+        "    raise AttributeError(name)"
+        + DEPRECATE_FUNCTION_2_0_0
+    )
+
+    file_content = SingleFileAutoDeprecator(
+        filename=None, current="2.1.0", stub="getattr"
+    ).deprecate_source(file_content)
+
+    # Fall back to the function stubs
+    assert "_DEPRECATED_SYMBOLS" not in file_content
+    assert "def deprecate_version_2_0_0(*args, **kwargs)" in file_content
+
+
+def test_stub_idempotent(function_file):
+    SingleFileAutoDeprecator(
+        filename=function_file, current="2.1.0", stub="def"
+    ).run()
+
+    assert not SingleFileAutoDeprecator(
+        filename=function_file, current="2.1.0", stub="def"
+    ).run()
+
+
+def test_main_stub_before_path(function_file):
+    main(["--stub", "def", function_file, "--version", "2.1.0"])
+
+    filestream = open(function_file, "r").read()
+    assert (
+        "def deprecate_version_2_0_0(*args, **kwargs): raise RuntimeError("
+    ) in filestream
+    assert "def deprecate_version_2_2_0():" in filestream
+
+
+def test_stub_getattr_last_and_adjacent():
+    file_content = (
+        "from auto_deprecator import deprecate\n\n\n"
+        "def keep():\n"
+        "    pass\n\n\n"
+        '@deprecate(expiry="2.0.0")\n'
+        "def old():\n"
+        "    pass\n\n\n"
+        '@deprecate(expiry="2.0.0")\n'
+        "def older():\n"
+        "    pass\n"
+    )
+
+    file_content = SingleFileAutoDeprecator(
+        filename=None, current="2.1.0", stub="getattr"
+    ).deprecate_source(file_content)
+
+    assert file_content.startswith("def keep():\n    pass\n\n\n")
+    assert "    'old': 'Function \"old\" is deprecated" in file_content
+    assert "    'older': 'Function \"older\" is deprecated" in file_content
+
+
+def test_stub_getattr_only_symbol(tmp_path):
+    filename = tmp_path / "only.py"
+    filename.write_text(IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_0_0)
+
+    assert SingleFileAutoDeprecator(
+        filename=str(filename), current="2.1.0", stub="getattr"
+    ).run()
+
+    module = load_module(str(filename))
+    assert list(module._DEPRECATED_SYMBOLS) == ["deprecate_version_2_0_0"]
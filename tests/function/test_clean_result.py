@@ -0,0 +1,139 @@
+import json
+import logging
+
+from auto_deprecator.cleaner import CleanResult, SingleFileAutoDeprecator
+from auto_deprecator.cli import main
+from auto_deprecator.pipeline import CleanSummary, clean
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_0_0,
+    DEPRECATE_FUNCTION_2_1_0,
+    DEPRECATE_FUNCTION_2_2_0,
+)
+
+SOURCE = IMPORT_STATEMENT + NORMAL_FUNCTION + DEPRECATE_FUNCTION_2_0_0
+
+
+def test_run_result(tmp_path):
+    filename = tmp_path / "hello.py"
+    filename.write_text(SOURCE)
+
+    result = SingleFileAutoDeprecator(
+        filename=str(filename), current="2.1.0"
+    ).run()
+
+    assert result
+    assert result.filename == str(filename)
+    assert result.current == "2.1.0"
+    assert result.symbols == [{
+        "symbol": "deprecate_version_2_0_0",
+        "start": 11,
+        "end": 13,
+        "expiry": "2.0.0",
+        "relocate": None,
+    }]
+    assert result.imports == [(1, 1)]
+    assert result.bytes_before == len(SOURCE)
+    assert result.bytes_after == len(filename.read_text())
+    assert set(result.timings) == {"read", "analyze", "write"}
+
+
+def test_run_result_unchanged(tmp_path):
+    filename = tmp_path / "hello.py"
+    filename.write_text(IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_2_0)
+
+    result = SingleFileAutoDeprecator(
+        filename=str(filename), current="2.1.0"
+    ).run()
+
+    assert not result
+    assert result.symbols == []
+    assert result.imports == []
+    assert result.bytes_before == result.bytes_after
+    assert "write" not in result.timings
+
+
+def test_result_to_dict():
+    result = CleanResult(
+        "hello.py",
+        current="2.1.0",
+        changed=True,
+        imports=[(1, 1)],
+        arguments=[("hello", "name", "2.0.0", "new_name")],
+        bytes_before=10,
+        bytes_after=5,
+        timings={"analyze": 0.5},
+    )
+
+    assert json.loads(json.dumps(result.to_dict())) == {
+        "filename": "hello.py",
+        "current": "2.1.0",
+        "changed": True,
+        "symbols": [],
+        "stubbed": [],
+        "imports": [[1, 1]],
+        "arguments": [{
+            "symbol": "hello",
+            "argument": "name",
+            "expiry": "2.0.0",
+            "relocate": "new_name",
+        }],
+        "bytes_before": 10,
+        "bytes_after": 5,
+        "timings": {"analyze": 0.5},
+    }
+
+
+def test_clean_summary(tmp_path):
+    (tmp_path / "hello.py").write_text(SOURCE)
+    (tmp_path / "world.py").write_text(
+        IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_2_0
+    )
+
+    summary = CleanSummary()
+    for result in clean(str(tmp_path), current="2.1.0"):
+        assert "analyze" in result.record.timings
+        summary.add(result.record)
+
+    assert summary.files == 2
+    assert summary.changed == 1
+    assert summary.symbols == 1
+    assert summary.imports == 1
+    assert summary.bytes_before > summary.bytes_after
+    assert "write" in summary.timings
+    assert str(summary).startswith(
+        "Cleaned 1 of 2 files: removed 1 symbols and 1 imports"
+    )
+
+
+def test_main_jsonl(tmp_path, caplog):
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "hello.py").write_text(
+        IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_0_0 + DEPRECATE_FUNCTION_2_1_0
+    )
+    jsonl = tmp_path / "results.jsonl"
+
+    with caplog.at_level(logging.INFO):
+        main([str(source_dir), "--version", "2.2.0", "--jsonl", str(jsonl)])
+
+    records = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]["filename"] == str(source_dir / "hello.py")
+    assert [s["symbol"] for s in records[0]["symbols"]] == [
+        "deprecate_version_2_0_0", "deprecate_version_2_1_0",
+    ]
+    assert [s["expiry"] for s in records[0]["symbols"]] == ["2.0.0", "2.1.0"]
+    assert "Cleaned 1 of 1 files" in caplog.text
+
+
+def test_main_jsonl_stdout(tmp_path, capsys):
+    (tmp_path / "hello.py").write_text(SOURCE)
+
+    main([str(tmp_path), "--version", "2.1.0", "--jsonl", "-"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["changed"] is True
@@ -0,0 +1,135 @@
+import warnings
+
+import pytest
+
+from auto_deprecator import deprecate
+from auto_deprecator.cleaner import SingleFileAutoDeprecator
+
+
+@deprecate(
+    expiry="2.1.0",
+    current="2.0.0",
+    args={"name": "new_name", "legacy": None, 2: "greeting"},
+)
+def hello_world(new_name="world", legacy=None, greeting="Hello"):
+    return "%s, %s" % (greeting, new_name)
+
+
+@deprecate(expiry="2.1.0", current="2.1.0", args={"legacy": None})
+def expired_hello_world(legacy=None):
+    """Say hello."""
+    return "Hello, world"
+
+
+def test_wrapper_attributes():
+    assert expired_hello_world.__doc__ == "Say hello."
+    assert expired_hello_world.__module__ == __name__
+    assert expired_hello_world.__name__ == "expired_hello_world"
+
+
+def test_no_deprecated_arguments():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert hello_world(new_name="you") == "Hello, you"
+        assert hello_world("you") == "Hello, you"
+
+
+def test_renamed_argument():
+    with pytest.warns(DeprecationWarning) as warning:
+        assert hello_world(name="you") == "Hello, you"
+
+    assert warning[0].message.args[0] == (
+        'Argument "name" of function "hello_world" will be deprecated on '
+        'version 2.1.0. Please use argument "new_name"'
+    )
+
+    with pytest.raises(TypeError):
+        with pytest.warns(DeprecationWarning):
+            hello_world(name="you", new_name="me")
+
+
+def test_removed_argument():
+    with pytest.warns(DeprecationWarning) as warning:
+        assert hello_world(legacy=True) == "Hello, world"
+
+    assert warning[0].message.args[0] == (
+        'Argument "legacy" of function "hello_world" will be deprecated on '
+        "version 2.1.0."
+    )
+
+    with pytest.warns(DeprecationWarning):
+        assert hello_world("you", True) == "Hello, you"
+
+
+def test_positional_argument():
+    with pytest.warns(DeprecationWarning) as warning:
+        assert hello_world("you", None, "Hi") == "Hi, you"
+
+    assert [w.message.args[0] for w in warning] == [
+        'Argument "legacy" of function "hello_world" will be deprecated on '
+        "version 2.1.0.",
+        'Positional argument 2 of function "hello_world" will be deprecated '
+        'on version 2.1.0. Please use argument "greeting"',
+    ]
+
+
+def test_expired_argument():
+    assert expired_hello_world() == "Hello, world"
+
+    with pytest.raises(RuntimeError) as error:
+        expired_hello_world(legacy=True)
+
+    assert error.value.args[0] == (
+        'Argument "legacy" of function "expired_hello_world" is deprecated '
+        "since version 2.1.0."
+    )
+
+
+ARGUMENTS_SOURCE = '''from auto_deprecator import deprecate
+
+
+@deprecate(expiry="2.0.0", args={"name": "new_name", 1: None})
+def hello_world(new_name="world", legacy=None):
+    return "Hello, " + new_name
+'''
+
+
+def test_cleaner_keeps_function():
+    deprecator = SingleFileAutoDeprecator(filename=None, current="2.1.0")
+
+    assert deprecator.deprecate_source(ARGUMENTS_SOURCE) is None
+    assert deprecator.deprecated_symbols == []
+    assert deprecator.deprecated_arguments == [
+        ("hello_world", "name", "2.0.0", "new_name"),
+        ("hello_world", 1, "2.0.0", None),
+    ]
+
+
+def test_argument_markers():
+    deprecator = SingleFileAutoDeprecator(filename=None, current="2.1.0")
+
+    assert [
+        (marker["symbol"], marker["relocate"], marker["marker"])
+        for marker in deprecator.find_deprecate_markers(ARGUMENTS_SOURCE)
+    ] == [
+        ("hello_world(name)", "new_name", "argument"),
+        ("hello_world(1)", None, "argument"),
+    ]
+
+
+NO_EXPIRY_SOURCE = '''from auto_deprecator import deprecate
+
+
+@deprecate(args={"name": "new_name"})
+def hello_world(new_name="world"):
+    return "Hello, " + new_name
+'''
+
+
+def test_cleaner_without_expiry():
+    deprecator = SingleFileAutoDeprecator(filename=None, current="2.1.0")
+
+    assert deprecator.deprecate_source(NO_EXPIRY_SOURCE) is None
+    assert deprecator.deprecated_arguments == []
+    # The markers without the expiry are skipped
+    assert deprecator.find_deprecate_markers(NO_EXPIRY_SOURCE) == []
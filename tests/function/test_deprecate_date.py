@@ -0,0 +1,173 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+import auto_deprecator
+from auto_deprecator import (
+    FunctionStage,
+    SingleFileAutoDeprecator,
+    check_stage,
+    deprecate,
+    parse_expiry,
+)
+
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+TOMORROW = TODAY + timedelta(days=1)
+
+
+@deprecate(expiry=TOMORROW.isoformat())
+def deprecate_tomorrow():
+    pass
+
+
+@deprecate(expiry=datetime.combine(YESTERDAY, datetime.min.time()))
+def deprecate_yesterday():
+    pass
+
+
+def test_parse_expiry():
+    assert parse_expiry("2.0.0") == "2.0.0"
+    assert parse_expiry("2021-01-31") == date(2021, 1, 31)
+    assert parse_expiry("2021-01-31T12:30") == datetime(2021, 1, 31, 12, 30)
+    assert parse_expiry("2021-01-31 12:30:15") == (
+        datetime(2021, 1, 31, 12, 30, 15)
+    )
+
+    assert parse_expiry("2021-01-31T12:30:15.250000") == (
+        datetime(2021, 1, 31, 12, 30, 15, 250000)
+    )
+    assert parse_expiry("2021-01-31T00:00:00+08:00") == datetime(
+        2021, 1, 31, tzinfo=timezone(timedelta(hours=8))
+    )
+    assert parse_expiry("2021-01-31T00:00:00Z") == (
+        datetime(2021, 1, 31, tzinfo=timezone.utc)
+    )
+
+    with pytest.raises(ValueError):
+        parse_expiry("2021-13-31")
+
+    with pytest.raises(ValueError):
+        parse_expiry("2021-01-31Tnoon")
+
+
+def test_check_stage_by_aware_date():
+    expiry = "2021-01-31T12:00:00+00:00"
+    assert check_stage(
+        expiry, today=datetime(2021, 1, 31, 11, 59, tzinfo=timezone.utc)
+    ) == FunctionStage.WARNING
+    assert check_stage(
+        expiry, today=datetime(2021, 1, 31, 12, 0, tzinfo=timezone.utc)
+    ) == FunctionStage.EXPIRED
+
+
+def test_check_stage_by_date():
+    expiry = date(2021, 1, 31)
+    assert check_stage(expiry, today=date(2021, 1, 30)) == (
+        FunctionStage.WARNING
+    )
+    assert check_stage(expiry, today=date(2021, 1, 31)) == (
+        FunctionStage.EXPIRED
+    )
+    assert check_stage("2021-01-31", today=date(2021, 2, 1)) == (
+        FunctionStage.CLEANING
+    )
+    assert check_stage(
+        "2021-01-31T12:00", today=datetime(2021, 1, 31, 11, 59)
+    ) == FunctionStage.WARNING
+
+
+def test_deprecate_by_date():
+    with pytest.warns(DeprecationWarning) as warning:
+        deprecate_tomorrow()
+
+    assert (
+        'Function "deprecate_tomorrow" will be deprecated on %s'
+        % TOMORROW.isoformat()
+    ) in warning[0].message.args[0]
+
+    with pytest.raises(RuntimeError) as err:
+        deprecate_yesterday()
+
+    assert (
+        'Function "deprecate_yesterday" is deprecated since %s'
+        % YESTERDAY.isoformat()
+    ) in str(err.value)
+
+
+def test_date_stage_cached_until_transition(monkeypatch):
+    calls = []
+    check_date_stage = auto_deprecator.check_date_stage
+
+    def counted_check_date_stage(expiry, today=None):
+        calls.append(expiry)
+        return check_date_stage(expiry, today=today)
+
+    monkeypatch.setattr(
+        auto_deprecator, "check_date_stage", counted_check_date_stage
+    )
+    stage = auto_deprecator.DateStage(TOMORROW)
+
+    assert stage.get() == FunctionStage.WARNING
+    assert stage.get() == FunctionStage.WARNING
+    assert len(calls) == 1
+
+    # Move the clock to the expiry date
+    expired_time = datetime.combine(TOMORROW, datetime.min.time())
+    monkeypatch.setattr(
+        auto_deprecator, "time", lambda: expired_time.timestamp() + 1
+    )
+    monkeypatch.setattr(
+        auto_deprecator, "check_date_stage",
+        lambda expiry: check_date_stage(expiry, today=TOMORROW),
+    )
+    assert stage.get() == FunctionStage.EXPIRED
+
+
+DATE_SOURCE = """from datetime import date
+
+from auto_deprecator import deprecate
+
+
+def normal_function():
+    pass
+
+
+@deprecate(expiry=date(2021, 1, 31))
+def deprecate_decorator_date():
+    pass
+
+
+def deprecate_comment_date():
+    # auto-deprecate: expiry=2021-02-28
+    pass
+
+
+@deprecate(expiry="2.0.0", current="1.0.0")
+def deprecate_version():
+    pass"""
+
+
+@pytest.mark.parametrize(
+    "today,expected",
+    [
+        (None, ["deprecate_decorator_date", "deprecate_comment_date"]),
+        (date(2021, 1, 31), ["deprecate_decorator_date",
+                             "deprecate_comment_date"]),
+        (date(2021, 2, 1), ["deprecate_comment_date"]),
+        (date(2021, 3, 1), []),
+    ],
+)
+def test_auto_deprecate_by_date(tmp_path, today, expected):
+    filename = str(tmp_path / "date.py")
+    open(filename, "w").write(DATE_SOURCE)
+
+    SingleFileAutoDeprecator(
+        filename=filename, current="1.0.0", today=today
+    ).run()
+
+    filestream = open(filename, "r").read()
+    for name in ["deprecate_decorator_date", "deprecate_comment_date"]:
+        assert (name in filestream) == (name in expected)
+
+    assert "deprecate_version" in filestream
@@ -1,31 +1,115 @@
 from os import environ
+import threading
 
 import pytest
 
+from auto_deprecator import CONFIG, FunctionStage, deprecate
 
-def test_deprecate_version_2_0_0_with_1_9_0(function_module):
-    environ["DEPRECATE_VERSION"] = "1.9.0"
+
+@pytest.fixture
+def deprecate_version():
+    def set_environ(version):
+        environ["DEPRECATE_VERSION"] = version
+        CONFIG.reload_environ()
+
+    yield set_environ
+
+    environ.pop("DEPRECATE_VERSION", None)
+    CONFIG.reload_environ()
+
+
+def test_deprecate_version_2_0_0_with_1_9_0(
+        function_module, deprecate_version):
+    deprecate_version("1.9.0")
 
     with pytest.warns(DeprecationWarning) as warning:
         function_module.deprecate_version_2_0_0()
 
-    del environ["DEPRECATE_VERSION"]
-
     assert (
         'Function "deprecate_version_2_0_0" will '
         "be deprecated on version 2.0.0"
     ) in warning[0].message.args[0]
 
 
-def test_deprecate_version_2_0_0_with_2_1_0(function_module):
-    environ["DEPRECATE_VERSION"] = "2.1.0"
+def test_deprecate_version_2_0_0_with_2_1_0(
+        function_module, deprecate_version):
+    deprecate_version("2.1.0")
 
     with pytest.raises(RuntimeError) as err:
         function_module.deprecate_version_2_0_0()
 
-    del environ["DEPRECATE_VERSION"]
-
     assert (
         'Function "deprecate_version_2_0_0" is '
         "deprecated since version 2.0.0"
     ) in str(err)
+
+
+def test_environ_read_once(deprecate_version):
+    deprecate_version("2.1.0")
+    assert CONFIG.get_version() == "2.1.0"
+
+    # The change is only applied after reloading the environment
+    environ["DEPRECATE_VERSION"] = "1.9.0"
+    assert CONFIG.get_version() == "2.1.0"
+
+    CONFIG.reload_environ()
+    assert CONFIG.get_version() == "1.9.0"
+
+
+@deprecate(expiry="2.1.0", current="2.0.0")
+def override_hello_world():
+    return "hello"
+
+
+def test_override_version():
+    generation = CONFIG.generation
+    with pytest.warns(DeprecationWarning):
+        assert override_hello_world() == "hello"
+
+    with CONFIG.override_version("2.1.0"):
+        assert CONFIG.generation > generation
+
+        with pytest.raises(RuntimeError):
+            override_hello_world()
+
+        # The nested override is restored to the outer one
+        with CONFIG.override_version("2.0.0"):
+            with pytest.warns(DeprecationWarning):
+                assert override_hello_world() == "hello"
+
+        with pytest.raises(RuntimeError):
+            override_hello_world()
+
+    assert CONFIG.get_version() is None
+    with pytest.warns(DeprecationWarning):
+        assert override_hello_world() == "hello"
+
+
+def test_set_version_precedes_environ(deprecate_version):
+    deprecate_version("1.9.0")
+
+    previous = CONFIG.set_version("2.2.0")
+    try:
+        assert previous is None
+        assert override_hello_world._state.get_stage() == (
+            FunctionStage.CLEANING
+        )
+    finally:
+        CONFIG.set_version(previous)
+
+    assert override_hello_world._state.get_stage() == FunctionStage.WARNING
+
+
+def test_set_version_in_thread():
+    state = override_hello_world._state
+    assert state.get_stage() == FunctionStage.WARNING
+
+    thread = threading.Thread(target=CONFIG.set_version, args=("2.1.0",))
+    thread.start()
+    thread.join()
+
+    try:
+        # The cached stage is invalidated by the generation
+        assert state.get_stage() == FunctionStage.EXPIRED
+    finally:
+        CONFIG.set_version(None)
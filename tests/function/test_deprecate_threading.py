@@ -0,0 +1,122 @@
+import gc
+import threading
+import weakref
+
+from auto_deprecator import (
+    CALL_COUNTER,
+    CallCounter,
+    FunctionStage,
+    deprecate,
+    get_call_counts,
+)
+
+THREADS = 8
+CALLS = 2000
+
+WARNINGS = []
+
+
+@deprecate(expiry="2.1.0", current="2.0.0", warn_handler=WARNINGS.append)
+def warn_concurrently(value):
+    return value
+
+
+def run_threads(target):
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as err:
+            errors.append(err)
+
+    threads = [
+        threading.Thread(target=run, args=(i,)) for i in range(THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return errors
+
+
+def test_concurrent_calls_are_counted():
+    name = "%s.warn_concurrently" % __name__
+    before = get_call_counts().get((name, FunctionStage.WARNING), 0)
+    del WARNINGS[:]
+
+    def call(index):
+        for value in range(CALLS):
+            assert warn_concurrently(value) == value
+
+    assert run_threads(call) == []
+
+    counts = get_call_counts()
+    assert counts[(name, FunctionStage.WARNING)] - before == THREADS * CALLS
+    assert len(WARNINGS) == THREADS * CALLS
+
+
+def test_counts_merged_while_incrementing():
+    stop = threading.Event()
+    snapshots = []
+
+    def read():
+        while not stop.is_set():
+            snapshots.append(sum(CALL_COUNTER.snapshot().values()))
+
+    reader = threading.Thread(target=read)
+    reader.start()
+
+    try:
+        errors = run_threads(
+            lambda index: [warn_concurrently(v) for v in range(CALLS)]
+        )
+    finally:
+        stop.set()
+        reader.join()
+
+    assert errors == []
+    # The merged counts never decrease
+    assert snapshots == sorted(snapshots)
+
+
+def test_shards_of_exited_threads_are_retired():
+    counter = CallCounter()
+    counter.increment("key")
+
+    for _ in range(100):
+        thread = threading.Thread(target=counter.increment, args=("key",))
+        thread.start()
+        thread.join()
+
+    # Only the shard of the current thread is left
+    assert len(counter._shards) == 1
+    assert counter.snapshot() == {"key": 101}
+
+    counter.reset()
+    assert counter.snapshot() == {}
+
+
+def test_counted_function_is_collected():
+    def make_function():
+        @deprecate(expiry="2.1.0", current="2.0.0", warn_handler=lambda m: m)
+        def dynamic_function():
+            pass
+
+        return dynamic_function
+
+    function = make_function()
+    function()
+    ref = weakref.ref(function.__wrapped__)
+    del function
+    gc.collect()
+
+    assert ref() is None
+    assert get_call_counts()[(
+        __name__ + ".test_counted_function_is_collected.<locals>."
+        "make_function.<locals>.dynamic_function",
+        FunctionStage.WARNING,
+    )] >= 1
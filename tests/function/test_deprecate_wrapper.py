@@ -0,0 +1,82 @@
+import inspect
+import pickle
+import pydoc
+
+import pytest
+
+from auto_deprecator import DeprecatedFunction, deprecate
+
+
+@deprecate(expiry="2.1.0", current="2.0.0")
+def hello_world(name, greeting="Hello"):
+    """Say hello."""
+    return "%s, %s" % (greeting, name)
+
+
+class HelloWorld:
+    @deprecate(expiry="2.1.0", current="2.0.0")
+    def hello(self, name):
+        return (self, name)
+
+    @classmethod
+    @deprecate(expiry="2.1.0", current="2.0.0")
+    def class_hello(cls, name):
+        return (cls, name)
+
+    @staticmethod
+    @deprecate(expiry="2.1.0", current="2.0.0")
+    def static_hello(name):
+        return name
+
+
+def test_wrapper_attributes():
+    assert isinstance(hello_world, DeprecatedFunction)
+    assert hello_world.__name__ == "hello_world"
+    assert hello_world.__qualname__ == "hello_world"
+    assert hello_world.__module__ == __name__
+    assert hello_world.__doc__ == "Say hello."
+    assert hello_world.__wrapped__.__name__ == "hello_world"
+    assert str(inspect.signature(hello_world)) == "(name, greeting='Hello')"
+
+
+def test_wrapper_class_attributes():
+    assert DeprecatedFunction.__module__ == "auto_deprecator"
+    assert DeprecatedFunction.__doc__.startswith("Wrapper of a deprecated")
+    assert repr(DeprecatedFunction) == (
+        "<class 'auto_deprecator.DeprecatedFunction'>"
+    )
+    assert pickle.loads(pickle.dumps(DeprecatedFunction)) is (
+        DeprecatedFunction
+    )
+    assert "class DeprecatedFunction" in pydoc.render_doc(DeprecatedFunction)
+
+
+def test_wrapper_call():
+    with pytest.warns(DeprecationWarning):
+        assert hello_world("world", greeting="Hi") == "Hi, world"
+
+
+def test_wrapper_methods():
+    instance = HelloWorld()
+
+    with pytest.warns(DeprecationWarning):
+        assert instance.hello("world") == (instance, "world")
+
+    with pytest.warns(DeprecationWarning):
+        assert HelloWorld.class_hello("world") == (HelloWorld, "world")
+
+    with pytest.warns(DeprecationWarning):
+        assert instance.static_hello("world") == "world"
+
+    assert HelloWorld.hello.__qualname__ == "HelloWorld.hello"
+
+
+def test_wrapper_pickle():
+    assert pickle.loads(pickle.dumps(hello_world)) is hello_world
+    assert pickle.loads(pickle.dumps(HelloWorld.hello)) is HelloWorld.hello
+
+
+def test_wrapper_set_attribute():
+    hello_world.marker = True
+    assert hello_world.marker is True
+    assert not hasattr(hello_world.__wrapped__, "marker")
@@ -0,0 +1,65 @@
+import pytest
+
+from .fuzz import (
+    CURRENT, ENGINES, EngineError, compare_engines, generate_engine_module,
+    generate_module, reference_engine, run_engine,
+)
+
+SEEDS = range(40)
+
+
+@pytest.mark.parametrize("name", [name for name in ENGINES][1:])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_engines_equivalent(seed, name):
+    times = compare_engines(
+        generate_engine_module(seed, name),
+        engines={"reference": reference_engine, name: ENGINES[name]},
+    )
+
+    assert set(times) == {"reference", name}
+
+
+def test_generate_module_deterministic():
+    assert generate_module(1) == generate_module(1)
+    assert generate_module(1) != generate_module(2)
+    assert "async def" not in generate_module(1, async_defs=False)
+
+
+def test_compare_engines_difference():
+    def broken_engine(file_content, current):
+        return (reference_engine(file_content, current) or "") + "\n# Extra"
+
+    with pytest.raises(AssertionError) as error:
+        compare_engines(
+            generate_module(0),
+            engines={"reference": reference_engine, "broken": broken_engine},
+        )
+
+    assert "+# Extra" in str(error.value)
+
+
+def test_run_engine_error():
+    def failed_engine(file_content, current):
+        raise ValueError("Failed")
+
+    output, _ = run_engine(failed_engine, "", "2.1.0")
+    assert output == EngineError("ValueError", "Failed")
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_engine_output_compiles(seed):
+    file_content = generate_module(seed)
+    output = reference_engine(file_content, CURRENT)
+
+    compile(output or file_content, "<fuzz %d>" % seed, "exec")
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_engine_keeps_other_lines(seed):
+    file_content = generate_module(seed)
+    output = reference_engine(file_content, CURRENT) or file_content
+
+    # The output lines are the source lines in the same order
+    source_lines = iter(file_content.splitlines())
+    for line in output.splitlines():
+        assert line in source_lines
@@ -0,0 +1,115 @@
+import sys
+from os import listdir
+
+import pytest
+
+from auto_deprecator import __version__
+from auto_deprecator.importhook import (
+    DeprecatingLoader,
+    blank_deprecated_lines,
+    install,
+    uninstall,
+)
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_0_0,
+    DEPRECATE_FUNCTION_2_2_0,
+)
+
+MODULE_SOURCE = (
+    IMPORT_STATEMENT
+    + NORMAL_FUNCTION
+    + DEPRECATE_FUNCTION_2_0_0
+    + DEPRECATE_FUNCTION_2_2_0
+    + """
+
+
+def raise_error():
+    raise ValueError()
+"""
+)
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    package = tmp_path / "hooked_package"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "functions.py").write_text(MODULE_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    yield package
+
+    for name in ["hooked_package", "hooked_package.functions"]:
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def finder():
+    finder = install(current="2.1.0", packages=["hooked_package"])
+    yield finder
+    uninstall(finder)
+
+
+def test_blank_deprecated_lines():
+    source = blank_deprecated_lines(MODULE_SOURCE, current="2.1.0")
+
+    assert source.count("\n") == MODULE_SOURCE.count("\n")
+    assert "deprecate_version_2_0_0" not in source
+    assert "deprecate_version_2_2_0" in source
+    assert blank_deprecated_lines(MODULE_SOURCE, current="1.0.0") is None
+
+
+def test_import_hook(package, finder):
+    from hooked_package import functions
+
+    assert isinstance(functions.__loader__, DeprecatingLoader)
+    assert not hasattr(functions, "deprecate_version_2_0_0")
+    assert hasattr(functions, "deprecate_version_2_2_0")
+
+    # The line numbers are kept
+    with pytest.raises(ValueError) as err:
+        functions.raise_error()
+
+    assert err.traceback[-1].lineno == MODULE_SOURCE.splitlines().index(
+        "    raise ValueError()"
+    )
+
+    assert "functions.%s.auto_deprecator-%s.deprecate-2.1.0.pyc" % (
+        sys.implementation.cache_tag, __version__
+    ) in listdir(str(package / "__pycache__"))
+
+
+def test_import_hook_cache(package, finder, monkeypatch):
+    from hooked_package import functions  # noqa: F401
+
+    sys.modules.pop("hooked_package.functions")
+    monkeypatch.setattr(
+        "auto_deprecator.importhook.blank_deprecated_lines",
+        pytest.fail,
+    )
+
+    from hooked_package import functions as cached_functions
+
+    assert not hasattr(cached_functions, "deprecate_version_2_0_0")
+
+
+def test_import_hook_analysis_error(package, finder, monkeypatch):
+    def raise_error(*args, **kwargs):
+        raise KeyError("expiry")
+
+    monkeypatch.setattr(
+        "auto_deprecator.importhook.blank_deprecated_lines", raise_error
+    )
+
+    from hooked_package import functions
+
+    # The module is loaded as it is
+    assert hasattr(functions, "deprecate_version_2_0_0")
+
+
+def test_import_hook_requires_packages():
+    with pytest.raises(AssertionError):
+        install(current="2.1.0", packages=[])
@@ -0,0 +1,242 @@
+import logging
+
+from auto_deprecator import SingleFileAutoDeprecator
+from auto_deprecator.cli import main
+from auto_deprecator.index import (
+    SymbolIndex,
+    fix_imports,
+    fix_source,
+    module_name,
+)
+
+CORE = """from auto_deprecator import deprecate
+
+
+def new_hello_world():
+    pass
+
+
+@deprecate(expiry="2.0.0", current="1.0.0", relocate="new_hello_world")
+def old_hello_world():
+    pass
+
+
+@deprecate(expiry="2.0.0", current="1.0.0")
+def removed_hello_world():
+    pass
+
+
+def hello_world():
+    pass"""
+
+PACKAGE_INIT = """from .core import old_hello_world, hello_world
+"""
+
+APP = """from pkg.core import removed_hello_world, hello_world
+from pkg import old_hello_world
+import pkg.core
+
+
+def run():
+    old_hello_world()
+    pkg.core.old_hello_world()
+    return removed_hello_world
+"""
+
+
+def make_package(tmp_path):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text(PACKAGE_INIT)
+    (package / "core.py").write_text(CORE)
+    (tmp_path / "app.py").write_text(APP)
+    return [
+        str(package / "__init__.py"),
+        str(package / "core.py"),
+        str(tmp_path / "app.py"),
+    ]
+
+
+def test_module_name(tmp_path):
+    filenames = make_package(tmp_path)
+    assert [module_name(f) for f in filenames] == ["pkg", "pkg.core", "app"]
+
+
+def test_symbol_index(tmp_path):
+    filenames = make_package(tmp_path)
+    index = SymbolIndex.build(filenames, jobs=2)
+
+    assert ("pkg.core", "old_hello_world") in index.definitions
+    assert sorted(
+        i.filename for i in index.importers[("pkg.core", "old_hello_world")]
+    ) == [filenames[0]]
+    assert [
+        r.lineno for r in index.references[("pkg.core", "old_hello_world")]
+    ] == [8]
+    assert [
+        r.lineno for r in index.references[("pkg", "old_hello_world")]
+    ] == [7]
+
+
+def test_fix_imports(tmp_path, caplog):
+    filenames = make_package(tmp_path)
+    index = SymbolIndex.build(filenames, jobs=1)
+
+    deprecator = SingleFileAutoDeprecator(filename=filenames[1], current="2.1.0")
+    deprecator.run()
+    removed = {
+        ("pkg.core", name): relocate
+        for name, _, relocate in deprecator.deprecated_symbols
+    }
+
+    changed = fix_imports(index, removed)
+
+    assert changed == sorted([filenames[0], filenames[2]])
+    assert (tmp_path / "pkg" / "__init__.py").read_text() == (
+        "from .core import new_hello_world, hello_world\n"
+    )
+    assert (tmp_path / "app.py").read_text() == """from pkg.core import hello_world
+from pkg import new_hello_world
+import pkg.core
+
+
+def run():
+    new_hello_world()
+    pkg.core.new_hello_world()
+    return removed_hello_world
+"""
+    assert (
+        'Reference to the removed symbol "pkg.core.removed_hello_world"'
+    ) in caplog.text
+
+
+REMOVED = {
+    ("pkg.core", "old_hello_world"): ("pkg.core", "new_hello_world"),
+    ("pkg.core", "removed_hello_world"): None,
+}
+
+
+def test_fix_source_keeps_other_statements():
+    source, _ = fix_source(
+        "app.py",
+        "from pkg.core import old_hello_world, removed_hello_world; X = 1\n"
+        "Y = 1; from pkg.core import removed_hello_world\n",
+        REMOVED,
+        module="app",
+    )
+
+    assert source == (
+        "from pkg.core import new_hello_world; X = 1\n"
+        "Y = 1; pass\n"
+    )
+
+
+def test_fix_source_multiline_import():
+    source, _ = fix_source(
+        "app.py",
+        "from pkg.core import (\n"
+        "    old_hello_world,\n"
+        "    hello_world,\n"
+        ")  # Comment\n"
+        "from pkg.core import removed_hello_world\n"
+        "X = 1\n",
+        REMOVED,
+        module="app",
+    )
+
+    assert source == (
+        "from pkg.core import new_hello_world, hello_world  # Comment\n"
+        "X = 1\n"
+    )
+
+
+def test_module_attribute_references(tmp_path):
+    filenames = make_package(tmp_path)
+    (tmp_path / "attribute_app.py").write_text(
+        "from pkg import core\n"
+        "\n"
+        "\n"
+        "def run():\n"
+        "    core.old_hello_world()\n"
+        "    return core.removed_hello_world()\n"
+    )
+    filenames.append(str(tmp_path / "attribute_app.py"))
+    index = SymbolIndex.build(filenames, jobs=1)
+
+    assert filenames[-1] in [
+        r.filename for r in index.references[("pkg.core", "removed_hello_world")]
+    ]
+
+    source, unresolved = fix_source(
+        filenames[-1],
+        (tmp_path / "attribute_app.py").read_text(),
+        index.dangling({
+            ("pkg.core", "old_hello_world"): "new_hello_world",
+            ("pkg.core", "removed_hello_world"): None,
+        }),
+        module="attribute_app",
+    )
+
+    assert "    core.new_hello_world()\n" in source
+    assert [
+        (symbol, reference.lineno) for symbol, reference in unresolved
+    ] == [(("pkg.core", "removed_hello_world"), 6)]
+
+
+def test_fix_imports_keeps_stubbed_symbols(tmp_path, caplog):
+    make_package(tmp_path)
+
+    with caplog.at_level(logging.INFO):
+        main([
+            str(tmp_path), "--version", "2.1.0", "--stub", "def",
+            "--fix-imports",
+        ])
+
+    assert (tmp_path / "pkg" / "__init__.py").read_text() == PACKAGE_INIT
+    assert (tmp_path / "app.py").read_text() == APP
+    assert "removed 0 symbols and 1 imports, stubbed 2 symbols" in caplog.text
+
+
+def test_fix_imports_skips_shadowed_names(tmp_path):
+    filenames = make_package(tmp_path)
+    content = (
+        "from pkg.core import old_hello_world\n"
+        "\n"
+        "\n"
+        "def run(old_hello_world):\n"
+        "    return old_hello_world()\n"
+        "\n"
+        "\n"
+        "def call():\n"
+        "    old_hello_world = print\n"
+        "    handlers = [old_hello_world for old_hello_world in ()]\n"
+        "    return old_hello_world(handlers)\n"
+        "\n"
+        "\n"
+        "def restore():\n"
+        "    return [old_hello_world() for _ in (1, 2)]\n"
+    )
+    (tmp_path / "shadow_app.py").write_text(content)
+    filenames.append(str(tmp_path / "shadow_app.py"))
+    index = SymbolIndex.build(filenames, jobs=1)
+
+    assert [
+        r.lineno
+        for r in index.references[("pkg.core", "old_hello_world")]
+        if r.filename == filenames[-1]
+    ] == [15]
+
+    source, unresolved = fix_source(
+        filenames[-1],
+        content,
+        index.dangling({("pkg.core", "old_hello_world"): "new_hello_world"}),
+        module="shadow_app",
+    )
+
+    assert source == content.replace(
+        "from pkg.core import old_hello_world",
+        "from pkg.core import new_hello_world",
+    ).replace(
+        "[old_hello_world() for", "[new_hello_world() for"
+    )
+    assert unresolved == []
@@ -0,0 +1,70 @@
+import json
+
+from auto_deprecator.manifest import Manifest, build_manifest
+
+from .test_auto_deprecate_comments import (
+    DEPRECATE_FUNCTION_2_0_0_COMMENT,
+    DEPRECATE_INNER_FUNCTION_2_1_0_COMMENT,
+)
+from .conftest import IMPORT_STATEMENT, DEPRECATE_FUNCTION_2_2_0
+
+
+def make_sources(tmp_path):
+    (tmp_path / "decorator.py").write_text(
+        IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_2_0
+    )
+    (tmp_path / "comment.py").write_text(
+        DEPRECATE_FUNCTION_2_0_0_COMMENT
+        + DEPRECATE_INNER_FUNCTION_2_1_0_COMMENT
+    )
+
+
+def test_build_manifest(tmp_path):
+    make_sources(tmp_path)
+    manifest_file = str(tmp_path / "manifest.json")
+    build_manifest(str(tmp_path), manifest_file, package_version="2.0.0")
+
+    content = json.load(open(manifest_file, "r"))
+    assert content["package_version"] == "2.0.0"
+    assert content["entries"] == [
+        {
+            "symbol": "deprecate_version_2_0_0_comment",
+            "file": "comment.py",
+            "start": 4,
+            "end": 8,
+            "expiry": "2.0.0",
+            "relocate": None,
+            "marker": "comment",
+        },
+        {
+            "symbol": (
+                "deprecate_version_2_1_0_only_inner."
+                "deprecate_version_2_1_0_comment"
+            ),
+            "file": "comment.py",
+            "start": 14,
+            "end": 16,
+            "expiry": "2.1.0",
+            "relocate": None,
+            "marker": "comment",
+        },
+        {
+            "symbol": "deprecate_version_2_2_0",
+            "file": "decorator.py",
+            "start": 4,
+            "end": 6,
+            "expiry": "2.2.0",
+            "relocate": None,
+            "marker": "decorator",
+        },
+    ]
+
+
+def test_manifest_query(tmp_path):
+    make_sources(tmp_path)
+    manifest_file = str(tmp_path / "manifest.json")
+    build_manifest(str(tmp_path), manifest_file)
+    manifest = Manifest.load(manifest_file)
+
+    assert [e["expiry"] for e in manifest.expiring("2.1.0")] == ["2.1.0"]
+    assert [e["expiry"] for e in manifest.removed("2.1.0")] == ["2.0.0"]
@@ -0,0 +1,78 @@
+from urllib.request import urlopen
+
+import pytest
+
+from auto_deprecator import CallCounter, deprecate
+import auto_deprecator
+from auto_deprecator.metrics import (
+    CONTENT_TYPE,
+    MetricsCollector,
+    start_http_server,
+)
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    counter = CallCounter()
+    monkeypatch.setattr(auto_deprecator, "CALL_COUNTER", counter)
+    return counter
+
+
+def test_generate_latest(counter):
+    @deprecate(
+        expiry="2.1.0", current="2.0.0", relocate='new"metric',
+        warn_handler=lambda msg: None,
+    )
+    def metric_function():
+        pass
+
+    for _ in range(3):
+        metric_function()
+
+    output = MetricsCollector(counter).generate_latest().decode("utf-8")
+    labels = (
+        '{function="%s.test_generate_latest.<locals>.metric_function",'
+        'stage="warning",expiry="2.1.0",relocate="new\\"metric"}'
+    ) % __name__
+
+    assert "# TYPE auto_deprecator_calls_total counter\n" in output
+    assert "auto_deprecator_calls_total%s 3.0\n" % labels in output
+    assert "auto_deprecator_first_seen_seconds%s " % labels in output
+    assert "auto_deprecator_last_seen_seconds%s " % labels in output
+
+
+def test_last_seen(counter, monkeypatch):
+    @deprecate(expiry="2.1.0", current="2.0.0", warn_handler=lambda m: None)
+    def metric_function():
+        pass
+
+    collector = MetricsCollector(counter)
+    monkeypatch.setattr("auto_deprecator.metrics.time", lambda: 100.0)
+    metric_function()
+    first_seen = list(counter.first_seen().values())
+    assert collector.collect()[0][2:] == (1, first_seen[0], 100.0)
+
+    # The last seen time is not updated without the calls
+    monkeypatch.setattr("auto_deprecator.metrics.time", lambda: 200.0)
+    assert collector.collect()[0][4] == 100.0
+
+    metric_function()
+    assert collector.collect()[0][2::2] == (2, 200.0)
+
+
+def test_http_server(counter):
+    @deprecate(expiry="2.1.0", current="2.1.0", error_handler=lambda m: None)
+    def metric_function():
+        pass
+
+    metric_function()
+    server = start_http_server(0, collector=MetricsCollector(counter))
+
+    try:
+        url = "http://127.0.0.1:%d/metrics" % server.server_port
+        with urlopen(url) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert b'stage="expired"' in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
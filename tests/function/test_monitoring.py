@@ -0,0 +1,171 @@
+import sys
+import threading
+
+import pytest
+
+from auto_deprecator import CallCounter, DeprecationState, deprecate
+
+requires_monitoring = pytest.mark.skipif(
+    not hasattr(sys, "monitoring"), reason="sys.monitoring is not supported"
+)
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    from auto_deprecator.monitoring import MonitoringTracker
+    import auto_deprecator.monitoring
+
+    monkeypatch.setattr(
+        auto_deprecator.monitoring, "CALL_COUNTER", CallCounter()
+    )
+    tracker = MonitoringTracker(max_hits=2)
+    yield tracker
+    tracker.close()
+
+
+def monitored_function(value):
+    return value + 1
+
+
+def call_monitored_function(value):
+    return monitored_function(value)
+
+
+@requires_monitoring
+def test_monitoring_hits(tracker):
+    from auto_deprecator.monitoring import CALL_COUNTER
+
+    state = DeprecationState(
+        func=monitored_function, expiry="2.1.0", current="2.0.0"
+    )
+    tracker.track(state)
+
+    for value in range(5):
+        assert call_monitored_function(value) == value + 1
+
+    hits = tracker.hits()[state.name]
+    assert len(hits) == 2
+    assert hits[0].stage == 0
+    assert hits[0].caller == "%s:%d" % (
+        __file__, call_monitored_function.__code__.co_firstlineno + 1
+    )
+    assert CALL_COUNTER.snapshot() == {state.counter_keys[0]: 2}
+
+    tracker.restart()
+    monitored_function(0)
+    assert len(tracker.hits()[state.name]) == 1
+
+
+def concurrent_function():
+    return None
+
+
+@requires_monitoring
+def test_monitoring_concurrent_hits(tracker):
+    from auto_deprecator.monitoring import CALL_COUNTER
+
+    state = DeprecationState(
+        func=concurrent_function, expiry="2.1.0", current="2.0.0"
+    )
+    tracker.track(state)
+    barrier = threading.Barrier(8)
+
+    def run():
+        barrier.wait()
+        for _ in range(100):
+            concurrent_function()
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # At most the maximum hits are recorded and counted
+    assert len(tracker.hits()[state.name]) == 2
+    assert CALL_COUNTER.snapshot() == {state.counter_keys[0]: 2}
+
+
+def other_tool_function():
+    return "other"
+
+
+@requires_monitoring
+def test_monitoring_restart_other_tools(tracker):
+    monitoring = sys.monitoring
+    state = DeprecationState(
+        func=monitored_function, expiry="2.1.0", current="2.0.0"
+    )
+    tracker.track(state)
+
+    other_hits = []
+
+    def on_other_start(code, instruction_offset):
+        other_hits.append(code.co_name)
+        return monitoring.DISABLE
+
+    other_id = next(
+        tool_id for tool_id in range(6)
+        if monitoring.get_tool(tool_id) is None
+    )
+    monitoring.use_tool_id(other_id, "other")
+    try:
+        monitoring.register_callback(
+            other_id, monitoring.events.PY_START, on_other_start
+        )
+        monitoring.set_local_events(
+            other_id, other_tool_function.__code__,
+            monitoring.events.PY_START,
+        )
+        other_tool_function()
+        other_tool_function()
+        assert other_hits == ["other_tool_function"]
+
+        tracker.restart()
+        other_tool_function()
+        monitored_function(0)
+
+        # Only the events of the tracker are enabled again
+        assert other_hits == ["other_tool_function"]
+        assert len(tracker.hits()[state.name]) == 1
+    finally:
+        monitoring.set_local_events(
+            other_id, other_tool_function.__code__, 0
+        )
+        monitoring.register_callback(
+            other_id, monitoring.events.PY_START, None
+        )
+        monitoring.free_tool_id(other_id)
+
+
+@requires_monitoring
+def test_monitoring_backend():
+    from auto_deprecator.monitoring import TRACKER
+
+    def backend_function():
+        return "hello"
+
+    decorated = deprecate(
+        expiry="2.1.0", current="2.2.0", backend="monitoring"
+    )(backend_function)
+
+    # The function is not wrapped, and the handlers are not called
+    assert decorated is backend_function
+    assert decorated() == "hello"
+    assert len(TRACKER.hits()[
+        "%s.test_monitoring_backend.<locals>.backend_function" % __name__
+    ]) == 1
+
+
+@pytest.mark.skipif(
+    hasattr(sys, "monitoring"), reason="sys.monitoring is supported"
+)
+def test_monitoring_backend_fallback():
+    @deprecate(expiry="2.1.0", current="2.0.0", backend="monitoring")
+    def fallback_function():
+        return "hello"
+
+    with pytest.warns(DeprecationWarning):
+        assert fallback_function() == "hello"
+
+    assert fallback_function.__wrapped__ is not None
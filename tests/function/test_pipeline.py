@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from auto_deprecator.pipeline import (
+    analyze_files,
+    assign_versions,
+    bounded_map,
+    clean,
+    discover,
+    read_files,
+    rewrite_files,
+)
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_0_0,
+    DEPRECATE_FUNCTION_2_2_0,
+)
+
+SOURCE = (
+    IMPORT_STATEMENT
+    + NORMAL_FUNCTION
+    + DEPRECATE_FUNCTION_2_0_0
+    + DEPRECATE_FUNCTION_2_2_0
+)
+
+
+def test_bounded_map_in_flight():
+    pulled = []
+
+    def items():
+        for index in range(10):
+            pulled.append(index)
+            yield (index,)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = bounded_map(lambda x: x * 2, items(), executor, in_flight=3)
+
+        assert next(results) == 0
+        # Only the in-flight items are submitted ahead
+        assert pulled == [0, 1, 2]
+        assert list(results) == [2 * i for i in range(1, 10)]
+
+
+def test_bounded_map_without_executor():
+    assert list(bounded_map(lambda x, y: x + y, [(1, 2), (3, 4)])) == [3, 7]
+
+
+def test_pipeline_stages(tmp_path):
+    (tmp_path / "hello.py").write_text(SOURCE)
+    (tmp_path / "world.py").write_text(NORMAL_FUNCTION)
+
+    tasks = list(assign_versions(discover(str(tmp_path)), current="2.1.0"))
+    results = sorted(analyze_files(read_files(tasks)))
+
+    assert [r.filename for r in results] == [
+        str(tmp_path / "hello.py"), str(tmp_path / "world.py")
+    ]
+    assert results[0].content == (
+        IMPORT_STATEMENT + NORMAL_FUNCTION + DEPRECATE_FUNCTION_2_2_0
+    )
+    assert results[0].symbols == [("deprecate_version_2_0_0", "2.0.0", None)]
+    assert results[1].content is None
+
+    # The source code is dropped once written
+    written = list(rewrite_files(results))
+    assert [r.content for r in written] == [None, None]
+    assert (tmp_path / "hello.py").read_text() == results[0].content
+
+
+def test_pipeline_skip_without_version(tmp_path):
+    assert list(assign_versions([str(tmp_path / "hello.py")])) == []
+
+
+def test_clean(tmp_path):
+    for index in range(20):
+        (tmp_path / ("hello_%d.py" % index)).write_text(SOURCE)
+
+    results = list(clean(str(tmp_path), current="2.3.0", in_flight=4))
+
+    assert len(results) == 20
+    assert all(len(r.symbols) == 2 for r in results)
+    assert (tmp_path / "hello_0.py").read_text() == (
+        NORMAL_FUNCTION.lstrip("\n")
+    )
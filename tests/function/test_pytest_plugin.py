@@ -0,0 +1,98 @@
+from os import environ, pathsep
+from os.path import dirname
+
+import pytest
+
+import auto_deprecator
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+from auto_deprecator import deprecate
+
+
+@deprecate(expiry="2.1.0", current="2.0.0", warn_handler=lambda msg: None)
+def plugin_function():
+    return "hello"
+
+
+def test_first():
+    assert plugin_function() == "hello"
+    assert plugin_function() == "hello"
+
+
+def test_second():
+    assert plugin_function() == "hello"
+
+
+def test_none():
+    pass
+"""
+
+
+@pytest.fixture
+def plugin_pytester(pytester):
+    pytester.makepyfile(test_plugin_module=TEST_MODULE)
+    return pytester
+
+
+def test_plugin_report(plugin_pytester):
+    result = plugin_pytester.runpytest(
+        "-p", "auto_deprecator.pytest_plugin", "--deprecate-report", "-v"
+    )
+
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines([
+        "*= deprecated function calls =*",
+        "Function*Stage*Expiry*Calls*Tests",
+        "test_plugin_module.plugin_function*warning*2.1.0*3*2",
+        "*test_plugin_module.py::test_first 2",
+        "*test_plugin_module.py::test_second 1",
+    ])
+
+
+def test_plugin_version(plugin_pytester):
+    result = plugin_pytester.runpytest(
+        "-p", "auto_deprecator.pytest_plugin", "--deprecate-version", "2.1.0"
+    )
+
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines([
+        "*= deprecated function calls (version 2.1.0) =*",
+        "test_plugin_module.plugin_function*expired*2.1.0*2*2",
+    ])
+
+
+def test_plugin_version_restored(plugin_pytester):
+    from auto_deprecator import get_curr_version
+
+    plugin_pytester.runpytest(
+        "-p", "auto_deprecator.pytest_plugin", "--deprecate-version", "2.1.0"
+    )
+
+    assert get_curr_version(current="2.0.0", version_module=None) == "2.0.0"
+
+
+def test_plugin_disabled(plugin_pytester):
+    result = plugin_pytester.runpytest("-p", "auto_deprecator.pytest_plugin")
+
+    result.assert_outcomes(passed=3)
+    assert "deprecated function calls" not in result.stdout.str()
+
+
+def test_plugin_xdist(plugin_pytester, monkeypatch):
+    pytest.importorskip("xdist")
+    # The workers import the plugin even if the package is not installed
+    monkeypatch.setenv("PYTHONPATH", pathsep.join(
+        [dirname(dirname(auto_deprecator.__file__))]
+        + [path for path in [environ.get("PYTHONPATH")] if path]
+    ))
+    result = plugin_pytester.runpytest_subprocess(
+        "-p", "auto_deprecator.pytest_plugin", "--deprecate-report",
+        "-n", "2",
+    )
+
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines([
+        "test_plugin_module.plugin_function*warning*2.1.0*3*2",
+    ])
@@ -0,0 +1,109 @@
+import sys
+
+import pytest
+
+from auto_deprecator import deprecate
+from auto_deprecator.resolver import (
+    clear_cache,
+    find_module_source,
+    resolve_version,
+    version_from_metadata,
+    version_from_source,
+)
+
+
+@pytest.fixture
+def package_path(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    clear_cache()
+    yield tmp_path
+    clear_cache()
+
+    for name in list(sys.modules):
+        if name.startswith("resolver_"):
+            del sys.modules[name]
+
+
+def make_package(path, name, init, files=None):
+    package = path / name
+    package.mkdir()
+    (package / "__init__.py").write_text(init)
+
+    for filename, content in (files or {}).items():
+        (package / filename).write_text(content)
+
+
+def test_version_from_source(package_path):
+    make_package(
+        package_path, "resolver_static",
+        "raise ImportError('The package must not be imported')\n"
+        "__version__ = '1.0.0'\n",
+        {"sub.py": "__version__: str = '1.1.0'\n"},
+    )
+
+    assert find_module_source("resolver_static.sub").endswith("sub.py")
+    assert version_from_source("resolver_static") == "1.0.0"
+    assert version_from_source("resolver_static.sub") == "1.1.0"
+    assert resolve_version("resolver_static") == "1.0.0"
+    assert "resolver_static" not in sys.modules
+
+
+def test_version_from_source_import(package_path):
+    make_package(
+        package_path, "resolver_relative",
+        "from ._version import __version__\n",
+        {"_version.py": "__version__ = '2.0.0'\n"},
+    )
+    make_package(
+        package_path, "resolver_absolute",
+        "from resolver_relative._version import __version__\n",
+    )
+
+    assert version_from_source("resolver_relative") == "2.0.0"
+    assert version_from_source("resolver_absolute") == "2.0.0"
+
+
+def test_version_from_source_not_literal(package_path):
+    make_package(
+        package_path, "resolver_dynamic",
+        "__version__ = '1.0.0'\n__version__ = '.'.join(['2', '0', '0'])\n",
+    )
+
+    assert version_from_source("resolver_dynamic") is None
+    # Fall back to import
+    assert resolve_version("resolver_dynamic") == "2.0.0"
+    assert "resolver_dynamic" in sys.modules
+
+
+def test_version_from_metadata(package_path):
+    make_package(
+        package_path, "resolver_metadata",
+        "__version__ = __import__('os').environ.get('NO_VERSION')\n",
+    )
+    dist_info = package_path / "resolver_metadata-3.0.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: resolver_metadata\nVersion: 3.0.0\n"
+    )
+
+    assert version_from_metadata("resolver_metadata") == "3.0.0"
+    assert resolve_version("resolver_metadata") == "3.0.0"
+    assert "resolver_metadata" not in sys.modules
+
+
+def test_deprecate_version_module_not_imported(package_path):
+    make_package(
+        package_path, "resolver_heavy",
+        "raise ImportError('The package must not be imported')\n"
+        "__version__ = '2.1.0'\n",
+    )
+
+    @deprecate(expiry="2.1.0", version_module="resolver_heavy")
+    def resolver_function():
+        pass
+
+    with pytest.raises(RuntimeError) as error:
+        resolver_function()
+
+    assert "is deprecated since version 2.1.0" in str(error.value)
+    assert "resolver_heavy" not in sys.modules
@@ -0,0 +1,245 @@
+import gc
+import json
+from io import StringIO
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from auto_deprecator.client import request
+from auto_deprecator.server import (
+    DeprecatorServer,
+    METHOD_NOT_FOUND,
+    is_shutdown_request,
+    remove_stale_socket,
+)
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_2_0,
+)
+
+
+@pytest.fixture
+def server():
+    server = DeprecatorServer(current="2.2.0")
+    yield server
+    server.close()
+
+
+def make_request(method, request_id=1, **params):
+    return {
+        "jsonrpc": "2.0", "id": request_id, "method": method,
+        "params": params,
+    }
+
+
+def test_analyze_does_not_modify_file(server, function_file):
+    original = open(function_file, "r").read()
+    response = json.loads(server.handle_message(json.dumps(
+        make_request("analyze", paths=[function_file])
+    )))
+
+    assert response["id"] == 1
+    assert response["result"] == [{
+        "path": function_file,
+        "changed": True,
+        "symbols": [
+            {
+                "name": "deprecate_version_2_0_0",
+                "expiry": "2.0.0",
+                "relocate": None,
+            },
+            {
+                "name": "deprecate_version_2_1_0",
+                "expiry": "2.1.0",
+                "relocate": None,
+            },
+        ],
+    }]
+    assert open(function_file, "r").read() == original
+
+
+def test_clean_modifies_file(server, function_file):
+    response = json.loads(server.handle_message(json.dumps(
+        make_request("clean", paths=[function_file], version="2.2.0")
+    )))
+
+    assert response["result"][0]["changed"]
+    assert open(function_file, "r").read() == (
+        IMPORT_STATEMENT + NORMAL_FUNCTION + DEPRECATE_FUNCTION_2_2_0
+    )
+
+
+def test_analyze_cache_hit(server, function_file):
+    request = json.dumps(make_request("analyze", paths=[function_file]))
+    server.handle_message(request)
+    cached = server._cache[(function_file, "2.2.0")]
+    server.handle_message(request)
+
+    assert server._cache[(function_file, "2.2.0")] is cached
+
+
+def test_clean_same_size_edit(server, tmp_path):
+    filename = tmp_path / "function.py"
+    filename.write_text(IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_2_0)
+    server.analyze({"paths": [str(filename)], "version": "2.1.0"})
+    stat = os.stat(str(filename))
+
+    # Edit the file in the same size and modification time
+    edited = (IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_2_0).replace(
+        "2.2.0", "2.0.0"
+    )
+    filename.write_text(edited)
+    os.utime(str(filename), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    result = server.clean({"paths": [str(filename)], "version": "2.1.0"})
+    assert result[0]["changed"]
+    assert "def deprecate_version_" not in filename.read_text()
+
+
+def test_batch_and_directory(server, function_file_str, tmp_path):
+    function_file = str(tmp_path / "function.py")
+    open(function_file, "w").write(function_file_str)
+    # The file which cannot be parsed does not fail the request
+    broken_file = str(tmp_path / "broken.py")
+    open(broken_file, "w").write("def broken(:\n")
+    responses = json.loads(server.handle_message(json.dumps([
+        make_request("analyze", request_id=1, paths=[str(tmp_path)]),
+        make_request("ping", request_id=2),
+        make_request("unknown", request_id=3),
+        {"jsonrpc": "2.0", "method": "ping"},
+    ])))
+
+    responses = {r["id"]: r for r in responses}
+    assert len(responses) == 3
+    results = {r["path"]: r for r in responses[1]["result"]}
+    assert results[function_file]["changed"]
+    assert results[broken_file]["error"].startswith("SyntaxError")
+    assert responses[2]["result"] == "pong"
+    assert responses[3]["error"]["code"] == METHOD_NOT_FOUND
+
+
+def test_serve_stream(server, function_file):
+    reader = StringIO(
+        "not json\n" + json.dumps(make_request("ping", request_id=5)) + "\n"
+    )
+    writer = StringIO()
+    server.serve_stream(reader, writer)
+
+    responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+    assert sorted(r["id"] or 0 for r in responses) == [0, 5]
+
+
+def test_serve_stream_shutdown(server):
+    def reader():
+        yield json.dumps(make_request("shutdown", request_id=1)) + "\n"
+        raise AssertionError("Read after the shutdown")
+
+    writer = StringIO()
+    server.serve_stream(reader(), writer)
+
+    response = json.loads(writer.getvalue())
+    assert response["id"] == 1
+    assert response["result"] is True
+    assert not server.running
+
+
+def test_serve_stream_shutdown_in_params(server):
+    reader = StringIO(
+        json.dumps(make_request("analyze", paths=["shutdown.py"])) + "\n"
+        + json.dumps(make_request("ping", request_id=2)) + "\n"
+    )
+    writer = StringIO()
+    server.serve_stream(reader, writer)
+
+    responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+    assert sorted(r["id"] for r in responses) == [1, 2]
+    assert server.running
+    assert not is_shutdown_request(
+        make_request("analyze", paths=["shutdown.py"])
+    )
+    assert is_shutdown_request([make_request("shutdown")])
+
+
+def test_file_locks_dropped(server, function_file):
+    server.analyze({"paths": [function_file]})
+    gc.collect()
+
+    assert len(server._file_locks) == 0
+
+
+def test_cache_size(function_file_str, tmp_path):
+    server = DeprecatorServer(current="2.2.0", cache_size=2)
+    filenames = []
+
+    for index in range(3):
+        filename = str(tmp_path / ("function_%d.py" % index))
+        open(filename, "w").write(function_file_str)
+        filenames.append(filename)
+
+    try:
+        server.analyze({"paths": filenames[:2]})
+        # The least recently used file is dropped
+        server.analyze({"paths": [filenames[0]]})
+        server.analyze({"paths": [filenames[2]]})
+    finally:
+        server.close()
+
+    assert list(server._cache) == [
+        (filenames[0], "2.2.0"), (filenames[2], "2.2.0"),
+    ]
+
+
+def wait_for_socket(socket_path, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return request(socket_path, "ping")
+        except (FileNotFoundError, ConnectionRefusedError):
+            assert time.monotonic() < deadline, "Server is not listening"
+            time.sleep(0.01)
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix socket is not supported"
+)
+def test_serve_unix_socket_restart(tmp_path):
+    socket_path = str(tmp_path / "server.sock")
+
+    for _ in range(2):
+        server = DeprecatorServer(current="2.2.0")
+        thread = threading.Thread(
+            target=server.serve_unix_socket, args=(socket_path,)
+        )
+        thread.start()
+
+        try:
+            assert wait_for_socket(socket_path) == "pong"
+            assert request(socket_path, "shutdown") is True
+        finally:
+            thread.join(timeout=5)
+            server.close()
+
+        assert not thread.is_alive()
+        assert not os.path.exists(socket_path)
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix socket is not supported"
+)
+def test_remove_stale_socket(tmp_path):
+    socket_path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    remove_stale_socket(socket_path)
+    assert not os.path.exists(socket_path)
+
+    open(socket_path, "w").write("not a socket")
+    with pytest.raises(RuntimeError):
+        remove_stale_socket(socket_path)
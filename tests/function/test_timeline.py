@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from auto_deprecator import FunctionStage, check_stage, version_key
+from auto_deprecator.cli import main
+from auto_deprecator.timeline import Timeline
+
+
+def make_entry(symbol, expiry, start=1):
+    return {
+        "symbol": symbol,
+        "file": "hello_world.py",
+        "start": start,
+        "end": start + 1,
+        "expiry": expiry,
+        "relocate": None,
+        "marker": "decorator",
+    }
+
+
+ENTRIES = [
+    make_entry("expire_2_10_0", "2.10.0", 1),
+    make_entry("expire_2_9_0", "2.9.0", 3),
+    make_entry("expire_2_0", "2.0", 5),
+    make_entry("expire_2_0_0", "2.0.0", 7),
+    make_entry("expire_2_1_0rc1", "2.1.0rc1", 9),
+    make_entry("expire_date", "2021-01-31", 11),
+]
+
+
+def symbols(entries):
+    return [entry["symbol"] for entry in entries]
+
+
+def test_version_key():
+    versions = ["2.10.0", "2.9.0", "2.0.0.post1", "2.0.0", "2.0.0rc1", "1.9"]
+    assert sorted(versions, key=version_key) == [
+        "1.9", "2.0.0rc1", "2.0.0", "2.0.0.post1", "2.9.0", "2.10.0",
+    ]
+    assert version_key("2.0") == version_key("2.0.0")
+    assert version_key("v2.0.0") == version_key("2.0.0")
+    assert version_key("V2.1") == version_key("2.1.0")
+    assert sorted(
+        ["2.0.0.post1", "2.0.0+cpu.10", "2.0.0", "2.0.0+cpu.9", "2.0.0+2"],
+        key=version_key,
+    ) == ["2.0.0", "2.0.0+cpu.9", "2.0.0+cpu.10", "2.0.0+2", "2.0.0.post1"]
+    assert check_stage(expiry="2.0.0", current="2.0.0+cpu") == (
+        FunctionStage.CLEANING
+    )
+    assert check_stage(expiry="v2.0.0", current="2.0.0") == (
+        FunctionStage.EXPIRED
+    )
+
+
+def test_check_stage_version_order():
+    assert check_stage(expiry="2.9.0", current="2.10.0") == (
+        FunctionStage.CLEANING
+    )
+    assert check_stage(expiry="2.0", current="2.0.0") == (
+        FunctionStage.EXPIRED
+    )
+
+
+def test_timeline_between():
+    timeline = Timeline(ENTRIES)
+
+    assert symbols(timeline.between("2.0.0", "2.9.0")) == [
+        "expire_2_0", "expire_2_0_0", "expire_2_1_0rc1", "expire_2_9_0",
+    ]
+    assert symbols(timeline.between(start="2.9.1")) == ["expire_2_10_0"]
+    assert symbols(timeline.between(end="2.1.0")) == [
+        "expire_2_0", "expire_2_0_0", "expire_2_1_0rc1",
+    ]
+    assert symbols(timeline.between("2021-01-01", "2021-01-31")) == [
+        "expire_date"
+    ]
+
+
+def test_timeline_between_mixed():
+    timeline = Timeline(ENTRIES)
+
+    with pytest.raises(AssertionError) as excinfo:
+        timeline.between("2.0.0", "2021-01-31")
+
+    assert "must be both versions or both dates" in str(excinfo.value)
+
+
+def test_timeline_expiring_removed():
+    timeline = Timeline(ENTRIES)
+
+    assert symbols(timeline.expiring("2.0.0")) == [
+        "expire_2_0", "expire_2_0_0"
+    ]
+    assert symbols(timeline.removed("2.9.0")) == [
+        "expire_2_0", "expire_2_0_0", "expire_2_1_0rc1",
+    ]
+    assert symbols(timeline.removed("2021-02-01")) == ["expire_date"]
+
+
+def test_timeline_counts():
+    assert Timeline(ENTRIES).counts() == [
+        ("2.0", 2),
+        ("2.1.0rc1", 1),
+        ("2.9.0", 1),
+        ("2.10.0", 1),
+        ("2021-01-31", 1),
+    ]
+
+
+def test_timeline_command(tmp_path, capsys):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps({
+        "format": 1, "package_version": "2.0.0", "entries": ENTRIES,
+    }))
+
+    main(["timeline", str(manifest_file), "--from", "2.9.0", "--json"])
+    assert symbols(json.loads(capsys.readouterr().out)) == [
+        "expire_2_9_0", "expire_2_10_0"
+    ]
+
+    main(["timeline", str(manifest_file), "--to", "2.0.0", "--counts"])
+    assert capsys.readouterr().out == "Expiry  Count\n2.0     2\n"
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from auto_deprecator import CONFIG
+from auto_deprecator.cli import main
+from auto_deprecator.version_map import VersionMap
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_0_0,
+    DEPRECATE_FUNCTION_2_1_0,
+)
+
+SOURCE = (
+    IMPORT_STATEMENT
+    + NORMAL_FUNCTION
+    + DEPRECATE_FUNCTION_2_0_0
+    + DEPRECATE_FUNCTION_2_1_0
+)
+
+
+def make_package(path, version, version_file=False):
+    path.mkdir(parents=True)
+
+    if version_file:
+        (path / "__init__.py").write_text(
+            "from ._version import __version__\n"
+        )
+        (path / "_version.py").write_text("__version__ = %r\n" % version)
+    else:
+        (path / "__init__.py").write_text("__version__ = %r\n" % version)
+
+    (path / "sub").mkdir()
+    (path / "sub" / "__init__.py").write_text("")
+    (path / "sub" / "hello.py").write_text(SOURCE)
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    make_package(tmp_path / "packages" / "hello", "2.0.1")
+    make_package(tmp_path / "packages" / "world", "2.1.1", version_file=True)
+    return tmp_path
+
+
+def test_version_map_prefix(monorepo):
+    versions = VersionMap(
+        {
+            str(monorepo / "packages"): "1.0.0",
+            str(monorepo / "packages" / "hello"): "2.0.1",
+        },
+        default="0.1.0",
+    )
+
+    assert versions.get(
+        str(monorepo / "packages" / "hello" / "sub" / "hello.py")
+    ) == "2.0.1"
+    assert versions.get(
+        str(monorepo / "packages" / "world" / "sub" / "hello.py")
+    ) == "1.0.0"
+    assert versions.get(str(monorepo / "setup.py")) == "0.1.0"
+
+
+def test_version_map_auto(monorepo):
+    versions = VersionMap(auto=True)
+
+    assert versions.get(
+        str(monorepo / "packages" / "hello" / "sub" / "hello.py")
+    ) == "2.0.1"
+    assert versions.get(
+        str(monorepo / "packages" / "world" / "sub" / "hello.py")
+    ) == "2.1.1"
+    assert versions.get(str(monorepo / "setup.py")) is None
+
+
+def test_version_map_load(monorepo):
+    map_file = monorepo / "versions.json"
+    map_file.write_text(json.dumps({"packages/world": "2.1.0"}))
+
+    versions = VersionMap.load(str(map_file), auto=True)
+    assert versions.get(
+        str(monorepo / "packages" / "world" / "sub" / "hello.py")
+    ) == "2.1.0"
+    assert versions.get(
+        str(monorepo / "packages" / "hello" / "sub" / "hello.py")
+    ) == "2.0.1"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main_version_map(monorepo, jobs):
+    map_file = monorepo / "versions.json"
+    map_file.write_text(json.dumps({"packages/world": "2.1.1"}))
+
+    main([
+        str(monorepo), "--version-map", str(map_file), "--auto-version",
+        "--jobs", jobs,
+    ])
+
+    hello = monorepo / "packages" / "hello" / "sub" / "hello.py"
+    world = monorepo / "packages" / "world" / "sub" / "hello.py"
+    assert hello.read_text() == (
+        IMPORT_STATEMENT + NORMAL_FUNCTION + DEPRECATE_FUNCTION_2_1_0
+    )
+    assert world.read_text() == NORMAL_FUNCTION.lstrip("\n")
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main_version_map_over_environ(monorepo, monkeypatch, jobs):
+    monkeypatch.setenv("DEPRECATE_VERSION", "1.0.0")
+    CONFIG.reload_environ()
+
+    try:
+        main([str(monorepo), "--auto-version", "--jobs", jobs])
+    finally:
+        monkeypatch.delenv("DEPRECATE_VERSION")
+        CONFIG.reload_environ()
+
+    # Each file is cleaned by its own version instead of the override
+    hello = monorepo / "packages" / "hello" / "sub" / "hello.py"
+    world = monorepo / "packages" / "world" / "sub" / "hello.py"
+    assert hello.read_text() == (
+        IMPORT_STATEMENT + NORMAL_FUNCTION + DEPRECATE_FUNCTION_2_1_0
+    )
+    assert world.read_text() == NORMAL_FUNCTION.lstrip("\n")
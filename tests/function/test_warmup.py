@@ -0,0 +1,73 @@
+import gc
+import os
+import weakref
+
+import pytest
+
+from auto_deprecator import (
+    CALL_COUNTER, CONFIG, FunctionStage, deprecate, get_call_counts, warmup,
+)
+
+
+@deprecate(expiry="2.1.0", current="2.0.0", relocate="new_hello_world")
+def warmup_hello_world():
+    pass
+
+
+def test_warmup_messages():
+    state = warmup_hello_world._state
+
+    assert warmup() >= 1
+    assert state._version_stage == (CONFIG.generation, FunctionStage.WARNING)
+    assert state.get_message(FunctionStage.WARNING) == (
+        'Function "warmup_hello_world" will be deprecated on version '
+        '2.1.0. Please use function / method "new_hello_world"'
+    )
+    assert state.get_message(FunctionStage.EXPIRED) == (
+        'Function "warmup_hello_world" is deprecated since version '
+        '2.1.0. Please use function / method "new_hello_world"'
+    )
+
+
+def test_warmup_states_not_kept():
+    @deprecate(expiry="2.1.0", current="2.0.0")
+    def local_hello_world():
+        pass
+
+    # The state has no weak reference, so the function it refers to is
+    # checked instead
+    func_ref = weakref.ref(local_hello_world.__wrapped__)
+    warmup()
+    del local_hello_world
+    gc.collect()
+
+    assert func_ref() is None
+    warmup()
+    assert func_ref() is None
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="Fork is not supported"
+)
+def test_warmup_reset_after_fork():
+    CALL_COUNTER.reset()
+
+    with pytest.warns(DeprecationWarning):
+        warmup_hello_world()
+
+    warmup()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, str(len(get_call_counts())).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+
+    with os.fdopen(read_fd) as reader:
+        assert reader.read() == "0"
+
+    assert len(get_call_counts()) == 1
@@ -0,0 +1,78 @@
+from io import StringIO
+from os import utime
+
+from auto_deprecator.watch import Watcher, snapshot
+
+from .conftest import (
+    IMPORT_STATEMENT,
+    NORMAL_FUNCTION,
+    DEPRECATE_FUNCTION_2_0_0,
+    DEPRECATE_FUNCTION_2_1_0,
+)
+
+
+def write(path, content):
+    path.write_text(content)
+    # Make sure the modified time is changed
+    file_stat = path.stat()
+    utime(str(path), ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1))
+
+
+def test_snapshot(tmp_path):
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package" / "hello.py").write_text("")
+    (tmp_path / "package" / "README").write_text("")
+
+    assert list(snapshot(str(tmp_path))) == [
+        str(tmp_path / "package" / "hello.py")
+    ]
+
+
+def test_watcher_poll(tmp_path):
+    hello = tmp_path / "hello.py"
+    world = tmp_path / "world.py"
+    write(hello, IMPORT_STATEMENT + NORMAL_FUNCTION + DEPRECATE_FUNCTION_2_0_0)
+    write(world, NORMAL_FUNCTION)
+
+    watcher = Watcher(str(tmp_path), current="2.2.0")
+    assert watcher.poll() == [
+        ("+", str(hello), ("deprecate_version_2_0_0", "2.0.0", None)),
+    ]
+
+    # Nothing is reported without changes
+    assert watcher.poll() == []
+
+    write(world, IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_1_0)
+    write(hello, NORMAL_FUNCTION)
+    assert watcher.poll() == [
+        ("-", str(hello), ("deprecate_version_2_0_0", "2.0.0", None)),
+        ("+", str(world), ("deprecate_version_2_1_0", "2.1.0", None)),
+    ]
+
+    # The results are kept in the middle of editing
+    write(world, "def broken(:")
+    assert watcher.poll() == []
+    assert watcher.results[str(world)] == [
+        ("deprecate_version_2_1_0", "2.1.0", None)
+    ]
+
+    world.unlink()
+    assert watcher.poll() == [
+        ("-", str(world), ("deprecate_version_2_1_0", "2.1.0", None)),
+    ]
+
+
+def test_watcher_run(tmp_path):
+    hello = tmp_path / "hello.py"
+    write(hello, IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_0_0)
+    output = StringIO()
+
+    Watcher(str(hello), current="2.2.0").run(
+        interval=0, output=output, polls=2
+    )
+
+    assert output.getvalue() == (
+        "+ %s: deprecate_version_2_0_0 (expiry 2.0.0)\n" % hello
+    )
+    # The file is not written
+    assert hello.read_text() == IMPORT_STATEMENT + DEPRECATE_FUNCTION_2_0_0
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from os.path import dirname
+
+ROOT = dirname(dirname(__file__))
+
+# Modules only required by the source code cleaner and the command line
+CLI_MODULES = {"argparse", "ast", "datetime", "logging", "tokenize"}
+
+
+def imported_modules(statement):
+    """Modules imported by the statement, reported by -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+def test_import_deprecate_without_cli_modules():
+    modules = imported_modules("from auto_deprecator import deprecate")
+
+    assert "auto_deprecator" in modules
+    assert not modules & CLI_MODULES
+    assert "auto_deprecator.cleaner" not in modules
+
+
+def test_lazy_import_cleaner():
+    result = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys; "
+            "from auto_deprecator import SingleFileAutoDeprecator; "
+            "print(SingleFileAutoDeprecator.__module__, "
+            "'ast' in sys.modules)",
+        ],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == ["auto_deprecator.cleaner", "True"]